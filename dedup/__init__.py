@@ -0,0 +1,3 @@
+from .bloom_filter import BloomFilter
+from .deduplicator import Deduplicator, from_settings as deduplicator_from_settings
+from .keys import canonical_link, title_year_key, infohash_key
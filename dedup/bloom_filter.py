@@ -0,0 +1,123 @@
+"""
+Bloom filter module for the indexer application.
+
+This module provides a compact, probabilistic set used to remember which
+items have already been seen, with optional persistence to disk so that
+state survives between runs.
+"""
+
+import os
+import math
+import struct
+import hashlib
+from typing import Optional
+
+MAGIC = b"BLM1"
+HEADER = struct.Struct(">4sQQIQ")  # magic, capacity, num_bits, num_hashes, count
+
+class BloomFilter:
+    """
+    A fixed-size Bloom filter backed by a bytearray.
+
+    Membership checks may return false positives at roughly `error_rate`,
+    but never false negatives.
+    """
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.001):
+        if capacity <= 0:
+            raise ValueError("Bloom filter capacity must be positive.")
+        if not 0 < error_rate < 1:
+            raise ValueError("Bloom filter error rate must be between 0 and 1.")
+
+        self.capacity = capacity
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.count = 0
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key: str) -> bool:
+        """
+        Add a key to the filter.
+
+        Args:
+            key (str): The key to add.
+
+        Returns:
+            bool: True if the key was (probably) already present, False otherwise.
+        """
+        present = True
+        for position in self._positions(key):
+            byte_index, bit = divmod(position, 8)
+            mask = 1 << bit
+            if not self.bits[byte_index] & mask:
+                present = False
+                self.bits[byte_index] |= mask
+        if not present:
+            self.count += 1
+        return present
+
+    def __contains__(self, key: str) -> bool:
+        for position in self._positions(key):
+            byte_index, bit = divmod(position, 8)
+            if not self.bits[byte_index] & (1 << bit):
+                return False
+        return True
+
+    def __len__(self) -> int:
+        return self.count
+
+    def save(self, path: str) -> None:
+        """
+        Atomically write the filter to disk.
+
+        Args:
+            path (str): Destination file path.
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, self.capacity, self.num_bits, self.num_hashes, self.count))
+            f.write(self.bits)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["BloomFilter"]:
+        """
+        Load a filter previously written with `save`.
+
+        Args:
+            path (str): Source file path.
+
+        Returns:
+            Optional[BloomFilter]: The loaded filter, or None if the file is missing or invalid.
+        """
+        if not os.path.exists(path):
+            return None
+
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+            if len(header) != HEADER.size:
+                return None
+            magic, capacity, num_bits, num_hashes, count = HEADER.unpack(header)
+            if magic != MAGIC:
+                return None
+            bits = bytearray(f.read())
+
+        if len(bits) != (num_bits + 7) // 8:
+            return None
+
+        bloom = cls.__new__(cls)
+        bloom.capacity = capacity
+        bloom.num_bits = num_bits
+        bloom.num_hashes = num_hashes
+        bloom.count = count
+        bloom.bits = bits
+        return bloom
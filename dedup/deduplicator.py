@@ -0,0 +1,251 @@
+"""
+Deduplication module for the indexer application.
+
+This module tracks which items have already been seen, within a run and
+across runs, so repeat detail fetches can be skipped and duplicate records
+dropped from the outputs while they are being streamed.
+"""
+
+import os
+import logging
+from typing import Dict, Any, Iterable, List, Optional, Set
+
+from .bloom_filter import BloomFilter
+from .keys import canonical_link, title_year_key, infohash_key
+
+DEFAULT_STATE_FILE = "dedup.bloom"
+
+class Deduplicator:
+    """
+    Bloom-filter backed set of item identity keys.
+
+    An item is considered a duplicate if any of its keys (canonical link,
+    normalised title and year, or torrent infohash) has been seen before.
+    """
+
+    def __init__(self, bloom: BloomFilter, path: Optional[str] = None, logger: Optional[logging.Logger] = None):
+        self.bloom = bloom
+        self.path = path
+        self.logger = logger or logging.getLogger(__name__)
+        self.checked = 0
+        self.duplicates = 0
+        # Keys of listings whose detail page is being fetched; only in memory, so a failed fetch is retried next run
+        self.attempted: Set[str] = set()
+        # Keys of items written by the running indexer, added to the filter when its run succeeds
+        self.pending: List[str] = []
+
+    @property
+    def persistent(self) -> bool:
+        """True if the filter is saved and reloaded across runs, so outputs must carry earlier items forward."""
+        return self.path is not None
+
+    @classmethod
+    def open(cls, path: Optional[str], capacity: int = 1_000_000, error_rate: float = 0.001, logger: Optional[logging.Logger] = None) -> "Deduplicator":
+        """
+        Open a deduplicator, restoring persisted state if it exists.
+
+        Args:
+            path (Optional[str]): File backing the filter, or None for an in-memory only filter.
+            capacity (int): Expected number of distinct keys.
+            error_rate (float): Acceptable false-positive rate.
+            logger (Optional[logging.Logger]): Logger instance.
+
+        Returns:
+            Deduplicator: The opened deduplicator.
+        """
+        logger = logger or logging.getLogger(__name__)
+        bloom = BloomFilter.load(path) if path else None
+        if bloom is not None:
+            logger.info(f"Loaded deduplication state with {len(bloom)} keys from {path}")
+        else:
+            bloom = BloomFilter(capacity, error_rate)
+        return cls(bloom, path, logger)
+
+    def is_duplicate(self, keys: Iterable[Optional[str]], remember: bool = True) -> bool:
+        """
+        Check a set of identity keys and record them as seen.
+
+        Args:
+            keys (Iterable[Optional[str]]): Identity keys for one item; None entries are ignored.
+            remember (bool): Add the keys to the filter straight away. If false, they are only marked as
+                attempted in this run; call `remember` once the item has been written, so an item that
+                never reaches an output is not skipped by later runs.
+
+        Returns:
+            bool: True if any key had been seen before.
+        """
+        keys = [key for key in keys if key is not None]
+        seen = any(key in self.attempted for key in keys)
+        if remember:
+            for key in keys:
+                if self.bloom.add(key):
+                    seen = True
+        else:
+            seen = seen or any(key in self.bloom for key in keys)
+            self.attempted.update(keys)
+        self.checked += 1
+        if seen:
+            self.duplicates += 1
+        return seen
+
+    def is_duplicate_listing(self, link: str, title: str, year: Optional[int] = None) -> bool:
+        """
+        Check a list-page entry before its detail page is fetched.
+
+        The entry is only marked as attempted for this run; call `remember_listing`
+        once its detail record has been written.
+
+        Args:
+            link (str): The detail page link.
+            title (str): The listed title.
+            year (Optional[int]): The release year, parsed from the title if omitted.
+
+        Returns:
+            bool: True if the entry is a duplicate.
+        """
+        return self.is_duplicate(listing_keys(link, title, year), remember=False)
+
+    def remember(self, keys: Iterable[Optional[str]]) -> None:
+        """
+        Record the keys of an item that has been written to an output.
+
+        They are held back until `commit`, so the keys of an indexer run that
+        fails are not saved.
+
+        Args:
+            keys (Iterable[Optional[str]]): Identity keys for one item; None entries are ignored.
+        """
+        self.pending.extend(key for key in keys if key is not None)
+
+    def remember_listing(self, link: str, title: str, year: Optional[int] = None) -> None:
+        """
+        Record a list-page entry once its detail record has been written.
+
+        Args:
+            link (str): The detail page link.
+            title (str): The listed title.
+            year (Optional[int]): The release year, parsed from the title if omitted.
+        """
+        self.remember(listing_keys(link, title, year))
+
+    def remember_records(self, records: Iterable[Dict[str, Any]]) -> None:
+        """Record full records once they have been written."""
+        for record in records:
+            self.remember(record_keys(record))
+
+    def commit(self) -> None:
+        """Add the keys remembered since the last commit to the filter, after an indexer run succeeded."""
+        for key in self.pending:
+            self.bloom.add(key)
+        self.pending.clear()
+
+    def discard(self) -> None:
+        """Drop the keys remembered since the last commit, after an indexer run failed, so its items are fetched again."""
+        if self.pending:
+            self.logger.warning(f"Not keeping {len(self.pending)} deduplication keys from a failed run; its items will be fetched again")
+        self.pending.clear()
+
+    def is_duplicate_record(self, record: Dict[str, Any], remember: bool = True) -> bool:
+        """
+        Check a full record, using every identity key it carries.
+
+        Args:
+            record (Dict[str, Any]): A record as produced by an indexer.
+            remember (bool): As for `is_duplicate`.
+
+        Returns:
+            bool: True if the record is a duplicate.
+        """
+        return self.is_duplicate(record_keys(record), remember)
+
+    def filter(self, records: Iterable[Dict[str, Any]], remember: bool = True) -> List[Dict[str, Any]]:
+        """
+        Drop duplicate records, keeping the first occurrence.
+
+        Args:
+            records (Iterable[Dict[str, Any]]): Records to filter.
+            remember (bool): As for `is_duplicate`; with false, call `remember_records` once they are written.
+
+        Returns:
+            List[Dict[str, Any]]: The records that had not been seen before.
+        """
+        return [record for record in records if not self.is_duplicate_record(record, remember)]
+
+    def save(self) -> None:
+        """Persist the filter, if it has a backing file."""
+        if self.path:
+            self.bloom.save(self.path)
+            self.logger.info(f"Saved deduplication state with {len(self.bloom)} keys to {self.path}")
+
+    def stats(self) -> Dict[str, int]:
+        """Return counters for logging: items checked, duplicates found and keys held."""
+        return {"checked": self.checked, "duplicates": self.duplicates, "keys": len(self.bloom)}
+
+def listing_keys(link: str, title: str, year: Optional[int] = None) -> List[Optional[str]]:
+    """
+    Collect the identity keys of a list-page entry.
+
+    Args:
+        link (str): The detail page link.
+        title (str): The listed title.
+        year (Optional[int]): The release year, parsed from the title if omitted.
+
+    Returns:
+        List[Optional[str]]: The identity keys; entries may be None.
+    """
+    return [canonical_link(link), title_year_key(title, year)]
+
+def record_keys(record: Dict[str, Any]) -> List[Optional[str]]:
+    """
+    Collect the identity keys of a record from any supported indexer.
+
+    Args:
+        record (Dict[str, Any]): A 1337x or YTS record.
+
+    Returns:
+        List[Optional[str]]: The identity keys; entries may be None.
+    """
+    keys: List[Optional[str]] = []
+
+    for link_field in ("link", "movie_page", "url"):
+        if record.get(link_field):
+            keys.append(canonical_link(record[link_field]))
+
+    title = record.get("title") or record.get("name")
+    if title:
+        keys.append(title_year_key(title, record.get("year")))
+
+    for torrent in record.get("torrents") or []:
+        if torrent.get("hash"):
+            keys.append(infohash_key(torrent["hash"]))
+        if torrent.get("magnet"):
+            keys.append(infohash_key(torrent["magnet"]))
+
+    return keys
+
+def from_settings(settings: Dict[str, Any], logger: logging.Logger) -> Optional[Deduplicator]:
+    """
+    Create a deduplicator from the `dedup` configuration section.
+
+    Args:
+        settings (Dict[str, Any]): The configuration dictionary.
+        logger (logging.Logger): Logger instance.
+
+    Returns:
+        Optional[Deduplicator]: The deduplicator, or None if deduplication is disabled.
+    """
+    dedup_settings = settings.get("dedup", {})
+    if not dedup_settings.get("enabled", False):
+        return None
+
+    path = None
+    if dedup_settings.get("persist", True):
+        state_dir = os.path.abspath(dedup_settings.get("state_dir", "./state/"))
+        path = os.path.join(state_dir, DEFAULT_STATE_FILE)
+
+    return Deduplicator.open(
+        path,
+        capacity=dedup_settings.get("capacity", 1_000_000),
+        error_rate=dedup_settings.get("error_rate", 0.001),
+        logger=logger
+    )
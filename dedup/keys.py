@@ -0,0 +1,112 @@
+"""
+Identity key module for the indexer application.
+
+This module normalises links, titles and torrent infohashes into stable
+keys so the same item can be recognised across pages and indexers.
+"""
+
+import re
+import base64
+import binascii
+import unicodedata
+from typing import Optional, Union
+from urllib.parse import urlparse, parse_qs, unquote
+
+YEAR_PATTERN = re.compile(r"[\(\[\s]((?:19|20)\d{2})[\)\]]?\s*$")
+NON_WORD = re.compile(r"[^a-z0-9]+")
+HEX_INFOHASH = re.compile(r"^[0-9a-f]{40}$", re.IGNORECASE)
+BASE32_INFOHASH = re.compile(r"^[a-z2-7]{32}$", re.IGNORECASE)
+
+def canonical_link(link: str) -> str:
+    """
+    Normalise a link into a host-independent key.
+
+    Mirrors of the same site serve identical paths, so the scheme and host
+    are dropped and only the lower-cased path is kept.
+
+    Args:
+        link (str): An absolute or site-relative link.
+
+    Returns:
+        str: The canonical link key.
+    """
+    path = urlparse(link.strip()).path or "/"
+    path = unquote(path).lower().rstrip("/")
+    return f"link:{path or '/'}"
+
+def normalize_title(title: str) -> str:
+    """
+    Normalise a title for fuzzy-insensitive comparison.
+
+    Args:
+        title (str): The raw title.
+
+    Returns:
+        str: Lower-cased, accent-stripped title with punctuation collapsed to spaces.
+    """
+    decomposed = unicodedata.normalize("NFKD", title)
+    ascii_title = decomposed.encode("ascii", "ignore").decode("ascii").lower()
+    return NON_WORD.sub(" ", ascii_title).strip()
+
+def split_title_year(title: str) -> tuple:
+    """
+    Split a trailing release year from a title such as "Movie (1999)".
+
+    Args:
+        title (str): The raw title.
+
+    Returns:
+        tuple: The title without the year, and the year as an int or None.
+    """
+    match = YEAR_PATTERN.search(title)
+    if match:
+        return title[:match.start()].strip(), int(match.group(1))
+    return title.strip(), None
+
+def title_year_key(title: str, year: Optional[Union[int, str]] = None) -> Optional[str]:
+    """
+    Build a key from a normalised title and release year.
+
+    Args:
+        title (str): The raw title.
+        year (Optional[Union[int, str]]): The release year, parsed from the title if omitted.
+
+    Returns:
+        Optional[str]: The key, or None if no year is known (title alone is too ambiguous).
+    """
+    if year is None:
+        title, year = split_title_year(title)
+    normalized = normalize_title(title)
+    if not normalized or not year:
+        return None
+    return f"title:{normalized}|{int(year)}"
+
+def infohash_key(value: str) -> Optional[str]:
+    """
+    Build a key from a torrent infohash or magnet URI.
+
+    Both hex and base32 encodings are accepted and normalised to lower-case hex.
+
+    Args:
+        value (str): A 40-char hex infohash, a 32-char base32 infohash or a magnet URI.
+
+    Returns:
+        Optional[str]: The key, or None if no infohash could be recognised.
+    """
+    value = value.strip()
+    if value.lower().startswith("magnet:"):
+        for xt in parse_qs(urlparse(value).query).get("xt", []):
+            if xt.lower().startswith("urn:btih:"):
+                value = xt[9:]
+                break
+        else:
+            return None
+
+    if HEX_INFOHASH.match(value):
+        return f"btih:{value.lower()}"
+    if BASE32_INFOHASH.match(value):
+        try:
+            return f"btih:{binascii.hexlify(base64.b32decode(value.upper())).decode('ascii')}"
+        except binascii.Error:
+            return None
+    return None
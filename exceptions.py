@@ -8,4 +8,8 @@ class ConfigurationError(IndexerError):
 
 class URLValidationError(IndexerError):
     """Exception raised for URL validation errors."""
-    pass
\ No newline at end of file
+    pass
+
+class MirrorError(IndexerError):
+    """Exception raised when a site or mirror itself fails to serve a page."""
+    pass
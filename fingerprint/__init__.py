@@ -0,0 +1,2 @@
+from .fingerprint_store import FingerprintStore, digest, from_settings as fingerprint_store_from_settings
+from .change_log import ChangeLog, change_log_path, read_header as read_change_log_header
@@ -0,0 +1,83 @@
+"""
+Change log module for the indexer application.
+
+With page fingerprints enabled, an indexer writes a change log next to its
+output file. The log holds the full records of pages that are new or changed
+since the previous crawl, and only identifying fields for records whose page
+was unchanged. Consumers such as the infringement report read the log instead
+of the whole output, so their cost follows what changed rather than the size
+of the catalogue.
+
+The first line names this run and the run of the log it replaced, so a
+consumer can tell whether it saw every run in between. The last line marks
+the log complete; a log from an interrupted crawl has none and must not be
+trusted.
+"""
+
+import os
+import time
+from typing import Dict, Any, Iterable, Optional
+
+import orjson
+
+CHANGE_LOG_SUFFIX = ".changes.jsonl"
+# The fields the report identifies a record by
+IDENTITY_FIELDS = ("movie_page", "url", "link", "title", "name", "year")
+TAIL_BYTES = 64
+
+def change_log_path(output_path: str) -> str:
+    return os.path.splitext(output_path)[0] + CHANGE_LOG_SUFFIX
+
+def read_header(path: str) -> Optional[Dict[str, Any]]:
+    """
+    Read a change log's header and whether the log is complete.
+
+    Args:
+        path (str): The change log path.
+
+    Returns:
+        Optional[Dict[str, Any]]: The header with a `complete` flag added, or None if there is no readable log.
+    """
+    try:
+        with open(path, "rb") as f:
+            header = orjson.loads(f.readline())
+            size = f.seek(0, os.SEEK_END)
+            f.seek(max(0, size - TAIL_BYTES))
+            last_line = f.read().rstrip().rsplit(b"\n", 1)[-1]
+    except (OSError, orjson.JSONDecodeError):
+        return None
+    return dict(header, complete=last_line == b'{"complete":true}')
+
+class ChangeLog:
+    """Writes one crawl's change log for an output file."""
+
+    def __init__(self, output_path: str):
+        self.path = change_log_path(output_path)
+        previous = read_header(self.path)
+        self.previous_run = previous.get("run") if previous is not None else None
+        self.run = f"{time.time():.6f}"
+        self.file = open(self.path, "wb")
+        self._write({"run": self.run, "previous_run": self.previous_run})
+
+    def _write(self, entry: Dict[str, Any]) -> None:
+        self.file.write(orjson.dumps(entry))
+        self.file.write(b"\n")
+
+    def changed(self, records: Iterable[Dict[str, Any]]) -> None:
+        """Log records from a page that is new or changed since the previous crawl."""
+        self._write({"records": list(records)})
+
+    def unchanged(self, records: Iterable[Dict[str, Any]]) -> None:
+        """Log records from a page whose fingerprint matched, by their identifying fields only."""
+        self._write({"seen": [{key: record[key] for key in IDENTITY_FIELDS if key in record} for record in records]})
+
+    def close(self, complete: bool) -> None:
+        """
+        Close the log.
+
+        Args:
+            complete (bool): Whether the crawl finished, so the log covers the whole output.
+        """
+        if complete:
+            self._write({"complete": True})
+        self.file.close()
@@ -0,0 +1,155 @@
+"""
+Page fingerprint module for the indexer application.
+
+This module remembers a fast hash of the relevant part of every fetched
+page together with the records extracted from it. When a page is fetched
+again with an identical fingerprint, the stored records are reused and the
+page is not parsed again.
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+from typing import Dict, Any, Callable, Optional, Tuple, Union
+
+import orjson
+
+DEFAULT_STATE_FILE = "fingerprints.sqlite3"
+COMMIT_EVERY = 500
+
+def digest(content: Union[str, bytes]) -> bytes:
+    """
+    Compute the fingerprint of a page fragment.
+
+    Args:
+        content (Union[str, bytes]): The fragment to fingerprint.
+
+    Returns:
+        bytes: A 16-byte BLAKE2b digest.
+    """
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.blake2b(content, digest_size=16).digest()
+
+class FingerprintStore:
+    """
+    SQLite-backed map from page key to (fingerprint, extracted records).
+
+    Indexers share one store and use it from the event loop only; lookups
+    are synchronous and never yield, so no locking is needed.
+    """
+
+    def __init__(self, path: str, logger: Optional[logging.Logger] = None):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.logger = logger or logging.getLogger(__name__)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS pages (key TEXT PRIMARY KEY, digest BLOB NOT NULL, records BLOB, updated_at REAL NOT NULL)"
+        )
+        self.pending = 0
+        self.stats = {"unchanged": 0, "changed": 0, "new": 0}
+
+    def check(self, key: str, fingerprint: bytes) -> tuple:
+        """
+        Compare a page's fingerprint with the stored one.
+
+        Args:
+            key (str): The page key, usually its URL.
+            fingerprint (bytes): The page's current fingerprint.
+
+        Returns:
+            tuple: Whether the page is unchanged, and the stored records if it is (None if records were not kept).
+        """
+        row = self.connection.execute("SELECT digest, records FROM pages WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.stats["new"] += 1
+            return False, None
+        if row[0] != fingerprint:
+            self.stats["changed"] += 1
+            return False, None
+        self.stats["unchanged"] += 1
+        return True, orjson.loads(row[1]) if row[1] is not None else None
+
+    def store(self, key: str, fingerprint: bytes, records: Any = None) -> None:
+        """
+        Save a page's fingerprint and, optionally, the records extracted from it.
+
+        Args:
+            key (str): The page key, usually its URL.
+            fingerprint (bytes): The page's fingerprint.
+            records (Any): JSON-serialisable records, or None to keep only the fingerprint.
+        """
+        blob = orjson.dumps(records) if records is not None else None
+        self.connection.execute(
+            "INSERT OR REPLACE INTO pages (key, digest, records, updated_at) VALUES (?, ?, ?, ?)",
+            (key, fingerprint, blob, time.time())
+        )
+        self.pending += 1
+        if self.pending >= COMMIT_EVERY:
+            self.connection.commit()
+            self.pending = 0
+
+    def get_or_parse(self, key: str, fragment: Union[str, bytes], parse: Callable[[], Any]) -> Any:
+        """
+        Return the stored records for an unchanged page, or parse and store it.
+
+        Args:
+            key (str): The page key, usually its URL.
+            fragment (Union[str, bytes]): The part of the page the records are extracted from.
+            parse (Callable[[], Any]): Extracts the records; only called if the page changed.
+
+        Returns:
+            Any: The page's records. A None result from `parse` is returned but not stored.
+        """
+        return self.lookup(key, fragment, parse)[0]
+
+    def lookup(self, key: str, fragment: Union[str, bytes], parse: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Like `get_or_parse`, but also tell whether the stored records were reused.
+
+        Returns:
+            Tuple[Any, bool]: The page's records, and True if the page was unchanged and not parsed.
+        """
+        fingerprint = digest(fragment)
+        unchanged, records = self.check(key, fingerprint)
+        if unchanged and records is not None:
+            return records, True
+
+        records = parse()
+        if records is not None:
+            self.store(key, fingerprint, records)
+        return records, False
+
+    def change_rate(self) -> Optional[float]:
+        """Return the fraction of previously seen pages whose content changed, or None if none were seen before."""
+        seen_before = self.stats["unchanged"] + self.stats["changed"]
+        return self.stats["changed"] / seen_before if seen_before else None
+
+    def report(self) -> Dict[str, Any]:
+        """Return page counts by outcome and the change rate, for logging."""
+        return dict(self.stats, change_rate=self.change_rate())
+
+    def close(self) -> None:
+        self.connection.commit()
+        self.connection.close()
+
+def from_settings(settings: Dict[str, Any], logger: logging.Logger) -> Optional[FingerprintStore]:
+    """
+    Create a fingerprint store from the `fingerprints` configuration section.
+
+    Args:
+        settings (Dict[str, Any]): The configuration dictionary.
+        logger (logging.Logger): Logger instance.
+
+    Returns:
+        Optional[FingerprintStore]: The store, or None if fingerprinting is disabled.
+    """
+    fingerprint_settings = settings.get("fingerprints", {})
+    if not fingerprint_settings.get("enabled", False):
+        return None
+
+    state_dir = os.path.abspath(fingerprint_settings.get("state_dir", "./state/"))
+    return FingerprintStore(os.path.join(state_dir, DEFAULT_STATE_FILE), logger)
@@ -1,110 +1,101 @@
-import os
+import re
 import time
-import json
 from lxml import etree
-from io import StringIO
 import asyncio
-import aiohttp
-from aiohttp import ClientSession
-from asyncio import Semaphore
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Set, Tuple
+from urllib.parse import urljoin
 import logging
 
 from exceptions import IndexerError
+from dedup import Deduplicator
+from fingerprint import FingerprintStore, ChangeLog
+from runtime import TransportRuntime, MirrorPool, PriorityLimiter, PRIORITY_LIST, PRIORITY_DETAIL, PRIORITY_RETRY
+from .indexer_base import IndexerBase, JsonArrayWriter
 
-class ResponseCache:
-    def __init__(self):
-        self.cache = {}
+# One parser reused for every page; feeding it UTF-8 bytes skips lxml's unicode decoding pass
+html_parser = etree.HTMLParser(encoding="utf-8", remove_comments=True, remove_pis=True, no_network=True)
 
-    async def get(self, url: str) -> Optional[str]:
-        return self.cache.get(url)
+# The <main> tag itself, not <main-nav> or similar custom elements
+MAIN_OPEN = re.compile(r"<main(?=[\s/>])", re.IGNORECASE)
+BODY_OPEN = re.compile(r"<body(?=[\s/>])", re.IGNORECASE)
 
-    async def set(self, url: str, response: str) -> None:
-        self.cache[url] = response
+def main_fragment(html_content: str) -> str:
+    # Everything we extract lives under <main>; the head, scripts, navigation and footer are skipped.
+    # The search starts at <body> so that markup quoted in head scripts cannot be taken for the tag
+    body = BODY_OPEN.search(html_content)
+    start = MAIN_OPEN.search(html_content, body.start() if body else 0)
+    end = html_content.rfind("</main>")
+    if start is not None and end > start.start():
+        return html_content[start.start():end + len("</main>")]
+    return html_content
 
-response_cache = ResponseCache()
+def parse_html(html_content: str, fragment: bool = True) -> etree._Element:
+    # libxml2 re-wraps a <main> fragment in html/body, so absolute XPaths such as /html/body/main/... still match
+    if fragment:
+        html_content = main_fragment(html_content)
+    return etree.fromstring(html_content.encode("utf-8"), html_parser)
 
-async def check_flaresolverr(session: ClientSession, flaresolverr_url: str, logger: logging.Logger) -> bool:
-    try:
-        async with session.get(flaresolverr_url, timeout=30) as response:
-            if response.status in [200, 405]:
-                return True
-            else:
-                logger.error(f"FlareSolverr returned status code: {response.status}")
-    except aiohttp.ClientConnectorError as e:
-        logger.error(f"Connection error to FlareSolverr: {str(e)}")
-    except asyncio.TimeoutError:
-        logger.error("Timeout while connecting to FlareSolverr")
-    except Exception as e:
-        logger.error(f"Unexpected error checking FlareSolverr: {str(e)}")
-    return False
-
-async def fetch_with_flaresolverr(session: ClientSession, semaphore: Semaphore, url: str, flaresolverr_url: str, logger: logging.Logger) -> Optional[str]:
-    async with semaphore:
-        cached_response = await response_cache.get(url)
-        if cached_response:
-            return cached_response
-
-        headers = {"Content-Type": "application/json"}
-        data = {
-            "cmd": "request.get",
-            "url": url,
-            "maxTimeout": 60000
-        }
+def xpath_with_fallback(html_content: str, tree: etree._Element, path: str) -> List[etree._Element]:
+    elements = tree.xpath(path)
+    if not elements:
+        # A "<main" quoted in a body script can cut the fragment short; retry on the whole document
+        elements = parse_html(html_content, fragment=False).xpath(path)
+    return elements
 
-        try:
-            async with session.post(flaresolverr_url, headers=headers, json=data, timeout=90) as response:
-                result = await response.json()
-                if result['status'] == 'ok':
-                    html_content = result['solution']['response']
-                    await response_cache.set(url, html_content)
-                    return html_content
-                else:
-                    logger.error(f"FlareSolverr error for {url}: {result['message']}")
-                    logger.debug(f"Full FlareSolverr response: {result}")
-                    return None
-        except asyncio.TimeoutError:
-            logger.error(f"Timeout error while fetching {url}")
-        except aiohttp.ClientError as e:
-            logger.error(f"Client error while fetching {url}: {str(e)}")
-        except json.JSONDecodeError:
-            logger.error(f"JSON decode error for FlareSolverr response from {url}")
-        except Exception as e:
-            logger.error(f"Unexpected error while fetching {url}: {str(e)}")
-        return None
+async def fetch_with_retries(runtime: TransportRuntime, semaphore: PriorityLimiter, url: str, flaresolverr_url: str, logger: logging.Logger, max_retries: int = 3, use_cache: bool = True, mirrors: Optional[MirrorPool] = None, priority: int = PRIORITY_LIST, rank: float = 0.0) -> Optional[str]:
+    attempts = 0
 
-async def fetch_with_retries(session: ClientSession, semaphore: Semaphore, url: str, flaresolverr_url: str, logger: logging.Logger, max_retries: int = 3) -> Optional[str]:
-    for attempt in range(max_retries):
-        try:
-            result = await fetch_with_flaresolverr(session, semaphore, url, flaresolverr_url, logger)
-            if result:
-                return result
-        except Exception as e:
-            logger.error(f"Attempt {attempt + 1} failed: {str(e)}")
-        
-        await asyncio.sleep(2 ** attempt)  # Exponential backoff
-    
-    return None
+    async def fetch() -> Optional[str]:
+        nonlocal attempts
+        # Retries queue behind every fresh request
+        attempt_priority = priority if attempts == 0 else PRIORITY_RETRY
+        attempts += 1
+        return await runtime.flaresolverr_get(url, flaresolverr_url, logger, use_cache, mirrors, semaphore, attempt_priority, rank)
+
+    return await runtime.with_retries(fetch, max_retries, logger)
 
-async def process_library_page(session: ClientSession, semaphore: Semaphore, base_url: str, page: int, flaresolverr_url: str, logger: logging.Logger) -> List[Dict[str, Any]]:
+async def process_library_page(runtime: TransportRuntime, semaphore: PriorityLimiter, base_url: str, page: int, flaresolverr_url: str, logger: logging.Logger, fingerprints: Optional[FingerprintStore] = None, mirrors: Optional[MirrorPool] = None) -> List[Dict[str, Any]]:
     url = f"{base_url}{page}"
-    html_content = await fetch_with_retries(session, semaphore, url, flaresolverr_url, logger)
+    html_content = await fetch_with_retries(runtime, semaphore, url, flaresolverr_url, logger, mirrors=mirrors)
     if html_content:
+        if fingerprints is not None:
+            return fingerprints.get_or_parse(url, main_fragment(html_content), lambda: extract_movie_data_from_library(url, html_content, logger))
         return extract_movie_data_from_library(url, html_content, logger)
     return []
 
-async def process_movie_details(session: ClientSession, semaphore: Semaphore, movie: Dict[str, Any], flaresolverr_url: str, logger: logging.Logger) -> Optional[Dict[str, Any]]:
-    url = f"https://www.1377x.to{movie['link']}"
+async def process_movie_details(runtime: TransportRuntime, semaphore: PriorityLimiter, base_url: str, movie: Dict[str, Any], flaresolverr_url: str, logger: logging.Logger, fingerprints: Optional[FingerprintStore] = None, mirrors: Optional[MirrorPool] = None, change_log: Optional[ChangeLog] = None) -> Optional[Dict[str, Any]]:
+    # Records always carry the canonical URL; the mirror pool only changes where it is fetched from
+    url = urljoin(base_url, movie['link'])
     logger.info(f"Processing movie details of link: {movie['link']}")
-    html_content = await fetch_with_retries(session, semaphore, url, flaresolverr_url, logger)
+    # Queued details are fetched best watchlist match first, across every list page seen so far
+    rank = -movie['relevance']['score'] if 'relevance' in movie else 0.0
+    html_content = await fetch_with_retries(runtime, semaphore, url, flaresolverr_url, logger, mirrors=mirrors, priority=PRIORITY_DETAIL, rank=rank)
     if html_content:
-        return extract_movie_data(html_content, url, logger)
+        unchanged = False
+        if fingerprints is not None:
+            movie_data, unchanged = fingerprints.lookup(url, main_fragment(html_content), lambda: extract_movie_data(html_content, url, logger))
+        else:
+            movie_data = extract_movie_data(html_content, url, logger)
+        if movie_data is not None and 'relevance' in movie:
+            movie_data['relevance'] = movie['relevance']
+        if movie_data is not None and change_log is not None:
+            (change_log.unchanged if unchanged else change_log.changed)([movie_data])
+        return movie_data
     return None
 
-def extract_movie_data_from_library(url: str, html_content: str, logger: logging.Logger) -> List[Dict[str, Any]]:
+def extract_last_page_number(html_content: str, tree: Optional[etree._Element] = None) -> Optional[int]:
+    if tree is None:
+        tree = parse_html(html_content)
+    last_page_elements = xpath_with_fallback(html_content, tree, "/html/body/main/div/div/div[3]/ul/li[last()]/a")
+    if not last_page_elements:
+        return None
+    return int(last_page_elements[0].text)
+
+def extract_movie_data_from_library(url: str, html_content: str, logger: logging.Logger, tree: Optional[etree._Element] = None) -> List[Dict[str, Any]]:
     logger.info(f"Beginning extraction of movie data from HTML content of base url: {url}")
-    tree = etree.parse(StringIO(html_content), etree.HTMLParser())
-    content_element = tree.xpath("/html/body/main/div/div/div[2]/ul")
+    if tree is None:
+        tree = parse_html(html_content)
+    content_element = xpath_with_fallback(html_content, tree, "/html/body/main/div/div/div[2]/ul")
     
     if not content_element:
         logger.warning("No content element found in the HTML. Unable to extract movie data.")
@@ -142,7 +133,10 @@ def extract_movie_data_from_library(url: str, html_content: str, logger: logging
 
 def extract_movie_data(html_content: str, movie_page_link: str, logger: logging.Logger) -> Optional[Dict[str, Any]]:
     logger.info("Beginning extraction of movie data from HTML content")
-    tree = etree.parse(StringIO(html_content), etree.HTMLParser())
+    tree = parse_html(html_content)
+    if not tree.xpath("//table[@class='table-list table table-responsive table-striped']"):
+        # Layout without the torrent table inside <main>; fall back to the whole document
+        tree = parse_html(html_content, fragment=False)
     
     try:
         title_elements = tree.xpath("//div[@class='torrent-detail-info']//h3/a/text()")
@@ -210,67 +204,152 @@ def extract_movie_data(html_content: str, movie_page_link: str, logger: logging.
         logger.error(f"An unexpected error occurred while extracting movie data: {str(e)}")
         return None
 
-async def main(base_url: str, max_retries: Dict[str, Any], output_dir: str, flaresolverr_url: str, concurrency_limit: int, logger: logging.Logger) -> None:
-    start_time = time.time()
-    logger.info(f"Starting main function with base_url: {base_url}")
+def drop_duplicate_movies(all_movie_data: List[Dict[str, Any]], deduplicator: Deduplicator, logger: logging.Logger) -> List[Dict[str, Any]]:
+    unique_movies = [movie for movie in all_movie_data if not deduplicator.is_duplicate_listing(movie['link'], movie['name'])]
+    logger.info(f"Skipping {len(all_movie_data) - len(unique_movies)} duplicate movies before fetching details")
+    return unique_movies
 
-    # Extract the actual retry count from the max_retries dictionary
-    retry_count = max_retries.get('count', 5)  # Default to 5 if 'count' is not present
+class OneThreeThreeSevenX(IndexerBase):
+    name = "1337x"
 
-    async with aiohttp.ClientSession() as session:
-        semaphore = Semaphore(concurrency_limit)
+    def __init__(self, settings: Dict[str, Any], logger: logging.Logger, runtime: TransportRuntime):
+        super().__init__(settings, logger, runtime)
+        self.flaresolverr_url = settings.get("flaresolverr_url", "http://localhost:8191/v1")
+        self.flaresolverr_available = bool(settings.get("flaresolverr_available"))
+        # Shared with every other indexer going through FlareSolverr
+        self.semaphore = runtime.limiter("flaresolverr", settings.get("flaresolverr_concurrency_limit", 8))
 
-        if not await check_flaresolverr(session, flaresolverr_url, logger):
+    async def run(self) -> None:
+        start_time = time.time()
+        base_url = self.base_url
+        logger = self.logger
+        logger.info(f"Initializing with: max_retries={self.max_retries}, output_dir={self.output_dir}, flaresolverr_url={self.flaresolverr_url}")
+        logger.info(f"Starting main function with base_url: {base_url}")
+
+        # Preflight already probed FlareSolverr when main.py started us
+        if not self.flaresolverr_available and not await self.runtime.check_flaresolverr(self.flaresolverr_url, logger):
             raise IndexerError("FlareSolverr is not available. Please ensure it's running.")
 
-        first_page = await fetch_with_retries(session, semaphore, base_url+"1", flaresolverr_url, logger, retry_count)
+        first_page = await fetch_with_retries(self.runtime, self.semaphore, base_url+"1", self.flaresolverr_url, logger, self.max_retries, mirrors=self.mirrors)
         if not first_page:
             raise IndexerError("Failed to fetch the first page after multiple attempts. Exiting.")
 
-        tree = etree.parse(StringIO(first_page), etree.HTMLParser())
-        last_page_elements = tree.xpath("/html/body/main/div/div/div[3]/ul/li[last()]/a")
-        if not last_page_elements:
+        # Parse the first page once for both the page count and its movies
+        first_page_tree = parse_html(first_page)
+        last_page_number = extract_last_page_number(first_page, first_page_tree)
+        if last_page_number is None:
             raise IndexerError("Could not find the last page number. Exiting.")
 
-        last_page_number = int(last_page_elements[0].text)
         logger.info(f"Total number of pages to process: {last_page_number}")
 
-        tasks = [process_library_page(session, semaphore, base_url, page, flaresolverr_url, logger) for page in range(1, last_page_number + 1)]
-        all_movie_data = await asyncio.gather(*tasks)
-        all_movie_data = [movie for page in all_movie_data for movie in page]
+        first_page_movies = extract_movie_data_from_library(base_url + "1", first_page, logger, first_page_tree)
+        del first_page_tree
+
+        # At most half the limiter's slots go to list pages, so detail fetches start with the first list pages in
+        # instead of queueing behind every one of them
+        pages = iter(range(2, last_page_number + 1))
+        list_window = max(1, self.semaphore.limit // 2)
+        library_pages: Set[asyncio.Future] = set()
+        # Each detail task maps to its list-page entry, whose keys are remembered once its record is written
+        details: Dict[asyncio.Future, Dict[str, Any]] = {}
+        complete_movie_data: List[Tuple[Dict[str, Any], Dict[str, Any]]] = []
+        listed = 0
+        processed = 0
+
+        writer = JsonArrayWriter(self.output_path("one_three_three_seven_x.json"), append=self.append_output)
+        change_log = self.open_change_log("one_three_three_seven_x.json")
+        completed = False
+        try:
+            def queue_details(movies: List[Dict[str, Any]]) -> None:
+                nonlocal listed
+                listed += len(movies)
+
+                if self.prefilter is not None:
+                    movies = self.prefilter.select(movies)
+
+                if self.deduplicator is not None:
+                    movies = drop_duplicate_movies(movies, self.deduplicator, logger)
+
+                for movie in movies:
+                    details[asyncio.ensure_future(process_movie_details(self.runtime, self.semaphore, base_url, movie, self.flaresolverr_url, logger, self.fingerprints, self.mirrors, change_log))] = movie
+                logger.info(f"Listed {listed} movies, processed {processed} detail pages")
+
+            def write_buffered() -> None:
+                nonlocal complete_movie_data
+                writer.write([movie_data for _, movie_data in complete_movie_data])
+                if self.deduplicator is not None:
+                    # Only a movie that reached the output is skipped by later runs
+                    for movie, _ in complete_movie_data:
+                        self.deduplicator.remember_listing(movie['link'], movie['name'])
+                complete_movie_data = []
+
+            def collect(done: Set[asyncio.Future]) -> None:
+                nonlocal processed
+                for task in done:
+                    movie = details.pop(task)
+                    movie_data = task.result()
+                    if movie_data is not None:
+                        complete_movie_data.append((movie, movie_data))
+                processed += len(done)
 
-        logger.info(f"Total movies extracted: {len(all_movie_data)}")
+                if self.should_flush(len(complete_movie_data)):
+                    self.budget.record_flush(len(complete_movie_data))
+                    write_buffered()
 
-        complete_movie_data = []
-        batch_size = 50
-        for i in range(0, len(all_movie_data), batch_size):
-            batch = all_movie_data[i:i+batch_size]
-            tasks = [process_movie_details(session, semaphore, movie, flaresolverr_url, logger) for movie in batch]
-            batch_results = await asyncio.gather(*tasks)
-            complete_movie_data.extend([result for result in batch_results if result is not None])
-            logger.info(f"Processed batch {i//batch_size + 1}/{(len(all_movie_data) + batch_size - 1)//batch_size}")
+            queue_details(first_page_movies)
+            while True:
+                # More list pages are only requested while the detail backlog is small; it shrinks under memory pressure
+                while len(library_pages) < list_window and len(details) <= self.batch_size(50):
+                    page = next(pages, None)
+                    if page is None:
+                        break
+                    library_pages.add(asyncio.ensure_future(process_library_page(self.runtime, self.semaphore, base_url, page, self.flaresolverr_url, logger, self.fingerprints, self.mirrors)))
 
-        output_file = os.path.join(output_dir, "one_three_three_seven_x.json")
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(complete_movie_data, f, ensure_ascii=False, indent=4)
+                if not library_pages and not details:
+                    break
+
+                done, _ = await asyncio.wait(library_pages | details.keys(), return_when=asyncio.FIRST_COMPLETED)
+                finished_details = done & details.keys()
+                collect(finished_details)
+                for library_page in done - finished_details:
+                    library_pages.discard(library_page)
+                    queue_details(library_page.result())
+
+            logger.info(f"Total movies extracted: {listed}")
+            completed = True
+        finally:
+            for task in [*library_pages, *details]:
+                task.cancel()
+            # Records already fetched are written even if the crawl failed part way
+            try:
+                write_buffered()
+            finally:
+                writer.close()
+            # Closed after the output, so the log is never older than the file it describes
+            if change_log is not None:
+                change_log.close(completed)
 
         elapsed_time = time.time() - start_time
-        logger.info(f"Completed processing {last_page_number} pages and {len(complete_movie_data)} detailed movie data in {elapsed_time:.2f} seconds")
-        
-async def handler(settings: Dict[str, Any], logger: logging.Logger) -> None:
-    logger.info("Handler function called")
-    base_url = settings["base_url"]
-    max_retries = settings["max_retries"]  # This should be a dictionary
-    output_dir = os.path.abspath(settings["output_dir"])
-    flaresolverr_url = settings.get("flaresolverr_url", "http://localhost:8191/v1")
-    concurrency_limit = settings.get("flaresolverr_concurrency_limit", 8)
-    
-    logger.info(f"Initializing with: max_retries={max_retries}, output_dir={output_dir}, flaresolverr_url={flaresolverr_url}, concurrency_limit={concurrency_limit}")
-    
-    try:
-        await main(base_url, max_retries, output_dir, flaresolverr_url, concurrency_limit, logger)
-        logger.info("Handler function completed successfully")
-    except IndexerError as e:
-        logger.error(f"Indexer error in 1337x handler: {str(e)}")
-    except Exception as e:
-        logger.error(f"Unexpected error in 1337x handler: {str(e)}")
\ No newline at end of file
+        logger.info(f"Completed processing {last_page_number} pages and {writer.count} detailed movie data in {elapsed_time:.2f} seconds")
+
+    async def page_count(self) -> int:
+        # Monitoring needs the live page, not whatever was cached on the previous visit
+        first_page = await fetch_with_retries(self.runtime, self.semaphore, self.base_url + "1", self.flaresolverr_url, self.logger, self.max_retries, use_cache=False, mirrors=self.mirrors)
+        if not first_page:
+            raise IndexerError("Failed to fetch the first page after multiple attempts.")
+
+        last_page_number = extract_last_page_number(first_page)
+        if last_page_number is None:
+            raise IndexerError("Could not find the last page number.")
+        return last_page_number
+
+    async def revisit_page(self, page: int) -> Optional[List[Dict[str, Any]]]:
+        url = f"{self.base_url}{page}"
+        html_content = await fetch_with_retries(self.runtime, self.semaphore, url, self.flaresolverr_url, self.logger, self.max_retries, use_cache=False, mirrors=self.mirrors)
+        if html_content is None:
+            return None
+        return extract_movie_data_from_library(url, html_content, self.logger)
+
+handler = OneThreeThreeSevenX.handler
+page_count = OneThreeThreeSevenX.monitor_page_count
+revisit_page = OneThreeThreeSevenX.monitor_revisit_page
@@ -1,42 +1,95 @@
 import os
 import time
-import requests
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import asyncio
 from multiprocessing import Pool, cpu_count
 import io
 import orjson as json
-from requests.adapters import HTTPAdapter
-from requests.packages.urllib3.util.retry import Retry  # type: ignore
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import logging
 
-from exceptions import IndexerError
-
-def create_session(max_retries: int) -> requests.Session:
-    session = requests.Session()
-    retries = Retry(total=max_retries,
-                    backoff_factor=0.1,
-                    status_forcelist=[500, 502, 503, 504])
-    session.mount('https://', HTTPAdapter(max_retries=retries))
-    return session
-
-def fetch_page(base_url: str, session: requests.Session, page: int, page_limit: int, logger: logging.Logger) -> Optional[Dict[str, Any]]:
+from exceptions import IndexerError, MirrorError
+from fingerprint import FingerprintStore, digest
+from swarm import annotate_torrents
+from runtime import TransportRuntime, MirrorPool, PriorityLimiter, PRIORITY_LIST, PRIORITY_RETRY
+from .indexer_base import IndexerBase
+
+async def fetch_page_content(runtime: TransportRuntime, semaphore: PriorityLimiter, base_url: str, page: int, page_limit: int, max_retries: int, logger: logging.Logger, mirrors: Optional[MirrorPool] = None) -> Optional[bytes]:
+    url = f"{base_url}?limit={page_limit}&page={page}"
+    attempts = 0
+
+    async def attempt(page_url: str) -> Optional[bytes]:
+        nonlocal attempts
+        # Retries queue behind every fresh page request
+        priority = PRIORITY_LIST if attempts == 0 else PRIORITY_RETRY
+        attempts += 1
+        async with semaphore.slot(priority):
+            status, body = await runtime.request("GET", page_url, timeout=30)
+        if status >= 500:
+            raise MirrorError(f"Server error {status} fetching page {page}")
+        if status >= 400:
+            logger.error(f"Error fetching page {page}: status {status}")
+            return None
+        return body
+
+    async def fetch() -> Optional[bytes]:
+        if mirrors is not None:
+            return await mirrors.fetch(url, attempt)
+        return await attempt(url)
+
+    return await runtime.with_retries(fetch, max_retries, logger)
+
+def decode_page(content: Optional[bytes], page: int, logger: logging.Logger) -> Optional[Dict[str, Any]]:
+    if content is None:
+        return None
     try:
-        response = session.get(f"{base_url}?limit={page_limit}&page={page}", timeout=30)
-        response.raise_for_status()
-        return response.json()
-    except requests.RequestException as e:
-        logger.error(f"Error fetching page {page}: {e}")
+        return json.loads(content)
+    except json.JSONDecodeError as e:
+        logger.error(f"Invalid JSON on page {page}: {e}")
         return None
 
-def worker(base_url: str, page: int, max_retries: int, page_limit: int, logger: logging.Logger) -> List[Dict[str, Any]]:
-    session = create_session(max_retries)
-    response = fetch_page(base_url, session, page, page_limit, logger)
+async def fetch_page(runtime: TransportRuntime, semaphore: PriorityLimiter, base_url: str, page: int, page_limit: int, max_retries: int, logger: logging.Logger, mirrors: Optional[MirrorPool] = None) -> Optional[Dict[str, Any]]:
+    content = await fetch_page_content(runtime, semaphore, base_url, page, page_limit, max_retries, logger, mirrors)
+    return decode_page(content, page, logger)
+
+def movies_fragment(content: bytes) -> bytes:
+    # The trailing "@meta" block carries the server time, so only the movie list is fingerprinted
+    start = content.find(b'"movies":')
+    end = content.rfind(b',"@meta"')
+    if start != -1 and end > start:
+        return content[start:end]
+    return content
+
+def canonical_links(movies: List[Dict[str, Any]], mirrors: MirrorPool) -> None:
+    # A mirror's API answers with links on its own domain; rewrite them so output links do not depend on the mirror
+    for movie in movies:
+        for record in (movie, *(movie.get("torrents") or [])):
+            for key, value in record.items():
+                if isinstance(value, str) and value.startswith("http"):
+                    record[key] = mirrors.canonical(value)
+
+async def worker(runtime: TransportRuntime, semaphore: PriorityLimiter, base_url: str, page: int, max_retries: int, page_limit: int, logger: logging.Logger, fingerprints: Optional[FingerprintStore] = None, mirrors: Optional[MirrorPool] = None) -> Tuple[List[Dict[str, Any]], bool]:
+    # Returns the page's movies and whether its fingerprint matched the previous crawl's
+    unchanged = False
+    if fingerprints is not None:
+        content = await fetch_page_content(runtime, semaphore, base_url, page, page_limit, max_retries, logger, mirrors)
+        response = decode_page(content, page, logger)
+        if response is not None:
+            # Stored records would cost as much to decode as the page itself, so only the fingerprint is kept.
+            # A malformed page is not fingerprinted, so it is not taken for unchanged on the next run
+            key = f"{base_url}?limit={page_limit}&page={page}"
+            fingerprint = digest(movies_fragment(content))
+            unchanged, _ = fingerprints.check(key, fingerprint)
+            if not unchanged:
+                fingerprints.store(key, fingerprint)
+    else:
+        response = await fetch_page(runtime, semaphore, base_url, page, page_limit, max_retries, logger, mirrors)
     if response and 'data' in response and 'movies' in response['data']:
         logger.info(f"Successfully fetched page {page}")
-        return response['data']['movies']
+        if mirrors is not None:
+            canonical_links(response['data']['movies'], mirrors)
+        return response['data']['movies'], unchanged
     logger.warning(f"No movies found on page {page}")
-    return []
+    return [], False
 
 def json_dump_movie(movie: Dict[str, Any]) -> bytes:
     return json.dumps(movie)
@@ -49,73 +102,125 @@ def write_chunk_to_file(file: io.BufferedWriter, chunk: List[bytes]) -> None:
         file.write(movie_json)
         file.write(b'\n')
 
-async def main(base_url: str, max_retries: int, worker_count: int, page_limit: int, chunk_size: int, output_dir: str, logger: logging.Logger) -> None:
-    start_time = time.time()
-
-    session = create_session(max_retries)
-
-    logger.info("Fetching first page to determine total movie count...")
-    first_page = fetch_page(base_url, session, 1, page_limit, logger)
-    if not first_page:
-        raise IndexerError("Failed to fetch the first page. Exiting.")
-
-    total_movies = first_page['data']['movie_count']
-    total_pages = (total_movies + page_limit - 1) // page_limit
-
-    logger.info(f"Total movies: {total_movies}, Total pages: {total_pages}")
-
-    all_movies = []
-    movie_count = 0
-
-    with ThreadPoolExecutor(max_workers=worker_count) as executor:
-        future_to_page = {executor.submit(worker, base_url, page, max_retries, page_limit, logger): page for page in range(1, total_pages + 1)}
+def terminate_last_line(path: str, file: io.BufferedWriter) -> None:
+    # An interrupted run can leave the last JSON line unterminated; never glue the next record onto it
+    with open(path, "rb") as f:
+        size = f.seek(0, os.SEEK_END)
+        if size:
+            f.seek(size - 1)
+            if f.read(1) != b"\n":
+                file.write(b"\n")
+
+class YTS(IndexerBase):
+    name = "YTS"
+
+    def __init__(self, settings: Dict[str, Any], logger: logging.Logger, runtime: TransportRuntime):
+        super().__init__(settings, logger, runtime)
+        self.worker_count = settings.get("worker_count", 10)
+        self.page_limit = settings["page_limit"]
+        self.chunk_size = settings.get("chunk_size", 1000)
+        self.semaphore = runtime.limiter(self.name, self.worker_count)
+
+    async def run(self) -> None:
+        start_time = time.time()
+        logger = self.logger
+        logger.info(f"Settings: base_url={self.base_url}, max_retries={self.max_retries}, worker_count={self.worker_count}, page_limit={self.page_limit}, chunk_size={self.chunk_size}")
+
+        logger.info("Fetching first page to determine total movie count...")
+        first_page = await fetch_page(self.runtime, self.semaphore, self.base_url, 1, self.page_limit, self.max_retries, logger, self.mirrors)
+        if not first_page:
+            raise IndexerError("Failed to fetch the first page. Exiting.")
+
+        total_movies = first_page['data']['movie_count']
+        total_pages = (total_movies + self.page_limit - 1) // self.page_limit
+
+        logger.info(f"Total movies: {total_movies}, Total pages: {total_pages}")
+
+        output_file = self.output_path("yts.json")
+        # Tracker figures are scraped again for every record, so none could be logged as unchanged
+        change_log = self.open_change_log("yts.json") if self.swarm_stats is None else None
+        completed = False
+        all_movies = []
+        movie_count = 0
+
+        async def fetch(page: int):
+            return page, await worker(self.runtime, self.semaphore, self.base_url, page, self.max_retries, self.page_limit, logger, self.fingerprints, self.mirrors)
+
+        try:
+            with Pool(cpu_count()) as pool:
+                with open(output_file, "ab" if self.append_output else "wb") as f:
+                    writer = io.BufferedWriter(f, buffer_size=8*1024*1024) 
+                    if self.append_output:
+                        terminate_last_line(output_file, writer)
+
+                    for future in asyncio.as_completed([fetch(page) for page in range(1, total_pages + 1)]):
+                        try:
+                            page, (movies, unchanged) = await future
+                            if self.deduplicator is not None:
+                                movies = self.deduplicator.filter(movies, remember=False)
+                            if change_log is not None and movies:
+                                (change_log.unchanged if unchanged else change_log.changed)(movies)
+                            all_movies.extend(movies)
+                            movie_count += len(movies)
+                            logger.info(f"Processed page {page}, total movies: {movie_count}")
+                        except Exception as e:
+                            logger.error(f"Error processing page: {e}")
+
+                        if self.should_flush(len(all_movies)):
+                            await self.flush_movies(pool, writer, all_movies)
+                            self.budget.record_flush(len(all_movies))
+                            all_movies = []
+
+                    logger.info(f"Fetched {movie_count} movies. Starting JSON serialization...")
+                    await self.flush_movies(pool, writer, all_movies)
+                completed = True
+        finally:
+            # Closed after the output, so the log is never older than the file it describes
+            if change_log is not None:
+                change_log.close(completed)
+
+        elapsed_time = time.time() - start_time
+        logger.info(f"Fetched and saved {movie_count} movies in {elapsed_time:.2f} seconds")
         
-        for future in as_completed(future_to_page):
-            page = future_to_page[future]
-            try:
-                movies = future.result()
-                all_movies.extend(movies)
-                movie_count += len(movies)
-                logger.info(f"Processed page {page}, total movies: {movie_count}")
-            except Exception as e:
-                logger.error(f"Error processing page {page}: {e}")
-
-    logger.info(f"Fetched {movie_count} movies. Starting JSON serialization...")
-
-    output_file = os.path.join(output_dir, "yts.json")
-
-    with Pool(cpu_count()) as pool:
-        with open(output_file, "wb") as f:
-            writer = io.BufferedWriter(f, buffer_size=8*1024*1024) 
-            
-            for i in range(0, len(all_movies), chunk_size):
-                chunk = all_movies[i:i+chunk_size]
-                serialized_chunk = pool.apply(process_chunk, (chunk,))
-                write_chunk_to_file(writer, serialized_chunk)
-                logger.info(f"Processed and wrote chunk {i//chunk_size + 1}")
-            
-            writer.flush()
-
-    elapsed_time = time.time() - start_time
-    logger.info(f"Fetched and saved {movie_count} movies in {elapsed_time:.2f} seconds")
-    
-    file_size = os.path.getsize(output_file) / (1024 * 1024)  # Size in MB
-    logger.info(f"Output file size: {file_size:.2f} MB")
-
-async def handler(settings: Dict[str, Any], logger: logging.Logger) -> None:
-    logger.info("Handler function called")
-    logger.info(f"Settings: {settings}")
-    base_url = settings["base_url"]
-    max_retries = settings["max_retries"]
-    worker_count = settings["worker_count"]
-    page_limit = settings["page_limit"]
-    chunk_size = settings["chunk_size"]
-    output_dir = os.path.abspath(settings["output_dir"])
-
-    try:
-        await main(base_url, max_retries, worker_count, page_limit, chunk_size, output_dir, logger)
-        logger.info("Handler function completed successfully")
-    except IndexerError as e:
-        logger.error(f"Indexer error in YTS handler: {str(e)}")
-    except Exception as e:
-        logger.error(f"Unexpected error in YTS handler: {str(e)}")
\ No newline at end of file
+        file_size = os.path.getsize(output_file) / (1024 * 1024)  # Size in MB
+        logger.info(f"Output file size: {file_size:.2f} MB")
+
+    async def flush_movies(self, pool: Any, writer: io.BufferedWriter, movies: List[Dict[str, Any]]) -> None:
+        await self.write_movies(pool, writer, movies)
+        writer.flush()
+        if self.deduplicator is not None:
+            # Only movies that reached the output are skipped by later runs
+            self.deduplicator.remember_records(movies)
+
+    async def write_movies(self, pool: Any, writer: io.BufferedWriter, movies: List[Dict[str, Any]]) -> None:
+        if self.swarm_stats is not None:
+            stats = await self.swarm_stats.scrape(torrent["hash"] for movie in movies for torrent in movie.get("torrents") or [] if torrent.get("hash"))
+            self.logger.info(f"Annotated {annotate_torrents(movies, stats)} torrents with tracker swarm statistics")
+
+        chunk_size = self.batch_size(self.chunk_size)
+        for i in range(0, len(movies), chunk_size):
+            chunk = movies[i:i+chunk_size]
+            serialized_chunk = pool.apply(process_chunk, (chunk,))
+            write_chunk_to_file(writer, serialized_chunk)
+            self.logger.info(f"Processed and wrote chunk {i//chunk_size + 1}")
+
+    async def page_count(self) -> int:
+        first_page = await fetch_page(self.runtime, self.semaphore, self.base_url, 1, self.page_limit, self.max_retries, self.logger, self.mirrors)
+        if not first_page:
+            raise IndexerError("Failed to fetch the first page.")
+
+        total_movies = first_page['data']['movie_count']
+        return (total_movies + self.page_limit - 1) // self.page_limit
+
+    async def revisit_page(self, page: int) -> Optional[List[Dict[str, Any]]]:
+        response = await fetch_page(self.runtime, self.semaphore, self.base_url, page, self.page_limit, self.max_retries, self.logger, self.mirrors)
+        if response is None:
+            return None
+        movies = response.get('data', {}).get('movies', [])
+        if self.mirrors is not None:
+            canonical_links(movies, self.mirrors)
+        return movies
+
+handler = YTS.handler
+page_count = YTS.monitor_page_count
+revisit_page = YTS.monitor_revisit_page
@@ -0,0 +1,166 @@
+import os
+import json
+import logging
+from typing import Dict, List, Any, Optional, TextIO
+
+from exceptions import IndexerError
+from runtime import TransportRuntime
+from fingerprint import ChangeLog
+
+def get_retry_count(max_retries: Any) -> int:
+    # max_retries is either a plain count from script_settings or the global {"count": ...} dictionary
+    if isinstance(max_retries, dict):
+        return max_retries.get('count', 5)  # Default to 5 if 'count' is not present
+    return int(max_retries)
+
+class JsonArrayWriter:
+    """
+    Writes records to a JSON array file incrementally, so buffered records can
+    be flushed to disk before the crawl finishes.
+
+    With `append`, records are added to the array already in the file instead
+    of replacing it.
+    """
+
+    def __init__(self, path: str, append: bool = False):
+        self.path = path
+        self.count = 0
+        self.carried = append and reopen_json_array(path)
+        if self.carried:
+            self.file: TextIO = open(path, 'a', encoding='utf-8')
+        else:
+            self.file = open(path, 'w', encoding='utf-8')
+            self.file.write("[")
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        for record in records:
+            self.file.write(",\n    " if self.count or self.carried else "\n    ")
+            self.file.write(json.dumps(record, ensure_ascii=False, indent=4).replace("\n", "\n    "))
+            self.count += 1
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.write("\n]" if self.count or self.carried else "]")
+        self.file.close()
+
+def reopen_json_array(path: str) -> bool:
+    """
+    Strip the closing bracket of a JSON array file so more records can be appended.
+
+    A file left open by an interrupted run, ending after a complete record, is accepted as well.
+
+    Args:
+        path (str): The JSON array file.
+
+    Returns:
+        bool: True if the array holds records to append after, False if the file is missing or holds none.
+
+    Raises:
+        IndexerError: If the file does not hold a JSON array of records.
+    """
+    if not os.path.exists(path):
+        return False
+
+    with open(path, 'rb+') as f:
+        size = f.seek(0, os.SEEK_END)
+        f.seek(max(0, size - 4096))
+        tail = f.read()
+        body = tail.rstrip()
+        if body.endswith(b"]"):
+            body = body[:-1].rstrip()
+        if not body or body == b"[":
+            return False
+        if not body.endswith(b"}"):
+            raise IndexerError(f"Cannot append to {path}: it does not end in a JSON array of records. Move it aside or remove the deduplication state.")
+        f.truncate(size - len(tail) + len(body))
+    return True
+
+class IndexerBase:
+    """
+    Base class for all indexers.
+
+    Subclasses implement `run` for a full crawl and, to support monitoring
+    mode, `page_count` and `revisit_page`. All HTTP traffic goes through
+    the shared `runtime` injected by main.py.
+
+    An indexer module exposes its subclass to main.py and the monitoring
+    daemon with:
+
+        handler = MyIndexer.handler
+        page_count = MyIndexer.monitor_page_count
+        revisit_page = MyIndexer.monitor_revisit_page
+    """
+
+    name = "indexer"
+
+    def __init__(self, settings: Dict[str, Any], logger: logging.Logger, runtime: TransportRuntime):
+        self.settings = settings
+        self.logger = logger
+        self.runtime = runtime
+        self.base_url = settings["base_url"]
+        self.output_dir = os.path.abspath(settings["output_dir"])
+        self.max_retries = get_retry_count(settings.get("max_retries", 3))
+        self.deduplicator = settings.get("deduplicator")
+        self.prefilter = settings.get("prefilter")
+        self.fingerprints = settings.get("fingerprints")
+        self.swarm_stats = settings.get("swarm_stats")
+        self.mirrors = settings.get("mirrors")
+        self.budget = runtime.budget
+        # Persistent deduplication keeps earlier items out of this run, so they must stay in the outputs
+        self.append_output = self.deduplicator is not None and self.deduplicator.persistent
+
+    def output_path(self, filename: str) -> str:
+        return os.path.join(self.output_dir, filename)
+
+    def open_change_log(self, filename: str) -> Optional[ChangeLog]:
+        # Only the page fingerprints tell which records are unchanged since the previous crawl
+        return ChangeLog(self.output_path(filename)) if self.fingerprints is not None else None
+
+    def should_flush(self, buffered: int) -> bool:
+        # Buffered records go to disk early only while the memory budget is under pressure
+        return buffered > 0 and self.budget is not None and self.budget.under_pressure
+
+    def batch_size(self, size: int) -> int:
+        return self.budget.scaled(size) if self.budget is not None else size
+
+    async def run(self) -> None:
+        raise NotImplementedError
+
+    async def page_count(self) -> int:
+        raise NotImplementedError
+
+    async def revisit_page(self, page: int) -> Optional[List[Dict[str, Any]]]:
+        raise NotImplementedError
+
+    @classmethod
+    async def handler(cls, settings: Dict[str, Any], logger: logging.Logger, runtime: Optional[TransportRuntime] = None) -> None:
+        logger.info("Handler function called")
+        # Standalone runs (e.g. from the indexer's own __main__) get a private runtime
+        owns_runtime = runtime is None
+        if owns_runtime:
+            runtime = TransportRuntime(logger=logger)
+
+        # Items written by a failed run are not kept in the deduplication state, so main.py never saves them
+        deduplicator = settings.get("deduplicator")
+        try:
+            await cls(settings, logger, runtime).run()
+            if deduplicator is not None:
+                deduplicator.commit()
+            logger.info("Handler function completed successfully")
+        except IndexerError as e:
+            logger.error(f"Indexer error in {cls.name} handler: {str(e)}")
+        except Exception as e:
+            logger.error(f"Unexpected error in {cls.name} handler: {str(e)}")
+        finally:
+            if deduplicator is not None:
+                deduplicator.discard()
+            if owns_runtime:
+                await runtime.close()
+
+    @classmethod
+    async def monitor_page_count(cls, runtime: TransportRuntime, settings: Dict[str, Any], logger: logging.Logger) -> int:
+        return await cls(settings, logger, runtime).page_count()
+
+    @classmethod
+    async def monitor_revisit_page(cls, runtime: TransportRuntime, settings: Dict[str, Any], page: int, logger: logging.Logger) -> Optional[List[Dict[str, Any]]]:
+        return await cls(settings, logger, runtime).revisit_page(page)
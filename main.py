@@ -1,11 +1,19 @@
 import logging
 import os
 import json
-import importlib
 import asyncio
+import argparse
 from typing import Dict, Any
 
-from validate import validate_config
+from validate import validate_startup_config
+from preflight import run as run_preflight, needs_flaresolverr
+from dedup import deduplicator_from_settings
+from swarm import swarm_stats_from_settings
+from relevance import prefilter_from_settings
+from monitor import run_daemon
+from fingerprint import fingerprint_store_from_settings
+from report import report_from_settings
+from runtime import runtime_from_settings, mirror_pools_from_settings
 from exceptions import ConfigurationError, IndexerError
 
 def setup_logging(config: Dict[str, Any]) -> logging.Logger:
@@ -47,7 +55,7 @@ def get_list_of_indexers(path_for_list_of_supported_indexes: str) -> Dict[str, A
     except Exception as e:
         raise ConfigurationError(f"Error reading supported indexes file: {str(e)}")
 
-async def main(path_for_config: str) -> None:
+async def main(path_for_config: str, daemon: bool = False) -> None:
     try:
         config_dict = get_config(path_for_config)
         logger = setup_logging(config_dict)
@@ -56,18 +64,41 @@ async def main(path_for_config: str) -> None:
         logger.info("----------")
         logger.info("Logging initialized")
 
-        await validate_config(config_dict)
-
         logger.info("----------------")
         logger.info("Initialising")
         logger.info("----------------")
         
+        logger.info("Validating the settings needed before preflight")
+        validate_startup_config(config_dict)
+
         logger.info("Setting path for where the supported indexes are stored")
         path_for_list_of_supported_indexes = config_dict["path_for_list_of_supported_indexes"]
         
         logger.info("Getting list of Indexes")
         list_of_indexers = get_list_of_indexers(path_for_list_of_supported_indexes)
+
+        logger.info("Setting up the shared transport runtime")
+        runtime = runtime_from_settings(config_dict, logger)
+        runtime.mirror_pools = mirror_pools_from_settings(config_dict, list_of_indexers, logger)
+
+        logger.info("Running preflight: validating config, importing indexers and probing endpoints")
+        preflight = await run_preflight(config_dict, list_of_indexers, runtime, logger)
+        runtime.start()
         
+        logger.info("Setting up cross-indexer deduplication")
+        deduplicator = deduplicator_from_settings(config_dict, logger)
+
+        logger.info("Setting up tracker scraping for swarm statistics")
+        swarm_stats = swarm_stats_from_settings(config_dict, logger, runtime)
+
+        logger.info("Loading watchlist for the relevance prefilter")
+        prefilter = prefilter_from_settings(config_dict, logger)
+
+        logger.info("Opening page fingerprint store")
+        fingerprints = fingerprint_store_from_settings(config_dict, logger)
+
+        monitored_indexers = {}
+
         logger.info("----------------")
         logger.info("Successfully fetched: Config, Debugging level & Supported Indexes")
         logger.info("Initialisation complete")
@@ -77,11 +108,8 @@ async def main(path_for_config: str) -> None:
             logger.info(f"Found indexer of name: {name}")
             logger.info(f"Settings for this Indexer:\n{indexer_settings}")
 
-            logger.info(f"Trying to import Indexer script from path: './indexers/{name}'")
-            try:
-                module = importlib.import_module(f".{name}", package="indexers")
-            except ModuleNotFoundError:
-                logger.error(f"Was not able to find the Indexer script from path: './indexers/{name}'")
+            module = preflight["modules"].get(name)
+            if module is None:
                 continue
                 
             logger.info("Checking if indexer needs FlareSolverr")
@@ -90,7 +118,13 @@ async def main(path_for_config: str) -> None:
                 "base_url": indexer_settings["base_url"],
                 "debug_level": config_dict["debug_level"],
                 "output_dir": config_dict["output_dir"],
-                "logging_path": config_dict["logging_path"]
+                "logging_path": config_dict["logging_path"],
+                "deduplicator": deduplicator,
+                "swarm_stats": swarm_stats,
+                "prefilter": prefilter,
+                "fingerprints": fingerprints,
+                "mirrors": runtime.mirror_pools.get(name),
+                "flaresolverr_available": preflight["flaresolverr_available"]
             }
             to_check = ["fetch_concurrency_limit", "max_retries", "output_dir"]
 
@@ -101,16 +135,43 @@ async def main(path_for_config: str) -> None:
                 elif (key == "max_retries") and config_dict["max_retries"]["use_as_global_max_retry_value"]:
                     settings_to_use[key] = config_dict["max_retries"]["count"]
                     to_check.remove("max_retries")
-                elif indexer_settings.get("flaresolverr") is not None:
-                    settings_to_use["flaresolverr_url"] = config_dict["flaresolverr"]["url"]
-                    settings_to_use["flaresolverr_concurrency_limit"] = config_dict["flaresolverr"]["concurrency_limit"]
                 else:
                     settings_to_use[key] = value
+
+            if needs_flaresolverr(indexer_settings):
+                # The endpoint preflight probed, so its result holds for the URL the indexer uses
+                settings_to_use["flaresolverr_url"] = config_dict["flaresolverr"]["url"]
+                settings_to_use["flaresolverr_concurrency_limit"] = config_dict["flaresolverr"]["concurrency_limit"]
         
             for name_of_settings_left in to_check:
                settings_to_use[name_of_settings_left] = config_dict[name_of_settings_left]
 
-            await module.handler(settings_to_use, logger)
+            if daemon:
+                monitored_indexers[name] = (module, settings_to_use)
+            else:
+                await module.handler(settings_to_use, logger, runtime)
+
+        if daemon:
+            logger.info("Starting monitoring daemon")
+            await run_daemon(monitored_indexers, config_dict, runtime, logger)
+
+        if deduplicator is not None:
+            logger.info(f"Deduplication stats: {deduplicator.stats()}")
+            deduplicator.save()
+
+        if swarm_stats is not None:
+            await swarm_stats.close()
+
+        if fingerprints is not None:
+            logger.info(f"Page fingerprint stats: {fingerprints.report()}")
+            fingerprints.close()
+
+        logger.info(f"Transport stats: {runtime.snapshot()}")
+        await runtime.close()
+
+        if not daemon:
+            logger.info("Generating infringement report")
+            report_from_settings(config_dict, logger)
 
     except ConfigurationError as e:
         logger.critical(f"Configuration error: {str(e)}")
@@ -120,5 +181,10 @@ async def main(path_for_config: str) -> None:
         logger.critical(f"Unexpected error: {str(e)}", exc_info=True)
 
 if __name__ == "__main__":
-    PATH_FOR_CONFIG = "./config/config.json"
-    asyncio.run(main(PATH_FOR_CONFIG))
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Index torrent sites for potential copyright infringements.")
+    parser.add_argument("--config", default="./config/config.json", help="Path to config.json")
+    parser.add_argument("--daemon", action="store_true", help="Keep running and revisit pages on an adaptive schedule")
+    args = parser.parse_args()
+
+    PATH_FOR_CONFIG = args.config
+    asyncio.run(main(PATH_FOR_CONFIG, args.daemon))
\ No newline at end of file
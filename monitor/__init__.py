@@ -0,0 +1,2 @@
+from .revisit_scheduler import RevisitScheduler, RevisitTask
+from .daemon import run as run_daemon
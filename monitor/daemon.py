@@ -0,0 +1,169 @@
+"""
+Continuous monitoring module for the indexer application.
+
+This module runs indexers as a long-lived daemon. Instead of re-crawling
+every page from the start, it revisits (indexer, page) tasks from a
+priority queue and writes out the records of pages that are new or whose
+content changed.
+
+Indexers opt in by providing two coroutines:
+
+    async def page_count(runtime, settings, logger) -> int
+    async def revisit_page(runtime, settings, page, logger) -> Optional[List[Dict[str, Any]]]
+
+Indexers built on IndexerBase get both from its `monitor_page_count` and
+`monitor_revisit_page` classmethods. Fetches go through the shared
+transport runtime, so the daemon reuses the crawl's connection pool and
+concurrency limiters.
+"""
+
+import os
+import time
+import asyncio
+import hashlib
+import logging
+from types import ModuleType
+from typing import Dict, Any, List, Tuple
+
+from asyncio import Semaphore
+import orjson
+
+from runtime import TransportRuntime
+from .revisit_scheduler import RevisitScheduler, RevisitTask
+
+STATE_FILE = "monitor_schedule.json"
+
+def fingerprint_records(records: List[Dict[str, Any]]) -> str:
+    """
+    Compute a content fingerprint for the records extracted from a page.
+
+    Args:
+        records (List[Dict[str, Any]]): The page's records.
+
+    Returns:
+        str: A hex digest that changes whenever the records change.
+    """
+    return hashlib.blake2b(orjson.dumps(records, option=orjson.OPT_SORT_KEYS), digest_size=16).hexdigest()
+
+class Daemon:
+    """Drives revisit tasks for a set of indexers within a request budget."""
+
+    def __init__(self, indexers: Dict[str, Tuple[ModuleType, Dict[str, Any]]], monitor_settings: Dict[str, Any], output_dir: str, runtime: TransportRuntime, logger: logging.Logger):
+        self.indexers = {
+            name: (module, settings) for name, (module, settings) in indexers.items()
+            if hasattr(module, "page_count") and hasattr(module, "revisit_page")
+        }
+        for name in indexers.keys() - self.indexers.keys():
+            logger.warning(f"Indexer {name} does not support monitoring mode, skipping it")
+
+        self.scheduler = RevisitScheduler(
+            min_interval=monitor_settings.get("min_interval", 300),
+            max_interval=monitor_settings.get("max_interval", 86400),
+            initial_spread=monitor_settings.get("initial_spread")
+        )
+        self.concurrency = monitor_settings.get("concurrency", 4)
+        self.request_gap = 60.0 / monitor_settings["requests_per_minute"] if monitor_settings.get("requests_per_minute") else 0.0
+        self.discovery_interval = monitor_settings.get("discovery_interval", 3600)
+        self.save_interval = monitor_settings.get("save_interval", 60)
+        self.state_path = os.path.join(os.path.abspath(monitor_settings.get("state_dir", "./state/")), STATE_FILE)
+        self.output_dir = output_dir
+        self.runtime = runtime
+        self.logger = logger
+        self.visits = 0
+        self.changes = 0
+
+    async def discover(self) -> None:
+        """Schedule any pages not yet tracked, based on each indexer's current page count."""
+        for name, (module, settings) in self.indexers.items():
+            try:
+                total_pages = await module.page_count(self.runtime, settings, self.logger)
+            except Exception as e:
+                self.logger.error(f"Could not determine page count for {name}: {str(e)}")
+                continue
+            added = sum(self.scheduler.add_page(name, page) for page in range(1, total_pages + 1))
+            self.logger.info(f"Monitoring {total_pages} pages of {name} ({added} newly scheduled)")
+
+    async def visit(self, task: RevisitTask) -> None:
+        """Fetch one page, reschedule it and write out its records if they are new or changed."""
+        module, settings = self.indexers[task.indexer]
+        try:
+            records = await module.revisit_page(self.runtime, settings, task.page, self.logger)
+        except Exception as e:
+            self.logger.error(f"Revisit of {task.key} failed: {str(e)}")
+            records = None
+
+        fingerprint = fingerprint_records(records) if records is not None else None
+        # The daemon runs instead of a full crawl, so a page's first records are written out too
+        baseline = fingerprint is not None and task.fingerprint is None
+        changed = self.scheduler.complete(task, fingerprint)
+        self.visits += 1
+
+        if changed:
+            self.changes += 1
+        if changed or baseline:
+            self.write_changes(task, records)
+        outcome = "baseline" if baseline else "changed" if changed else "unchanged"
+        self.logger.info(f"Revisited {task.key}: {outcome}, next visit in {task.interval:.0f}s")
+
+    def write_changes(self, task: RevisitTask, records: List[Dict[str, Any]]) -> None:
+        output_file = os.path.join(self.output_dir, f"{task.indexer.lower()}_monitor.jsonl")
+        line = orjson.dumps({"indexer": task.indexer, "page": task.page, "fetched_at": time.time(), "records": records})
+        with open(output_file, "ab") as f:
+            f.write(line)
+            f.write(b"\n")
+
+    async def run(self) -> None:
+        """Run until cancelled, persisting the schedule periodically and on exit."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        restored = self.scheduler.load(self.state_path)
+        self.logger.info(f"Restored {restored} revisit tasks from {self.state_path}")
+
+        in_flight = Semaphore(self.concurrency)
+        running = set()
+        next_discovery = 0.0
+        next_save = time.time() + self.save_interval
+
+        try:
+            while True:
+                now = time.time()
+                if now >= next_discovery:
+                    await self.discover()
+                    next_discovery = now + self.discovery_interval
+                if now >= next_save:
+                    self.scheduler.save(self.state_path)
+                    self.logger.info(f"Monitor stats: {len(self.scheduler)} pages tracked, {self.visits} visits, {self.changes} changes")
+                    next_save = now + self.save_interval
+
+                task = self.scheduler.pop_due(now)
+                if task is None:
+                    next_due = self.scheduler.next_due()
+                    wake_at = min(t for t in (next_due, next_discovery, next_save) if t is not None)
+                    await asyncio.sleep(max(0.0, wake_at - time.time()))
+                    continue
+
+                await in_flight.acquire()
+                visit = asyncio.create_task(self.visit(task))
+                running.add(visit)
+                visit.add_done_callback(lambda done: (running.discard(done), in_flight.release()))
+
+                if self.request_gap:
+                    await asyncio.sleep(self.request_gap)
+        finally:
+            for visit in running:
+                visit.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+            self.scheduler.save(self.state_path)
+            self.logger.info(f"Monitor stopped after {self.visits} visits and {self.changes} changes")
+
+async def run(indexers: Dict[str, Tuple[ModuleType, Dict[str, Any]]], config_dict: Dict[str, Any], runtime: TransportRuntime, logger: logging.Logger) -> None:
+    """
+    Run the monitoring daemon.
+
+    Args:
+        indexers (Dict[str, Tuple[ModuleType, Dict[str, Any]]]): Imported indexer modules and their settings, by name.
+        config_dict (Dict[str, Any]): The configuration dictionary; the `monitor` section tunes scheduling.
+        runtime (TransportRuntime): The shared transport runtime.
+        logger (logging.Logger): Logger instance.
+    """
+    daemon = Daemon(indexers, config_dict.get("monitor", {}), os.path.abspath(config_dict["output_dir"]), runtime, logger)
+    await daemon.run()
@@ -0,0 +1,201 @@
+"""
+Revisit scheduling module for the indexer application.
+
+This module keeps a priority queue of (indexer, page) revisit tasks. Each
+page's revisit interval adapts to how often its content actually changes:
+pages that change are revisited sooner, pages that stay the same are
+backed off towards the maximum interval.
+"""
+
+import os
+import json
+import time
+import heapq
+import random
+import itertools
+from typing import Dict, Any, List, Optional, Tuple
+
+class RevisitTask:
+    """Scheduling state for a single indexer page."""
+
+    __slots__ = ("indexer", "page", "interval", "fingerprint", "visits", "changes", "due")
+
+    def __init__(self, indexer: str, page: int, interval: float, due: float, fingerprint: Optional[str] = None, visits: int = 0, changes: int = 0):
+        self.indexer = indexer
+        self.page = page
+        self.interval = interval
+        self.due = due
+        self.fingerprint = fingerprint
+        self.visits = visits
+        self.changes = changes
+
+    @property
+    def key(self) -> str:
+        return f"{self.indexer}:{self.page}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+class RevisitScheduler:
+    """
+    Priority queue of revisit tasks ordered by due time.
+
+    New pages start with an interval that grows with their depth, so front
+    pages are checked often and deep archive pages rarely. Their first visits
+    are spread at random over `initial_spread` seconds (by default
+    `min_interval`), so discovering many pages at once does not make them
+    all due together, and stay out of step afterwards.
+    """
+
+    def __init__(self, min_interval: float = 300.0, max_interval: float = 86400.0, speedup: float = 0.5, backoff: float = 1.5, initial_spread: Optional[float] = None):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.initial_spread = min_interval if initial_spread is None else initial_spread
+        self.speedup = speedup
+        self.backoff = backoff
+        self.tasks: Dict[str, RevisitTask] = {}
+        self.heap: List[Tuple[float, int, str]] = []
+        self.counter = itertools.count()
+
+    def _push(self, task: RevisitTask) -> None:
+        heapq.heappush(self.heap, (task.due, next(self.counter), task.key))
+
+    def _clamp(self, interval: float) -> float:
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def initial_interval(self, page: int) -> float:
+        """
+        Return the starting revisit interval for a page at a given depth.
+
+        Args:
+            page (int): The 1-based page number.
+
+        Returns:
+            float: The interval in seconds.
+        """
+        return self._clamp(self.min_interval * page)
+
+    def add_page(self, indexer: str, page: int, now: Optional[float] = None) -> bool:
+        """
+        Schedule a page if it is not already tracked.
+
+        Args:
+            indexer (str): The indexer name.
+            page (int): The 1-based page number.
+            now (Optional[float]): Current time; defaults to `time.time()`.
+
+        Returns:
+            bool: True if the page was newly added.
+        """
+        key = f"{indexer}:{page}"
+        if key in self.tasks:
+            return False
+        now = time.time() if now is None else now
+        task = RevisitTask(indexer, page, self.initial_interval(page), now + random.uniform(0, self.initial_spread))
+        self.tasks[key] = task
+        self._push(task)
+        return True
+
+    def pop_due(self, now: Optional[float] = None) -> Optional[RevisitTask]:
+        """
+        Remove and return the next task whose due time has passed.
+
+        Args:
+            now (Optional[float]): Current time; defaults to `time.time()`.
+
+        Returns:
+            Optional[RevisitTask]: The task, or None if nothing is due yet.
+        """
+        now = time.time() if now is None else now
+        while self.heap:
+            due, _, key = self.heap[0]
+            task = self.tasks.get(key)
+            if task is None or task.due != due:
+                heapq.heappop(self.heap)  # Stale entry left behind by a reschedule
+                continue
+            if due > now:
+                return None
+            heapq.heappop(self.heap)
+            return task
+        return None
+
+    def next_due(self) -> Optional[float]:
+        """Return the due time of the earliest task, or None if the queue is empty."""
+        while self.heap:
+            due, _, key = self.heap[0]
+            task = self.tasks.get(key)
+            if task is not None and task.due == due:
+                return due
+            heapq.heappop(self.heap)
+        return None
+
+    def complete(self, task: RevisitTask, fingerprint: Optional[str], now: Optional[float] = None) -> bool:
+        """
+        Record a visit and reschedule the task.
+
+        Args:
+            task (RevisitTask): The task that was visited.
+            fingerprint (Optional[str]): Fingerprint of the page content, or None if the fetch failed.
+            now (Optional[float]): Current time; defaults to `time.time()`.
+
+        Returns:
+            bool: True if the page content changed since the previous visit. The first
+                successful visit only records a baseline and never counts as a change.
+        """
+        now = time.time() if now is None else now
+        changed = False
+
+        if fingerprint is None:
+            task.due = now + self.min_interval
+        else:
+            baseline = task.fingerprint is None
+            changed = not baseline and fingerprint != task.fingerprint
+            task.visits += 1
+            # The first visit keeps the depth-based initial interval until there is something to compare
+            if changed:
+                task.changes += 1
+                task.interval = self._clamp(task.interval * self.speedup)
+            elif not baseline:
+                task.interval = self._clamp(task.interval * self.backoff)
+            task.fingerprint = fingerprint
+            task.due = now + task.interval
+
+        self._push(task)
+        return changed
+
+    def __len__(self) -> int:
+        return len(self.tasks)
+
+    def save(self, path: str) -> None:
+        """
+        Atomically write the scheduling state to a JSON file.
+
+        Args:
+            path (str): Destination file path.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump([task.to_dict() for task in self.tasks.values()], f)
+        os.replace(tmp_path, path)
+
+    def load(self, path: str) -> int:
+        """
+        Restore scheduling state written by `save`.
+
+        Args:
+            path (str): Source file path.
+
+        Returns:
+            int: The number of tasks restored.
+        """
+        if not os.path.exists(path):
+            return 0
+        with open(path, "r", encoding="utf-8") as f:
+            saved_tasks = json.load(f)
+        for saved in saved_tasks:
+            task = RevisitTask(**saved)
+            task.interval = self._clamp(task.interval)
+            self.tasks[task.key] = task
+            self._push(task)
+        return len(saved_tasks)
@@ -0,0 +1,163 @@
+"""
+Preflight module for the indexer application.
+
+This module runs the startup checks concurrently rather than one after
+another: configuration validation, importing every indexer script, and
+probing FlareSolverr, each site's base URL and its mirrors. Misconfiguration is reported
+before any crawling starts, together with a timing breakdown of each step.
+Probes go through the shared transport runtime, so the connections and DNS
+entries they open are reused by the crawl.
+"""
+
+import time
+import asyncio
+import logging
+import importlib
+from types import ModuleType
+from typing import Dict, Any, Optional, Tuple
+
+import aiohttp
+from aiohttp import ClientSession
+
+from validate import validate_config
+from runtime import TransportRuntime
+
+DEFAULT_PROBE_TIMEOUT = 5.0
+
+def needs_flaresolverr(indexer_settings: Dict[str, Any]) -> bool:
+    """
+    Check whether an indexer fetches its pages through FlareSolverr.
+
+    Indexers use FlareSolverr unless their script settings set `"flaresolverr": false`.
+
+    Args:
+        indexer_settings (Dict[str, Any]): The indexer's entry in supported_indexes.json.
+
+    Returns:
+        bool: True if the indexer needs FlareSolverr.
+    """
+    return indexer_settings.get("script_settings", {}).get("flaresolverr", True) is not False
+
+async def timed(name: str, coroutine, timings: Dict[str, float]) -> Any:
+    started = time.perf_counter()
+    try:
+        return await coroutine
+    finally:
+        timings[name] = round((time.perf_counter() - started) * 1000, 2)
+
+async def import_indexer(name: str) -> Optional[ModuleType]:
+    """
+    Import an indexer script in a worker thread.
+
+    Args:
+        name (str): The indexer name, matching a module in ./indexers/.
+
+    Returns:
+        Optional[ModuleType]: The module, or None if no such script exists.
+    """
+    try:
+        return await asyncio.get_event_loop().run_in_executor(None, importlib.import_module, f".{name}", "indexers")
+    except ModuleNotFoundError:
+        return None
+
+async def probe(session: ClientSession, url: str, timeout: float, method: str = "GET") -> Tuple[bool, Optional[int]]:
+    """
+    Check that a URL answers at all, resolving DNS and opening a connection on the way.
+
+    Args:
+        session (ClientSession): The HTTP session.
+        url (str): The URL to probe.
+        timeout (float): Seconds to wait before giving up.
+        method (str): HTTP method to use.
+
+    Returns:
+        Tuple[bool, Optional[int]]: Whether a response arrived, and its status code.
+    """
+    try:
+        async with session.request(method, url, timeout=aiohttp.ClientTimeout(total=timeout), allow_redirects=False) as response:
+            return True, response.status
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        return False, None
+
+async def run(config_dict: Dict[str, Any], list_of_indexers: Dict[str, Any], runtime: TransportRuntime, logger: logging.Logger) -> Dict[str, Any]:
+    """
+    Run every startup check concurrently.
+
+    Args:
+        config_dict (Dict[str, Any]): The configuration dictionary.
+        list_of_indexers (Dict[str, Any]): The contents of supported_indexes.json.
+        runtime (TransportRuntime): The shared transport runtime.
+        logger (logging.Logger): Logger instance.
+
+    Returns:
+        Dict[str, Any]: The imported indexer `modules` by name, whether FlareSolverr is
+            available, the status of each site's base URL and the `timings` of each step in milliseconds.
+            Indexers that need an unreachable FlareSolverr are left out of `modules`.
+
+    Raises:
+        ConfigValidationError: If the configuration is invalid.
+    """
+    started = time.perf_counter()
+    timings: Dict[str, float] = {}
+    timeout = config_dict.get("preflight", {}).get("timeout", DEFAULT_PROBE_TIMEOUT)
+
+    session = runtime.session
+    validation = asyncio.ensure_future(timed("validate_config", validate_config(config_dict), timings))
+    imports = {name: asyncio.ensure_future(timed(f"import:{name}", import_indexer(name), timings)) for name in list_of_indexers}
+
+    flaresolverr_url = config_dict.get("flaresolverr", {}).get("url")
+    flaresolverr_probe = None
+    if flaresolverr_url and any(needs_flaresolverr(settings) for settings in list_of_indexers.values()):
+        flaresolverr_probe = asyncio.ensure_future(timed("probe:flaresolverr", probe(session, flaresolverr_url, timeout), timings))
+
+    mirror_probes = [
+        asyncio.ensure_future(timed(f"probe:mirrors:{name}", pool.probe(runtime), timings))
+        for name, pool in runtime.mirror_pools.items()
+    ]
+
+    site_probes = {
+        name: asyncio.ensure_future(timed(f"probe:{name}", probe(session, settings["base_url"], timeout, "HEAD"), timings))
+        for name, settings in list_of_indexers.items() if settings.get("base_url")
+    }
+
+    pending = [*imports.values(), *site_probes.values(), *mirror_probes] + ([flaresolverr_probe] if flaresolverr_probe else [])
+    try:
+        await validation
+    except Exception:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        raise
+
+    await asyncio.gather(*pending)
+
+    modules = {}
+    for name, task in imports.items():
+        module = task.result()
+        if module is None:
+            logger.error(f"Was not able to find the Indexer script from path: './indexers/{name}'")
+        else:
+            modules[name] = module
+
+    flaresolverr_available = None
+    if flaresolverr_probe is not None:
+        reachable, status = flaresolverr_probe.result()
+        flaresolverr_available = reachable and status in (200, 405)
+        if not flaresolverr_available:
+            # Indexers that fetch directly can still run
+            skipped = [name for name in modules if needs_flaresolverr(list_of_indexers[name])]
+            for name in skipped:
+                del modules[name]
+            logger.error(f"FlareSolverr is not reachable at {flaresolverr_url} (status: {status}); skipping the indexers that need it: {', '.join(skipped)}")
+
+    sites = {}
+    for name, task in site_probes.items():
+        reachable, status = task.result()
+        sites[name] = status
+        if not reachable:
+            # Sites behind anti-bot protection may refuse direct requests, so this is only a warning
+            logger.warning(f"Base URL for {name} did not respond within {timeout}s: {list_of_indexers[name]['base_url']}")
+
+    timings["total"] = round((time.perf_counter() - started) * 1000, 2)
+    logger.info(f"Preflight completed in {timings['total']}ms: {timings}")
+    return {"modules": modules, "flaresolverr_available": flaresolverr_available, "sites": sites, "timings": timings}
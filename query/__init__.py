@@ -0,0 +1,3 @@
+from .query_index import QueryIndex
+from .loader import OutputLoader
+from .server import serve
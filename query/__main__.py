@@ -0,0 +1,78 @@
+"""
+Command line interface for the query service.
+
+Usage:
+    python -m query [--output-dir DIR] search "the matrix" [--limit N] [filters]
+    python -m query [--output-dir DIR] list [--limit N] [filters]
+    python -m query [--output-dir DIR] top [--n N] [filters]
+    python -m query [--output-dir DIR] serve [--host HOST] [--port PORT]
+
+Filters are --year, --uploader, --category and --source.
+"""
+
+import sys
+import time
+import argparse
+import logging
+
+import orjson
+
+from .loader import OutputLoader
+from .query_index import QueryIndex
+from .server import serve
+
+def add_filters(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--year", type=int)
+    parser.add_argument("--uploader")
+    parser.add_argument("--category")
+    parser.add_argument("--source")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m query", description="Query the crawled index.")
+    parser.add_argument("--output-dir", default="./output/", help="Directory holding the crawl outputs")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    search_parser = subparsers.add_parser("search", help="Fuzzy title lookup")
+    search_parser.add_argument("title")
+    search_parser.add_argument("--limit", type=int, default=20)
+    add_filters(search_parser)
+
+    list_parser = subparsers.add_parser("list", help="Filtered listing")
+    list_parser.add_argument("--limit", type=int, default=100)
+    add_filters(list_parser)
+
+    top_parser = subparsers.add_parser("top", help="Top N by seeders")
+    top_parser.add_argument("--n", type=int, default=10)
+    add_filters(top_parser)
+
+    serve_parser = subparsers.add_parser("serve", help="Serve the index over HTTP on localhost")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8765)
+    serve_parser.add_argument("--reload-interval", type=float, default=5.0)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    logger = logging.getLogger("query")
+
+    started = time.perf_counter()
+    index = QueryIndex(OutputLoader(args.output_dir, logger), logger)
+    index.reload()
+    logger.info(f"Loaded {len(index)} records in {time.perf_counter() - started:.2f} seconds")
+
+    if args.command == "serve":
+        serve(index, args.host, args.port, args.reload_interval, logger)
+        return
+
+    filters = {key: getattr(args, key) for key in ("year", "uploader", "category", "source") if getattr(args, key) is not None}
+    if args.command == "search":
+        results = index.search(args.title, args.limit, **filters)
+    elif args.command == "list":
+        results = index.listing(args.limit, **filters)
+    else:
+        results = index.top_by_seeders(args.n, **filters)
+
+    sys.stdout.buffer.write(orjson.dumps(results, option=orjson.OPT_INDENT_2))
+    sys.stdout.write("\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Crawl output loading module for the query service.
+
+This module reads indexer outputs from the output directory and tracks
+what has already been loaded, so that reloads only parse new data:
+appended JSON-lines files are read from their previous end offset, and
+whole-document JSON files are re-read only when they change.
+"""
+
+import os
+import mmap
+import logging
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+import orjson
+
+# Known output files and the source name their records are indexed under
+JSON_OUTPUTS = {"one_three_three_seven_x.json": "1337x"}
+JSONL_OUTPUTS = {"yts.json": "YTS"}
+MONITOR_SUFFIX = "_monitor.jsonl"
+HEAD_BYTES = 256
+
+def iter_json_lines(path: str, offset: int = 0) -> Iterator[Tuple[Any, int]]:
+    """
+    Memory-map a JSON-lines file and decode each complete line from an offset.
+
+    Args:
+        path (str): The file path.
+        offset (int): Byte offset to start reading from.
+
+    Yields:
+        Tuple[Any, int]: Each decoded value and the offset just past its line.
+            A trailing partial line (still being written) is left for the next call.
+    """
+    if os.path.getsize(path) <= offset:
+        return
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        position = offset
+        while True:
+            end = mapped.find(b"\n", position)
+            if end == -1:
+                break
+            line = mapped[position:end]
+            position = end + 1
+            if line.strip():
+                yield orjson.loads(line), position
+
+class OutputLoader:
+    """
+    Incrementally loads records from the crawl output directory.
+
+    `poll` returns only what changed since the previous call, as a mapping
+    from source key to either new records to append or a full replacement.
+    """
+
+    def __init__(self, output_dir: str, logger: Optional[logging.Logger] = None):
+        self.output_dir = os.path.abspath(output_dir)
+        self.logger = logger or logging.getLogger(__name__)
+        self.offsets: Dict[str, int] = {}
+        self.signatures: Dict[str, Tuple[float, int]] = {}
+        self.heads: Dict[str, bytes] = {}
+
+    def _signature(self, path: str) -> Tuple[float, int]:
+        stat = os.stat(path)
+        return stat.st_mtime, stat.st_size
+
+    def _read_head(self, path: str, length: int) -> bytes:
+        with open(path, "rb") as f:
+            return f.read(length)
+
+    def _poll_json(self, path: str, source: str) -> Optional[List[Dict[str, Any]]]:
+        signature = self._signature(path)
+        if self.signatures.get(path) == signature:
+            return None
+        with open(path, "rb") as f:
+            records = orjson.loads(f.read())
+        self.signatures[path] = signature
+        return [dict(record, _source=source) for record in records]
+
+    def _poll_jsonl(self, path: str, source: str, monitor: bool) -> Tuple[bool, List[Dict[str, Any]]]:
+        signature = self._signature(path)
+        previous = self.signatures.get(path)
+        if previous == signature:
+            return False, []
+
+        # A file that shrank or was rewritten in place has to be read again from the start
+        head = self.heads.get(path, b"")
+        replaced = previous is not None and (signature[1] < self.offsets.get(path, 0) or self._read_head(path, len(head)) != head)
+        offset = 0 if replaced or previous is None else self.offsets.get(path, 0)
+
+        records = []
+        for value, position in iter_json_lines(path, offset):
+            if monitor:
+                records.extend(dict(record, _source=value.get("indexer", source)) for record in value.get("records", []))
+            else:
+                records.append(dict(value, _source=source))
+            offset = position
+
+        self.offsets[path] = offset
+        self.signatures[path] = signature
+        self.heads[path] = self._read_head(path, min(HEAD_BYTES, offset))
+        return replaced or previous is None, records
+
+    def poll(self) -> Dict[str, Tuple[str, List[Dict[str, Any]]]]:
+        """
+        Load whatever changed in the output directory since the last poll.
+
+        Returns:
+            Dict[str, Tuple[str, List[Dict[str, Any]]]]: For each changed file, a mode of
+                "replace" or "append" and the records to apply.
+        """
+        changes: Dict[str, Tuple[str, List[Dict[str, Any]]]] = {}
+        if not os.path.isdir(self.output_dir):
+            return changes
+
+        for filename in sorted(os.listdir(self.output_dir)):
+            path = os.path.join(self.output_dir, filename)
+            try:
+                if filename in JSON_OUTPUTS:
+                    records = self._poll_json(path, JSON_OUTPUTS[filename])
+                    if records is not None:
+                        changes[path] = ("replace", records)
+                elif filename in JSONL_OUTPUTS or filename.endswith(MONITOR_SUFFIX):
+                    source = JSONL_OUTPUTS.get(filename, filename[:-len(MONITOR_SUFFIX)])
+                    replace, records = self._poll_jsonl(path, source, filename.endswith(MONITOR_SUFFIX))
+                    if replace:
+                        changes[path] = ("replace", records)
+                    elif records:
+                        changes[path] = ("append", records)
+            except (OSError, ValueError) as e:
+                self.logger.error(f"Could not load crawl output {path}: {str(e)}")
+
+        return changes
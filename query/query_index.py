@@ -0,0 +1,406 @@
+"""
+Query index module for the query service.
+
+This module builds in-memory inverted indexes over crawled records, on
+title tokens, year, uploader, category and source, and answers fuzzy title
+lookups, filtered listings and top-N-by-seeders queries against them.
+
+Documents are also kept ordered by seeders, globally and per filter value,
+so top-N queries read only the head of one ordering instead of every
+matching document.
+"""
+
+import bisect
+import heapq
+import itertools
+import logging
+from collections import defaultdict
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+
+from dedup.keys import canonical_link, split_title_year
+from relevance.title_index import tokenize
+from .loader import OutputLoader
+
+MIN_TRIGRAM_OVERLAP = 0.5
+# Upper bound on the documents scored for one title search
+MAX_CANDIDATES = 1000
+# How far down the seeders ordering a search looks for documents holding a common word
+MAX_SEEDERS_WALK = 50_000
+
+def trigrams(token: str) -> Set[str]:
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def summarize(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extract the indexed fields from a 1337x or YTS record.
+
+    Args:
+        record (Dict[str, Any]): A crawled record.
+
+    Returns:
+        Dict[str, Any]: The document, holding the indexed fields and the original record.
+    """
+    title = record.get("title") or record.get("name") or ""
+    year = record.get("year")
+    if not year:
+        title, year = split_title_year(title)
+
+    torrents = record.get("torrents") or []
+    seeders = max((torrent.get("swarm", {}).get("seeders", torrent.get("seeds", 0)) or 0 for torrent in torrents), default=0)
+
+    return {
+        "source": record.get("_source", "unknown"),
+        "title": title,
+        "year": int(year) if year else None,
+        "categories": [category.lower() for category in record.get("categories") or record.get("genres") or []],
+        "uploaders": sorted({torrent["uploader"].lower() for torrent in torrents if torrent.get("uploader")}),
+        "seeders": seeders,
+        "link": record.get("movie_page") or record.get("url") or record.get("link"),
+        "record": record,
+    }
+
+class SeedersOrder:
+    """
+    Document IDs of one posting list, ordered by seeders (highest first).
+
+    Additions are buffered and merged on the next read, by insertion when
+    they are few and by a re-sort after a bulk load. Removed documents are
+    skipped by readers and compacted away once they make up half the list.
+    """
+
+    def __init__(self):
+        self.entries: List[Tuple[int, int]] = []
+        self.pending: List[Tuple[int, int]] = []
+        self.removed = 0
+
+    def add(self, seeders: int, doc_id: int) -> None:
+        self.pending.append((-seeders, doc_id))
+
+    def discard(self) -> None:
+        self.removed += 1
+
+    def ordered(self, docs: Dict[int, Any]) -> List[Tuple[int, int]]:
+        """Return the (-seeders, doc_id) entries in order; IDs missing from `docs` must be skipped."""
+        if self.pending:
+            if len(self.pending) * 16 < len(self.entries):
+                for entry in self.pending:
+                    bisect.insort(self.entries, entry)
+            else:
+                self.entries.extend(self.pending)
+                self.entries.sort()
+            self.pending = []
+        if self.removed * 2 > len(self.entries):
+            self.entries = [entry for entry in self.entries if entry[1] in docs]
+            self.removed = 0
+        return self.entries
+
+class QueryIndex:
+    """
+    Inverted indexes over crawled records with incremental reload.
+
+    Each record is identified by its source and canonical link. The records
+    each output file holds for one identity are merged, later fields over
+    earlier ones, so a monitoring daemon's list-page row updates the full
+    crawl's record without dropping the torrents it has no copy of.
+    """
+
+    def __init__(self, loader: Optional[OutputLoader] = None, logger: Optional[logging.Logger] = None):
+        self.loader = loader
+        self.logger = logger or logging.getLogger(__name__)
+        self.docs: Dict[int, Dict[str, Any]] = {}
+        self.doc_tokens: Dict[int, Set[str]] = {}
+        self.ids_by_identity: Dict[str, int] = {}
+        # The record each output file holds for an identity, oldest first
+        self.parts: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.ids_by_path: Dict[str, Set[int]] = defaultdict(set)
+        self.tokens: Dict[str, Set[int]] = defaultdict(set)
+        self.token_trigrams: Dict[str, Set[str]] = defaultdict(set)
+        self.fields: Dict[str, Dict[Any, Set[int]]] = {name: defaultdict(set) for name in ("year", "uploader", "category", "source")}
+        # Seeders orderings: None for all documents, (field, value) for each filter value
+        self.by_seeders: Dict[Optional[Tuple[str, Any]], SeedersOrder] = defaultdict(SeedersOrder)
+        self.next_id = 0
+
+    def _field_values(self, doc: Dict[str, Any]) -> Iterable[tuple]:
+        yield "source", doc["source"].lower()
+        if doc["year"]:
+            yield "year", doc["year"]
+        for uploader in doc["uploaders"]:
+            yield "uploader", uploader
+        for category in doc["categories"]:
+            yield "category", category
+
+    def add(self, record: Dict[str, Any], path: str = "") -> int:
+        """
+        Index a record, merging it over the records other files hold for the same identity.
+
+        Args:
+            record (Dict[str, Any]): The crawled record.
+            path (str): The output file the record came from; it replaces that file's earlier record.
+
+        Returns:
+            int: The document ID.
+        """
+        doc = summarize(record)
+        identity = f"{doc['source']}|{canonical_link(doc['link']) if doc['link'] else doc['title']}"
+        parts = self.parts.setdefault(identity, {})
+        parts.pop(path, None)
+        parts[path] = record
+        if identity in self.ids_by_identity:
+            self._unindex(self.ids_by_identity[identity])
+        return self._index(identity)
+
+    def _index(self, identity: str) -> int:
+        parts = self.parts[identity]
+        if len(parts) == 1:
+            record = next(iter(parts.values()))
+        else:
+            record = {}
+            for part in parts.values():
+                record.update(part)
+        doc = summarize(record)
+
+        doc_id = self.next_id
+        self.next_id += 1
+        doc["identity"] = identity
+        doc["paths"] = list(parts)
+        self.docs[doc_id] = doc
+        self.ids_by_identity[identity] = doc_id
+        for path in doc["paths"]:
+            self.ids_by_path[path].add(doc_id)
+
+        token_set = set(tokenize(doc["title"]))
+        self.doc_tokens[doc_id] = token_set
+        for token in token_set:
+            if token not in self.tokens:
+                for trigram in trigrams(token):
+                    self.token_trigrams[trigram].add(token)
+            self.tokens[token].add(doc_id)
+
+        self.by_seeders[None].add(doc["seeders"], doc_id)
+        for field, value in self._field_values(doc):
+            self.fields[field][value].add(doc_id)
+            self.by_seeders[(field, value)].add(doc["seeders"], doc_id)
+        return doc_id
+
+    def remove(self, doc_id: int) -> None:
+        """Remove a document from every index. Trigram entries are kept, as vocabulary only grows."""
+        doc = self._unindex(doc_id)
+        if doc is not None:
+            self.parts.pop(doc["identity"], None)
+
+    def remove_path(self, path: str) -> None:
+        """Drop every record an output file contributed, re-indexing documents other files still hold."""
+        for doc_id in list(self.ids_by_path.pop(path, ())):
+            doc = self._unindex(doc_id)
+            if doc is None:
+                continue
+            parts = self.parts[doc["identity"]]
+            parts.pop(path, None)
+            if parts:
+                self._index(doc["identity"])
+            else:
+                del self.parts[doc["identity"]]
+
+    def _unindex(self, doc_id: int) -> Optional[Dict[str, Any]]:
+        doc = self.docs.pop(doc_id, None)
+        if doc is None:
+            return None
+        self.ids_by_identity.pop(doc["identity"], None)
+        for path in doc["paths"]:
+            if path in self.ids_by_path:
+                self.ids_by_path[path].discard(doc_id)
+        for token in self.doc_tokens.pop(doc_id, ()):
+            self.tokens[token].discard(doc_id)
+        self.by_seeders[None].discard()
+        for field, value in self._field_values(doc):
+            self.fields[field][value].discard(doc_id)
+            self.by_seeders[(field, value)].discard()
+        return doc
+
+    def reload(self) -> int:
+        """
+        Apply any changes in the crawl outputs since the last reload.
+
+        Returns:
+            int: The number of records added.
+        """
+        if self.loader is None:
+            return 0
+
+        added = 0
+        for path, (mode, records) in self.loader.poll().items():
+            if mode == "replace":
+                self.remove_path(path)
+            for record in records:
+                self.add(record, path)
+            added += len(records)
+            self.logger.info(f"Indexed {len(records)} records from {path} ({mode})")
+        return added
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def _expand(self, token: str) -> Set[str]:
+        if self.tokens.get(token):
+            return {token}
+        # Unknown token: fall back to vocabulary entries sharing most of its trigrams
+        query_trigrams = trigrams(token)
+        overlap: Dict[str, int] = defaultdict(int)
+        for trigram in query_trigrams:
+            for candidate in self.token_trigrams.get(trigram, ()):
+                overlap[candidate] += 1
+        return {
+            candidate for candidate, shared in overlap.items()
+            if shared / max(len(query_trigrams), len(trigrams(candidate))) >= MIN_TRIGRAM_OVERLAP and self.tokens.get(candidate)
+        }
+
+    def _constraints(self, year: Optional[int] = None, uploader: Optional[str] = None, category: Optional[str] = None, source: Optional[str] = None) -> Optional[List[Tuple[Tuple[str, Any], Set[int]]]]:
+        # The posting of each given filter value, most selective first; None if one matches nothing
+        values = [("year", year), ("uploader", uploader.lower() if uploader else None), ("category", category.lower() if category else None), ("source", source.lower() if source else None)]
+        constraints = []
+        for field, value in values:
+            if value is None:
+                continue
+            ids = self.fields[field].get(value)
+            if not ids:
+                return None
+            constraints.append(((field, value), ids))
+        return sorted(constraints, key=lambda constraint: len(constraint[1]))
+
+    def _by_seeders(self, key: Optional[Tuple[str, Any]], allowed: List[Set[int]]) -> Iterable[int]:
+        # Live documents of one seeders ordering, most seeded first, that are in every `allowed` posting
+        order = self.by_seeders.get(key)
+        if order is None:
+            return
+        for _, doc_id in order.ordered(self.docs):
+            if doc_id in self.docs and all(doc_id in ids for ids in allowed):
+                yield doc_id
+
+    def _result(self, doc_id: int, score: Optional[float] = None) -> Dict[str, Any]:
+        doc = self.docs[doc_id]
+        result = {key: doc[key] for key in ("source", "title", "year", "categories", "uploaders", "seeders", "link")}
+        if score is not None:
+            result["score"] = round(score, 4)
+        return result
+
+    def _candidates(self, terms: List[List[Set[int]]]) -> Set[int]:
+        # Words are taken rarest first until the candidates would exceed MAX_CANDIDATES; the remaining,
+        # common words only contribute their most-seeded documents instead of every one of them
+        candidates: Set[int] = set()
+        common: List[Set[int]] = []
+        for postings in terms:
+            if common or len(candidates) + sum(map(len, postings)) > MAX_CANDIDATES:
+                common.extend(postings)
+                continue
+            for ids in postings:
+                candidates |= ids
+
+        if common:
+            found = 0
+            for _, doc_id in itertools.islice(self.by_seeders[None].ordered(self.docs), MAX_SEEDERS_WALK):
+                for ids in common:
+                    if doc_id in ids:
+                        candidates.add(doc_id)
+                        found += 1
+                        break
+                if found == MAX_CANDIDATES:
+                    break
+        return candidates
+
+    def search(self, title: str, limit: int = 20, **filters: Any) -> List[Dict[str, Any]]:
+        """
+        Fuzzy title lookup, tolerant of typos in individual words.
+
+        At most MAX_CANDIDATES documents are scored. Documents holding any of the
+        rarer query words are always scored; for words too common to score every
+        holder, only their most-seeded documents are. A filter selective enough to
+        bound the candidates by itself keeps the search exhaustive.
+
+        Args:
+            title (str): The title to search for.
+            limit (int): Maximum number of results.
+            **filters: Optional `year`, `uploader`, `category` and `source` constraints.
+
+        Returns:
+            List[Dict[str, Any]]: Matching documents with a `score`, best first.
+        """
+        query_tokens = set(tokenize(title))
+        if not query_tokens:
+            return []
+
+        constraints = self._constraints(**filters)
+        if constraints is None:
+            return []
+        allowed = [ids for _, ids in constraints]
+
+        # Each query word matches the postings of its (possibly fuzzy) expansions
+        terms = [[self.tokens[expanded] for expanded in self._expand(token)] for token in query_tokens]
+        terms = sorted((postings for postings in terms if postings), key=lambda postings: sum(map(len, postings)))
+        if not terms:
+            return []
+
+        candidates = allowed[0] if allowed and len(allowed[0]) <= MAX_CANDIDATES else self._candidates(terms)
+
+        scored = []
+        for doc_id in candidates:
+            if doc_id not in self.docs or not all(doc_id in ids for ids in allowed):
+                continue
+            count = 0
+            for postings in terms:
+                for ids in postings:
+                    if doc_id in ids:
+                        count += 1
+                        break
+            if count:
+                scored.append((2 * count / (len(query_tokens) + len(self.doc_tokens[doc_id])), doc_id))
+
+        best = heapq.nlargest(limit, scored, key=lambda pair: (pair[0], self.docs[pair[1]]["seeders"]))
+        return [self._result(doc_id, score) for score, doc_id in best]
+
+    def listing(self, limit: int = 100, **filters: Any) -> List[Dict[str, Any]]:
+        """
+        List documents matching field filters.
+
+        Args:
+            limit (int): Maximum number of results.
+            **filters: Optional `year`, `uploader`, `category` and `source` constraints.
+
+        Returns:
+            List[Dict[str, Any]]: Matching documents, in indexing order.
+        """
+        constraints = self._constraints(**filters)
+        if constraints is None:
+            return []
+        if not constraints:
+            # Document IDs only grow, so the documents dictionary is already in indexing order
+            return [self._result(doc_id) for doc_id in itertools.islice(self.docs, limit)]
+
+        allowed = [ids for _, ids in constraints]
+        if limit * len(self.docs) < len(allowed[0]) ** 2:
+            # Dense filters: walking the documents in order reaches `limit` matches before the end of the posting would
+            ids = itertools.islice((doc_id for doc_id in self.docs if all(doc_id in posting for posting in allowed)), limit)
+        else:
+            ids = heapq.nsmallest(limit, (doc_id for doc_id in allowed[0] if all(doc_id in posting for posting in allowed[1:])))
+        return [self._result(doc_id) for doc_id in ids]
+
+    def top_by_seeders(self, n: int = 10, **filters: Any) -> List[Dict[str, Any]]:
+        """
+        Return the most-seeded documents matching field filters.
+
+        Reads the seeders ordering of the most selective filter value, or of
+        all documents, until `n` documents pass the other filters.
+
+        Args:
+            n (int): Number of results.
+            **filters: Optional `year`, `uploader`, `category` and `source` constraints.
+
+        Returns:
+            List[Dict[str, Any]]: Documents with the most seeders, highest first.
+        """
+        constraints = self._constraints(**filters)
+        if constraints is None:
+            return []
+        key = constraints[0][0] if constraints else None
+        allowed = [ids for _, ids in constraints[1:]]
+        return [self._result(doc_id) for doc_id in itertools.islice(self._by_seeders(key, allowed), n)]
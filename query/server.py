@@ -0,0 +1,120 @@
+"""
+HTTP endpoint module for the query service.
+
+This module serves the query index on localhost as a small JSON API:
+
+    GET /search?q=<title>[&limit=&year=&uploader=&category=&source=]
+    GET /list[?limit=&year=&uploader=&category=&source=]
+    GET /top[?n=&year=&uploader=&category=&source=]
+    GET /stats
+
+New crawl outputs are picked up at most once every `reload_interval` seconds.
+"""
+
+import time
+import logging
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Any, Callable, Optional
+from urllib.parse import urlparse, parse_qs
+
+import orjson
+
+from .query_index import QueryIndex
+
+FILTER_PARAMS = ("uploader", "category", "source")
+
+def parse_filters(params: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Extract field filters from query parameters.
+
+    Args:
+        params (Dict[str, str]): Single-valued query parameters.
+
+    Returns:
+        Dict[str, Any]: Keyword arguments for the QueryIndex query methods.
+
+    Raises:
+        ValueError: If `year` is not an integer.
+    """
+    filters: Dict[str, Any] = {key: params[key] for key in FILTER_PARAMS if params.get(key)}
+    if params.get("year"):
+        filters["year"] = int(params["year"])
+    return filters
+
+class QueryService:
+    """Thread-safe wrapper that reloads the index before answering queries."""
+
+    def __init__(self, index: QueryIndex, reload_interval: float = 5.0):
+        self.index = index
+        self.reload_interval = reload_interval
+        self.lock = threading.Lock()
+        self.last_reload = 0.0
+
+    def query(self, method: Callable, *args: Any, **kwargs: Any) -> Any:
+        with self.lock:
+            if time.monotonic() - self.last_reload >= self.reload_interval:
+                self.index.reload()
+                self.last_reload = time.monotonic()
+            return method(*args, **kwargs)
+
+def make_handler(service: QueryService, logger: logging.Logger):
+    class QueryRequestHandler(BaseHTTPRequestHandler):
+        def _send(self, status: int, payload: Any) -> None:
+            body = orjson.dumps(payload)
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self) -> None:
+            parsed = urlparse(self.path)
+            params = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+            started = time.perf_counter()
+            try:
+                filters = parse_filters(params)
+                if parsed.path == "/search":
+                    if not params.get("q"):
+                        return self._send(400, {"error": "Missing 'q' parameter"})
+                    results = service.query(service.index.search, params["q"], int(params.get("limit", 20)), **filters)
+                elif parsed.path == "/list":
+                    results = service.query(service.index.listing, int(params.get("limit", 100)), **filters)
+                elif parsed.path == "/top":
+                    results = service.query(service.index.top_by_seeders, int(params.get("n", 10)), **filters)
+                elif parsed.path == "/stats":
+                    return self._send(200, {"documents": service.query(len, service.index)})
+                else:
+                    return self._send(404, {"error": f"Unknown endpoint: {parsed.path}"})
+            except ValueError as e:
+                return self._send(400, {"error": str(e)})
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self._send(200, {"results": results, "count": len(results), "elapsed_ms": round(elapsed_ms, 3)})
+
+        def log_message(self, format: str, *args: Any) -> None:
+            logger.info(f"{self.address_string()} - {format % args}")
+
+    return QueryRequestHandler
+
+def serve(index: QueryIndex, host: str = "127.0.0.1", port: int = 8765, reload_interval: float = 5.0, logger: Optional[logging.Logger] = None) -> None:
+    """
+    Serve the query index over HTTP until interrupted.
+
+    Args:
+        index (QueryIndex): The index to serve.
+        host (str): Interface to bind; localhost by default.
+        port (int): Port to listen on.
+        reload_interval (float): Minimum seconds between reloads of the crawl outputs.
+        logger (Optional[logging.Logger]): Logger instance.
+    """
+    logger = logger or logging.getLogger(__name__)
+    service = QueryService(index, reload_interval)
+    server = ThreadingHTTPServer((host, port), make_handler(service, logger))
+    logger.info(f"Query service listening on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,2 @@
+from .title_index import TitleIndex
+from .prefilter import Prefilter, load_watchlist, from_settings as prefilter_from_settings
@@ -0,0 +1,104 @@
+"""
+Relevance prefilter module for the indexer application.
+
+This module checks list-page titles against a watchlist of protected works
+so that only likely matches are queued for detail fetching.
+"""
+
+import os
+import json
+import logging
+from typing import Dict, Any, List, Optional
+
+from exceptions import ConfigurationError
+from .title_index import TitleIndex
+
+def load_watchlist(path: str) -> TitleIndex:
+    """
+    Load a watchlist of protected works into a title index.
+
+    The file must contain a JSON list whose entries are either title
+    strings or objects with a `title` and optional `year`.
+
+    Args:
+        path (str): Path to the watchlist JSON file.
+
+    Returns:
+        TitleIndex: The index of protected works.
+
+    Raises:
+        ConfigurationError: If the file is missing or malformed.
+    """
+    if not os.path.exists(path):
+        raise ConfigurationError(f"Watchlist file does not exist: {path}")
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            works = json.load(f)
+    except json.JSONDecodeError:
+        raise ConfigurationError(f"Invalid JSON in watchlist file: {path}")
+
+    if not isinstance(works, list):
+        raise ConfigurationError(f"Watchlist file must contain a JSON list: {path}")
+
+    index = TitleIndex()
+    for work in works:
+        if isinstance(work, str):
+            index.add(work)
+        elif isinstance(work, dict) and isinstance(work.get("title"), str):
+            index.add(work["title"], work.get("year"), work)
+        else:
+            raise ConfigurationError(f"Invalid watchlist entry in {path}: {work}")
+    return index
+
+class Prefilter:
+    """Selects items whose titles match the watchlist, best matches first."""
+
+    def __init__(self, index: TitleIndex, threshold: float = 0.6, logger: Optional[logging.Logger] = None):
+        self.index = index
+        self.threshold = threshold
+        self.logger = logger or logging.getLogger(__name__)
+
+    def select(self, items: List[Dict[str, Any]], title_key: str = "name") -> List[Dict[str, Any]]:
+        """
+        Keep only items scoring at or above the threshold, ordered by score.
+
+        Each kept item gains a `relevance` entry holding its score and the
+        matched watchlist work.
+
+        Args:
+            items (List[Dict[str, Any]]): List-page items.
+            title_key (str): The item field holding the title.
+
+        Returns:
+            List[Dict[str, Any]]: The selected items, best match first.
+        """
+        scored = []
+        for item in items:
+            score, work = self.index.best_match(item.get(title_key, ""), item.get("year"))
+            if work is not None and score >= self.threshold:
+                item["relevance"] = {"score": round(score, 4), "match": work}
+                scored.append((score, item))
+
+        scored.sort(key=lambda pair: pair[0], reverse=True)
+        self.logger.info(f"Relevance prefilter kept {len(scored)}/{len(items)} items at threshold {self.threshold}")
+        return [item for _, item in scored]
+
+def from_settings(settings: Dict[str, Any], logger: logging.Logger) -> Optional[Prefilter]:
+    """
+    Create a prefilter from the `prefilter` configuration section.
+
+    Args:
+        settings (Dict[str, Any]): The configuration dictionary.
+        logger (logging.Logger): Logger instance.
+
+    Returns:
+        Optional[Prefilter]: The prefilter, or None if prefiltering is disabled.
+    """
+    prefilter_settings = settings.get("prefilter", {})
+    if not prefilter_settings.get("enabled", False):
+        return None
+
+    index = load_watchlist(os.path.abspath(prefilter_settings["watchlist_path"]))
+    logger.info(f"Loaded watchlist of {len(index)} protected works")
+    return Prefilter(index, prefilter_settings.get("threshold", 0.6), logger)
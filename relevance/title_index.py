@@ -0,0 +1,120 @@
+"""
+Title index module for the indexer application.
+
+This module provides an inverted index over normalised title tokens, used
+to match scraped titles against a watchlist of protected works quickly.
+"""
+
+from collections import defaultdict
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from dedup.keys import normalize_title, split_title_year
+
+STOPWORDS = frozenset({"the", "a", "an", "of", "and", "in", "on", "to", "at", "for"})
+YEAR_MISMATCH_PENALTY = 0.5
+
+def tokenize(title: str) -> List[str]:
+    """
+    Split a title into normalised tokens.
+
+    Args:
+        title (str): The raw title.
+
+    Returns:
+        List[str]: The tokens, in order.
+    """
+    return normalize_title(title).split()
+
+class TitleIndex:
+    """
+    Inverted index from title tokens to indexed entries.
+
+    Entries are scored against a query by the Dice coefficient of their
+    token sets, halved when both sides carry a release year that differs.
+    """
+
+    def __init__(self):
+        self.entries: List[Dict[str, Any]] = []
+        self.tokens: List[Set[str]] = []
+        self.years: List[Optional[int]] = []
+        self.postings: Dict[str, List[int]] = defaultdict(list)
+
+    def add(self, title: str, year: Optional[int] = None, entry: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Add a title to the index.
+
+        Args:
+            title (str): The title; a trailing "(year)" is split off if `year` is omitted.
+            year (Optional[int]): The release year.
+            entry (Optional[Dict[str, Any]]): Data returned with matches; defaults to the title and year.
+
+        Returns:
+            int: The entry's position in the index.
+        """
+        if year is None:
+            title, year = split_title_year(title)
+        entry_id = len(self.entries)
+        token_set = set(tokenize(title))
+
+        self.entries.append(entry if entry is not None else {"title": title, "year": year})
+        self.tokens.append(token_set)
+        self.years.append(int(year) if year else None)
+
+        for token in token_set - STOPWORDS or token_set:
+            self.postings[token].append(entry_id)
+        return entry_id
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _candidates(self, query_tokens: Set[str]) -> Set[int]:
+        candidates: Set[int] = set()
+        for token in query_tokens:
+            candidates.update(self.postings.get(token, ()))
+        return candidates
+
+    def match(self, title: str, year: Optional[int] = None, threshold: float = 0.0, limit: Optional[int] = None) -> List[Tuple[float, Dict[str, Any]]]:
+        """
+        Find indexed entries similar to a title.
+
+        Args:
+            title (str): The title to look up; a trailing "(year)" is split off if `year` is omitted.
+            year (Optional[int]): The release year.
+            threshold (float): Minimum score, from 0 to 1, for an entry to be returned.
+            limit (Optional[int]): Maximum number of matches to return.
+
+        Returns:
+            List[Tuple[float, Dict[str, Any]]]: (score, entry) pairs, best first.
+        """
+        if year is None:
+            title, year = split_title_year(title)
+        query_tokens = set(tokenize(title))
+        if not query_tokens:
+            return []
+
+        matches = []
+        for entry_id in self._candidates(query_tokens):
+            entry_tokens = self.tokens[entry_id]
+            score = 2 * len(query_tokens & entry_tokens) / (len(query_tokens) + len(entry_tokens))
+            entry_year = self.years[entry_id]
+            if year and entry_year and int(year) != entry_year:
+                score *= YEAR_MISMATCH_PENALTY
+            if score >= threshold:
+                matches.append((score, self.entries[entry_id]))
+
+        matches.sort(key=lambda match: match[0], reverse=True)
+        return matches[:limit] if limit is not None else matches
+
+    def best_match(self, title: str, year: Optional[int] = None) -> Tuple[float, Optional[Dict[str, Any]]]:
+        """
+        Return the single best match for a title.
+
+        Args:
+            title (str): The title to look up.
+            year (Optional[int]): The release year.
+
+        Returns:
+            Tuple[float, Optional[Dict[str, Any]]]: The score and entry, or (0.0, None) if nothing matched.
+        """
+        matches = self.match(title, year, limit=1)
+        return matches[0] if matches else (0.0, None)
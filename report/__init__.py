@@ -0,0 +1 @@
+from .infringement_report import ReportState, generate as generate_report, from_settings as report_from_settings
@@ -0,0 +1,28 @@
+"""
+Command line interface for the infringement report.
+
+Usage:
+    python -m report --watchlist ./config/watchlist.json [--output-dir DIR] [--state-dir DIR] [--report-dir DIR] [--threshold T] [--no-removals] [--removal-grace-runs N]
+"""
+
+import argparse
+import logging
+
+from .infringement_report import generate, REMOVAL_GRACE_RUNS
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m report", description="Generate the incremental infringement diff report.")
+    parser.add_argument("--watchlist", required=True, help="Path to the watchlist of protected works")
+    parser.add_argument("--output-dir", default="./output/", help="Directory holding the crawl outputs")
+    parser.add_argument("--state-dir", default="./state/", help="Directory for the report state")
+    parser.add_argument("--report-dir", default="./reports/", help="Directory the JSON and CSV reports are written to")
+    parser.add_argument("--threshold", type=float, default=0.6, help="Minimum watchlist match score")
+    parser.add_argument("--no-removals", action="store_true", help="Do not report listings missing from the outputs as removed")
+    parser.add_argument("--removal-grace-runs", type=int, default=REMOVAL_GRACE_RUNS, help="Consecutive runs a listing must be missing before it is reported as removed")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    generate(args.output_dir, args.watchlist, args.state_dir, args.report_dir, logging.getLogger("report"), args.threshold, not args.no_removals, args.removal_grace_runs)
+
+if __name__ == "__main__":
+    main()
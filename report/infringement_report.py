@@ -0,0 +1,361 @@
+"""
+Infringement report module for the indexer application.
+
+This module matches crawl outputs against the watchlist of protected works
+and produces a compact diff report of what changed since the previous run:
+new infringements, listings that disappeared and swarm changes.
+
+Match results are kept between runs, keyed by record identity, so only new
+or changed records are re-scored. Output files that have not changed since
+the last report are not read at all, and when an indexer left a change log
+covering every crawl since then, only the records it logged as changed are.
+"""
+
+import os
+import csv
+import time
+import sqlite3
+import hashlib
+import logging
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+
+import orjson
+
+from dedup.keys import canonical_link, split_title_year
+from fingerprint import change_log_path, read_change_log_header
+from relevance import TitleIndex, load_watchlist
+from query.loader import JSON_OUTPUTS, JSONL_OUTPUTS, iter_json_lines
+
+DEFAULT_STATE_FILE = "report_state.sqlite3"
+BATCH_SIZE = 1000
+# Consecutive runs a listing must be missing from its output before it is reported as removed
+REMOVAL_GRACE_RUNS = 3
+RECORD_COLUMNS = "identity, path, source, content_hash, title, year, link, matched_work, score, seeders, leechers, last_seen_run"
+CSV_FIELDS = ["change", "source", "title", "year", "matched_work", "score", "link", "seeders", "leechers", "previous_seeders", "previous_leechers"]
+
+def record_identity(source: str, record: Dict[str, Any]) -> str:
+    link = record.get("movie_page") or record.get("url") or record.get("link")
+    if link:
+        return f"{source}|{canonical_link(link)}"
+    return f"{source}|title:{record.get('title') or record.get('name')}|{record.get('year')}"
+
+def content_hash(record: Dict[str, Any]) -> bytes:
+    return hashlib.blake2b(orjson.dumps(record, option=orjson.OPT_SORT_KEYS), digest_size=16).digest()
+
+def swarm_summary(record: Dict[str, Any]) -> Tuple[int, int]:
+    """
+    Total the seeders and leechers across a record's torrents.
+
+    Tracker-scraped figures are preferred over those scraped from the site.
+
+    Args:
+        record (Dict[str, Any]): A 1337x or YTS record.
+
+    Returns:
+        Tuple[int, int]: Total seeders and leechers.
+    """
+    seeders = leechers = 0
+    for torrent in record.get("torrents") or []:
+        swarm = torrent.get("swarm") or {}
+        seeders += swarm.get("seeders", torrent.get("seeds", 0)) or 0
+        leechers += swarm.get("leechers", torrent.get("leeches", torrent.get("peers", 0))) or 0
+    return seeders, leechers
+
+def iter_output_records(path: str, filename: str) -> Iterator[Dict[str, Any]]:
+    if filename in JSON_OUTPUTS:
+        with open(path, "rb") as f:
+            yield from orjson.loads(f.read())
+    else:
+        for record, _ in iter_json_lines(path):
+            yield record
+
+class ReportState:
+    """SQLite store of per-record match results and per-file signatures between report runs."""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS records (
+                identity TEXT PRIMARY KEY,
+                path TEXT NOT NULL,
+                source TEXT NOT NULL,
+                content_hash BLOB NOT NULL,
+                title TEXT,
+                year INTEGER,
+                link TEXT,
+                matched_work TEXT,
+                score REAL,
+                seeders INTEGER,
+                leechers INTEGER,
+                last_seen_run INTEGER NOT NULL,
+                missing_runs INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS records_by_path ON records (path, last_seen_run);
+            CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, mtime REAL NOT NULL, size INTEGER NOT NULL);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        """)
+        columns = {row[1] for row in self.connection.execute("PRAGMA table_info(records)")}
+        if "missing_runs" not in columns:
+            self.connection.execute("ALTER TABLE records ADD COLUMN missing_runs INTEGER NOT NULL DEFAULT 0")
+
+    def get_meta(self, key: str) -> Optional[str]:
+        row = self.connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        self.connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def next_run(self) -> int:
+        run = int(self.get_meta("last_run") or 0) + 1
+        self.set_meta("last_run", str(run))
+        return run
+
+    def file_unchanged(self, path: str, mtime: float, size: int) -> bool:
+        row = self.connection.execute("SELECT mtime, size FROM files WHERE path = ?", (path,)).fetchone()
+        return row is not None and row[0] == mtime and row[1] == size
+
+    def set_file(self, path: str, mtime: float, size: int) -> None:
+        self.connection.execute("INSERT OR REPLACE INTO files (path, mtime, size) VALUES (?, ?, ?)", (path, mtime, size))
+
+    def close(self) -> None:
+        self.connection.commit()
+        self.connection.close()
+
+class ReportBuilder:
+    """Applies one run's crawl outputs to the report state and collects the differences."""
+
+    def __init__(self, state: ReportState, index: TitleIndex, threshold: float, logger: logging.Logger, track_removals: bool = True, removal_grace_runs: int = REMOVAL_GRACE_RUNS):
+        self.state = state
+        self.index = index
+        self.threshold = threshold
+        self.logger = logger
+        self.track_removals = track_removals
+        self.removal_grace_runs = removal_grace_runs
+        self.run = state.next_run()
+        self.changes: Dict[str, List[Dict[str, Any]]] = {"new_infringements": [], "removed_listings": [], "swarm_changes": []}
+        self.stats = {"files_skipped": 0, "change_logs_read": 0, "records_read": 0, "records_rescored": 0}
+
+    def score(self, record: Dict[str, Any]) -> Tuple[str, Optional[int], Optional[str], Optional[float]]:
+        title = record.get("title") or record.get("name") or ""
+        year = record.get("year")
+        if not year:
+            title, year = split_title_year(title)
+        score, work = self.index.best_match(title, year)
+        if work is None or score < self.threshold:
+            return title, year, None, None
+        matched_work = f"{work['title']} ({work['year']})" if work.get("year") else work["title"]
+        return title, year, matched_work, round(score, 4)
+
+    def rescore_all(self) -> None:
+        """Forget stored match results, e.g. after the watchlist changed, so every record is scored again."""
+        self.state.connection.execute("UPDATE records SET content_hash = x''")
+        self.state.connection.execute("DELETE FROM files")
+        # Records logged as unchanged would not be scored again
+        self.state.connection.execute("DELETE FROM meta WHERE key LIKE 'change_log:%'")
+
+    def apply_file(self, path: str, source: str, filename: str) -> None:
+        stat = os.stat(path)
+        connection = self.state.connection
+
+        if self.state.file_unchanged(path, stat.st_mtime, stat.st_size):
+            connection.execute("UPDATE records SET last_seen_run = ?, missing_runs = 0 WHERE path = ?", (self.run, path))
+            self.stats["files_skipped"] += 1
+            return
+
+        log_path = change_log_path(path)
+        header = read_change_log_header(log_path)
+        usable = header is not None and header["complete"] and os.stat(log_path).st_mtime >= stat.st_mtime
+        meta_key = f"change_log:{path}"
+
+        if usable and header["previous_run"] is not None and header["previous_run"] == self.state.get_meta(meta_key):
+            # Every crawl since the last report is accounted for, so the log alone holds what changed
+            self.stats["change_logs_read"] += 1
+            for entry, _ in iter_json_lines(log_path):
+                if "records" in entry:
+                    self.apply_records(path, source, entry["records"])
+                elif "seen" in entry and self.track_removals:
+                    self.touch(path, [record_identity(source, record) for record in entry["seen"]])
+        else:
+            self.apply_records(path, source, iter_output_records(path, filename))
+
+        if usable:
+            self.state.set_meta(meta_key, header["run"])
+        else:
+            connection.execute("DELETE FROM meta WHERE key = ?", (meta_key,))
+        self.state.set_file(path, stat.st_mtime, stat.st_size)
+
+    def touch(self, path: str, identities: List[str]) -> None:
+        """Mark records as present in this run without reading them."""
+        self.state.connection.executemany("UPDATE records SET last_seen_run = ?, missing_runs = 0, path = ? WHERE identity = ?", [(self.run, path, identity) for identity in identities])
+
+    def apply_records(self, path: str, source: str, records: Iterable[Dict[str, Any]]) -> None:
+        """Re-score the records that are new or changed since they were last seen, and mark the rest present."""
+        connection = self.state.connection
+        seen, updates = [], []
+        for record in records:
+            self.stats["records_read"] += 1
+            identity = record_identity(source, record)
+            digest = content_hash(record)
+            row = connection.execute(
+                "SELECT content_hash, matched_work, seeders, leechers FROM records WHERE identity = ?", (identity,)
+            ).fetchone()
+
+            if row is not None and row[0] == digest:
+                seen.append(identity)
+            else:
+                self.stats["records_rescored"] += 1
+                title, year, matched_work, score = self.score(record)
+                seeders, leechers = swarm_summary(record)
+                link = record.get("movie_page") or record.get("url") or record.get("link")
+                updates.append((identity, path, source, digest, title, year, link, matched_work, score, seeders, leechers, self.run))
+
+                entry = {"source": source, "title": title, "year": year, "matched_work": matched_work, "score": score, "link": link, "seeders": seeders, "leechers": leechers}
+                if matched_work is not None and (row is None or row[1] is None):
+                    self.changes["new_infringements"].append(entry)
+                elif matched_work is not None and (row[2], row[3]) != (seeders, leechers):
+                    self.changes["swarm_changes"].append(dict(entry, previous_seeders=row[2], previous_leechers=row[3]))
+
+            if len(seen) >= BATCH_SIZE:
+                self.touch(path, seen)
+                seen.clear()
+            if len(updates) >= BATCH_SIZE:
+                connection.executemany(f"INSERT OR REPLACE INTO records ({RECORD_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", updates)
+                updates.clear()
+
+        self.touch(path, seen)
+        connection.executemany(f"INSERT OR REPLACE INTO records ({RECORD_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", updates)
+
+    def collect_removals(self, paths: List[str]) -> None:
+        """
+        Report and forget infringing listings missing from their output file for `removal_grace_runs` runs in a row.
+
+        A listing missing from a single run is usually a detail page that failed to fetch, so it is only
+        counted; seeing it again resets the count and keeps its stored match.
+        """
+        connection = self.state.connection
+        for path in paths:
+            connection.execute("UPDATE records SET missing_runs = missing_runs + 1 WHERE path = ? AND last_seen_run < ?", (path, self.run))
+            for source, title, year, link, matched_work, score, seeders, leechers in connection.execute(
+                "SELECT source, title, year, link, matched_work, score, seeders, leechers FROM records WHERE path = ? AND last_seen_run < ? AND missing_runs >= ? AND matched_work IS NOT NULL",
+                (path, self.run, self.removal_grace_runs)
+            ):
+                self.changes["removed_listings"].append({"source": source, "title": title, "year": year, "matched_work": matched_work, "score": score, "link": link, "seeders": seeders, "leechers": leechers})
+            connection.execute("DELETE FROM records WHERE path = ? AND last_seen_run < ? AND missing_runs >= ?", (path, self.run, self.removal_grace_runs))
+
+def write_report(report: Dict[str, Any], report_dir: str, name: str) -> Tuple[str, str]:
+    """
+    Write a diff report as JSON and CSV.
+
+    Args:
+        report (Dict[str, Any]): The report, as returned by `generate`.
+        report_dir (str): Destination directory.
+        name (str): Base file name, without extension.
+
+    Returns:
+        Tuple[str, str]: Paths of the JSON and CSV files.
+    """
+    os.makedirs(report_dir, exist_ok=True)
+    json_path = os.path.join(report_dir, f"{name}.json")
+    csv_path = os.path.join(report_dir, f"{name}.csv")
+
+    with open(json_path, "wb") as f:
+        f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2))
+
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        for change, entries in report["changes"].items():
+            for entry in entries:
+                writer.writerow(dict(entry, change=change))
+
+    return json_path, csv_path
+
+def generate(output_dir: str, watchlist_path: str, state_dir: str, report_dir: str, logger: logging.Logger, threshold: float = 0.6, track_removals: bool = True, removal_grace_runs: int = REMOVAL_GRACE_RUNS) -> Dict[str, Any]:
+    """
+    Produce the diff report for the current crawl outputs.
+
+    Args:
+        output_dir (str): Directory holding the crawl outputs.
+        watchlist_path (str): Path to the watchlist of protected works.
+        state_dir (str): Directory for the report state database.
+        report_dir (str): Directory the JSON and CSV reports are written to.
+        logger (logging.Logger): Logger instance.
+        threshold (float): Minimum watchlist match score for a record to count as an infringement.
+        track_removals (bool): Report listings missing from an output file as removed. Disable this when
+            outputs are incremental (e.g. with persistent deduplication), since unchanged items are then absent.
+        removal_grace_runs (int): Consecutive runs a listing must be missing before it is reported as removed.
+
+    Returns:
+        Dict[str, Any]: The report, including the run number, timing and the changes found.
+    """
+    started = time.time()
+    index = load_watchlist(watchlist_path)
+    with open(watchlist_path, "rb") as f:
+        watchlist_digest = hashlib.blake2b(f.read(), digest_size=16).hexdigest() + f"|{threshold}"
+
+    state = ReportState(os.path.join(os.path.abspath(state_dir), DEFAULT_STATE_FILE))
+    try:
+        builder = ReportBuilder(state, index, threshold, logger, track_removals, removal_grace_runs)
+        if state.get_meta("watchlist") != watchlist_digest:
+            logger.info("Watchlist or threshold changed since the last report; re-scoring every record")
+            builder.rescore_all()
+            state.set_meta("watchlist", watchlist_digest)
+
+        processed = []
+        outputs = dict(JSON_OUTPUTS, **JSONL_OUTPUTS)
+        for filename, source in outputs.items():
+            path = os.path.join(os.path.abspath(output_dir), filename)
+            if not os.path.exists(path):
+                continue
+            builder.apply_file(path, source, filename)
+            processed.append(path)
+
+        if track_removals:
+            builder.collect_removals(processed)
+
+        report = {
+            "run": builder.run,
+            "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(started)),
+            "elapsed_seconds": round(time.time() - started, 3),
+            "stats": builder.stats,
+            "summary": {change: len(entries) for change, entries in builder.changes.items()},
+            "changes": builder.changes,
+        }
+        state.connection.commit()
+    finally:
+        state.close()
+
+    json_path, csv_path = write_report(report, report_dir, f"report_{builder.run:05d}")
+    logger.info(f"Report run {builder.run}: {report['summary']} ({report['stats']}) written to {json_path} and {csv_path}")
+    return report
+
+def from_settings(settings: Dict[str, Any], logger: logging.Logger) -> Optional[Dict[str, Any]]:
+    """
+    Produce the diff report if the `report` configuration section enables it.
+
+    Args:
+        settings (Dict[str, Any]): The configuration dictionary.
+        logger (logging.Logger): Logger instance.
+
+    Returns:
+        Optional[Dict[str, Any]]: The report, or None if reporting is disabled.
+    """
+    report_settings = settings.get("report", {})
+    if not report_settings.get("enabled", False):
+        return None
+
+    # Persistent deduplication leaves earlier items out of each crawl, so their absence is not a removal
+    dedup_settings = settings.get("dedup", {})
+    persistent = dedup_settings.get("enabled", False) and dedup_settings.get("persist", True)
+
+    return generate(
+        settings["output_dir"],
+        report_settings.get("watchlist_path") or settings.get("prefilter", {}).get("watchlist_path"),
+        report_settings.get("state_dir", "./state/"),
+        report_settings.get("report_dir", "./reports/"),
+        logger,
+        threshold=report_settings.get("threshold", 0.6),
+        track_removals=report_settings.get("track_removals", not persistent),
+        removal_grace_runs=report_settings.get("removal_grace_runs", REMOVAL_GRACE_RUNS)
+    )
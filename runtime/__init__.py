@@ -0,0 +1,4 @@
+from .transport_runtime import TransportRuntime, ResponseCache, Metrics, from_settings as runtime_from_settings
+from .memory_budget import MemoryBudget, current_rss
+from .mirror_pool import MirrorPool, from_settings as mirror_pools_from_settings
+from .fetch_queue import PriorityLimiter, SingleFlight, PRIORITY_LIST, PRIORITY_DETAIL, PRIORITY_RETRY
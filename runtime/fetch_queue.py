@@ -0,0 +1,144 @@
+"""
+Fetch queue primitives for the indexer application.
+
+This module provides the two pieces that sit between an indexer and the
+network. A priority limiter hands out concurrency slots by priority rather
+than arrival order, so list and pagination pages, which produce new work,
+are fetched before detail pages, and retries wait behind fresh requests.
+Within a priority, an optional rank orders waiters further, e.g. detail
+pages by how well they match the watchlist. Single-flight coalescing lets concurrent requests for the same URL share
+one fetch instead of each paying for it, which matters most for FlareSolverr
+solves.
+"""
+
+import heapq
+import asyncio
+import itertools
+from typing import Dict, Any, Awaitable, Callable, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# Lower values are served first
+PRIORITY_LIST = 0
+PRIORITY_DETAIL = 1
+PRIORITY_RETRY = 2
+
+class PriorityLimiter:
+    """
+    A semaphore that wakes waiters in (priority, rank) order, first come first served among equals.
+
+    `async with limiter:` acquires at list priority; use `limiter.slot(priority, rank)` for others.
+
+    Args:
+        limit (int): Maximum concurrent holders.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+        self.waiters: List[Tuple[int, float, int, asyncio.Future]] = []
+        self.counter = itertools.count()
+
+    async def acquire(self, priority: int = PRIORITY_LIST, rank: float = 0.0) -> None:
+        if self.active < self.limit and not self.waiters:
+            self.active += 1
+            return
+
+        waiter = asyncio.get_event_loop().create_future()
+        entry = (priority, rank, next(self.counter), waiter)
+        heapq.heappush(self.waiters, entry)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # A slot handed over just before the cancellation must be passed on
+                self.release()
+            elif entry in self.waiters:
+                # `release` may already have dropped the cancelled entry
+                self.waiters.remove(entry)
+                heapq.heapify(self.waiters)
+            raise
+
+    def release(self) -> None:
+        # Hand the slot straight to the best waiter still waiting, so a newcomer cannot take it first.
+        # Waiters cancelled but not yet resumed are skipped, as asyncio.Semaphore does
+        while self.waiters:
+            *_, waiter = heapq.heappop(self.waiters)
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def slot(self, priority: int, rank: float = 0.0) -> "LimiterSlot":
+        return LimiterSlot(self, priority, rank)
+
+    async def __aenter__(self) -> None:
+        await self.acquire()
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.release()
+
+    def stats(self) -> Dict[str, int]:
+        waiting = [entry[0] for entry in self.waiters]
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "waiting_list": waiting.count(PRIORITY_LIST),
+            "waiting_detail": waiting.count(PRIORITY_DETAIL),
+            "waiting_retry": waiting.count(PRIORITY_RETRY),
+        }
+
+class LimiterSlot:
+    """Async context manager acquiring a PriorityLimiter slot at a given priority and rank."""
+
+    def __init__(self, limiter: PriorityLimiter, priority: int, rank: float = 0.0):
+        self.limiter = limiter
+        self.priority = priority
+        self.rank = rank
+
+    async def __aenter__(self) -> None:
+        await self.limiter.acquire(self.priority, self.rank)
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.limiter.release()
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into one call whose result every caller shares."""
+
+    def __init__(self):
+        self.in_flight: Dict[str, asyncio.Future] = {}
+        self.coalesced = 0
+
+    async def run(self, key: str, fetch: Callable[[], Awaitable[Optional[T]]]) -> Optional[T]:
+        """
+        Run `fetch` for `key`, or wait for the call already in flight for it.
+
+        Args:
+            key (str): Identifies duplicate calls, e.g. the URL.
+            fetch (Callable[[], Awaitable[Optional[T]]]): Performs the call.
+
+        Returns:
+            Optional[T]: The shared result. If the leading call is cancelled, waiters get None
+                and can retry on their own.
+        """
+        leader = self.in_flight.get(key)
+        if leader is not None:
+            self.coalesced += 1
+            return await asyncio.shield(leader)
+
+        future = asyncio.get_event_loop().create_future()
+        self.in_flight[key] = future
+        try:
+            result = await fetch()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.set_result(None)
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        finally:
+            del self.in_flight[key]
@@ -0,0 +1,170 @@
+"""
+Memory budget for the indexer application.
+
+This module watches the process's resident set size (RSS) against a
+configured budget. When usage crosses the high watermark the budget enters
+a pressure state: new fetches through the transport runtime wait, cached
+responses are dropped, indexers shrink their batches and flush the records
+they have buffered to disk. Fetching resumes once usage falls below the low
+watermark. Freed memory is not always returned to the operating system, so
+a pause is bounded: after `max_pause` seconds fetches trickle through one at
+a time, and the crawl keeps making progress at a reduced rate.
+"""
+
+import os
+import gc
+import asyncio
+import logging
+from typing import Callable, List, Optional
+
+def current_rss() -> Optional[int]:
+    """
+    Return the resident set size of this process, in bytes.
+
+    Only /proc/self/statm gives the current RSS. getrusage reports the peak,
+    which never goes down, so pressure could never be relieved; platforms
+    without /proc are treated as unmeasurable instead.
+
+    Returns:
+        Optional[int]: The RSS in bytes, or None if it cannot be measured.
+    """
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+class MemoryBudget:
+    """
+    Tracks RSS against a budget and gates new work while over it.
+
+    Args:
+        limit_mb (float): The memory budget in megabytes.
+        high_watermark (float): Fraction of the budget at which pressure starts.
+        low_watermark (float): Fraction of the budget below which pressure ends.
+        check_interval (float): Seconds between RSS samples.
+        max_pause (float): Seconds a fetch waits under pressure before it is let through alone.
+        logger (Optional[logging.Logger]): Logger instance.
+    """
+
+    def __init__(self, limit_mb: float, high_watermark: float = 0.9, low_watermark: float = 0.75, check_interval: float = 0.5, max_pause: float = 30.0, logger: Optional[logging.Logger] = None):
+        self.limit = int(limit_mb * 1024 * 1024)
+        self.high = int(self.limit * high_watermark)
+        self.low = int(self.limit * low_watermark)
+        self.check_interval = check_interval
+        self.max_pause = max_pause
+        self.logger = logger or logging.getLogger(__name__)
+        self.rss = 0
+        self.peak = 0
+        self.pauses = 0
+        self.trickled = 0
+        self.flushes = 0
+        self.flushed_records = 0
+        self.pressure_callbacks: List[Callable[[], None]] = []
+        self._relieved: Optional[asyncio.Event] = None
+        self._trickle: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def under_pressure(self) -> bool:
+        return self._relieved is not None and not self._relieved.is_set()
+
+    def on_pressure(self, callback: Callable[[], None]) -> None:
+        """Register a callback run each time the budget enters the pressure state."""
+        self.pressure_callbacks.append(callback)
+
+    def scaled(self, size: int) -> int:
+        """
+        Scale a batch or queue size to the current memory situation.
+
+        Args:
+            size (int): The size to use when memory is not under pressure.
+
+        Returns:
+            int: `size`, or a quarter of it (at least 1) while under pressure.
+        """
+        return max(1, size // 4) if self.under_pressure else size
+
+    def sample(self) -> bool:
+        """
+        Measure RSS once and update the pressure state.
+
+        Returns:
+            bool: True if the budget is under pressure after this sample.
+        """
+        rss = current_rss()
+        if rss is None:
+            return False
+        self.rss = rss
+        self.peak = max(self.peak, rss)
+
+        if self._relieved is None:
+            self._relieved = asyncio.Event()
+            self._relieved.set()
+            self._trickle = asyncio.Lock()
+
+        if not self.under_pressure and rss >= self.high:
+            self._relieved.clear()
+            self.pauses += 1
+            self.logger.warning(f"Memory budget: RSS {rss / 2**20:.1f}MB reached {self.high / 2**20:.1f}MB of {self.limit / 2**20:.1f}MB, pausing new fetches")
+            for callback in self.pressure_callbacks:
+                callback()
+            gc.collect()
+        elif self.under_pressure and rss <= self.low:
+            self._relieved.set()
+            self.logger.info(f"Memory budget: RSS {rss / 2**20:.1f}MB back under {self.low / 2**20:.1f}MB, resuming fetches")
+        return self.under_pressure
+
+    async def wait(self) -> None:
+        """Wait until the budget is not under pressure, or at most `max_pause` seconds per waiter in turn."""
+        if not self.under_pressure:
+            return
+        async with self._trickle:
+            if not self.under_pressure:
+                return
+            try:
+                await asyncio.wait_for(self._relieved.wait(), self.max_pause)
+            except asyncio.TimeoutError:
+                self.trickled += 1
+                self.logger.warning(f"Memory budget: RSS still {self.rss / 2**20:.1f}MB after {self.max_pause:.0f}s, letting one fetch through")
+
+    def record_flush(self, count: int) -> None:
+        """Record that an indexer flushed `count` buffered records because of memory pressure."""
+        self.flushes += 1
+        self.flushed_records += count
+        self.logger.info(f"Memory budget: flushed {count} buffered records to disk (RSS {self.rss / 2**20:.1f}MB)")
+
+    async def _watch(self) -> None:
+        while True:
+            self.sample()
+            await asyncio.sleep(self.check_interval)
+
+    def start(self) -> None:
+        """Start sampling in the background. Must be called from a running event loop."""
+        if current_rss() is None:
+            self.logger.warning("Memory budget: current RSS cannot be measured on this platform (no /proc/self/statm), the budget is not enforced")
+            return
+        if self._task is None:
+            self.sample()
+            self._task = asyncio.ensure_future(self._watch())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._relieved is not None:
+            # Release anything still waiting so shutdown is not blocked
+            self._relieved.set()
+
+    def stats(self) -> dict:
+        return {
+            "limit_mb": round(self.limit / 2**20, 1),
+            "rss_mb": round(self.rss / 2**20, 1),
+            "peak_rss_mb": round(self.peak / 2**20, 1),
+            "pauses": self.pauses,
+            "trickled_fetches": self.trickled,
+            "flushes": self.flushes,
+            "flushed_records": self.flushed_records,
+            "under_pressure": self.under_pressure,
+        }
@@ -0,0 +1,236 @@
+"""
+Mirror selection for the indexer application.
+
+Many indexed sites are served from several interchangeable domains. This
+module keeps one pool of mirrors per indexer, ranks them by probe latency,
+and routes each fetch to the fastest healthy mirror. A mirror that keeps
+failing during the crawl is taken out of rotation until a later probe finds
+it answering again, so the crawl fails over without restarting.
+
+Indexers always work with canonical URLs (those built from `base_url`); the
+pool rewrites only the origin of the URL actually fetched, so links in the
+output stay stable whichever mirror served them.
+"""
+
+import json
+import time
+import asyncio
+import logging
+from typing import Dict, Any, Awaitable, Callable, List, Optional, TypeVar
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from exceptions import ConfigurationError, MirrorError
+
+T = TypeVar("T")
+
+DEFAULT_SITES_PATH = "./english_public_trackers.json"
+
+def origin(url: str) -> str:
+    """Return the scheme and host of a URL, e.g. 'https://1337x.to'."""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+class Mirror:
+    """Health and latency of one mirror origin."""
+
+    def __init__(self, origin: str):
+        self.origin = origin
+        self.latency: Optional[float] = None
+        self.healthy = True
+        self.failures = 0
+        self.down_until = 0.0
+        self.requests = 0
+        self.errors = 0
+
+    def rank(self) -> float:
+        return self.latency if self.latency is not None else float("inf")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "latency_ms": round(self.latency * 1000, 1) if self.latency is not None else None,
+            "healthy": self.healthy,
+            "requests": self.requests,
+            "errors": self.errors,
+        }
+
+class MirrorPool:
+    """
+    Routes an indexer's requests to the fastest healthy mirror.
+
+    Args:
+        name (str): The indexer name, for logging.
+        canonical_url (str): The indexer's `base_url`; its origin is the canonical one.
+        mirrors (List[str]): Alternative origins serving the same site.
+        timeout (float): Seconds to wait for a probe response.
+        failure_threshold (int): Consecutive failed fetches after which a mirror is taken out of rotation.
+        probe_interval (float): Seconds between probes during the run; a mirror that failed over
+            also stays out of rotation at least this long.
+        logger (Optional[logging.Logger]): Logger instance.
+    """
+
+    def __init__(self, name: str, canonical_url: str, mirrors: List[str], timeout: float = 5.0, failure_threshold: int = 3, probe_interval: float = 300.0, logger: Optional[logging.Logger] = None):
+        self.name = name
+        self.canonical_url = canonical_url
+        self.canonical_origin = origin(canonical_url)
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.probe_interval = probe_interval
+        self.logger = logger or logging.getLogger(__name__)
+        self.mirrors: Dict[str, Mirror] = {}
+        for mirror_url in [canonical_url, *mirrors]:
+            mirror_origin = origin(mirror_url)
+            self.mirrors.setdefault(mirror_origin, Mirror(mirror_origin))
+        self.current = self.mirrors[self.canonical_origin]
+
+    def resolve(self, url: str, mirror: Optional[Mirror] = None) -> str:
+        """Rewrite a canonical URL to the given mirror, by default the currently selected one."""
+        mirror = mirror or self.current
+        if mirror.origin != self.canonical_origin and origin(url) == self.canonical_origin:
+            return mirror.origin + url[len(self.canonical_origin):]
+        return url
+
+    def canonical(self, url: str) -> str:
+        """Rewrite a URL on any mirror of this pool back to the canonical origin."""
+        url_origin = origin(url)
+        if url_origin in self.mirrors and url_origin != self.canonical_origin:
+            return self.canonical_origin + url[len(url_origin):]
+        return url
+
+    def select(self) -> Mirror:
+        """Pick the fastest healthy mirror, falling back to the canonical one if none are healthy."""
+        now = time.time()
+        healthy = [mirror for mirror in self.mirrors.values() if mirror.healthy and mirror.down_until <= now]
+        best = min(healthy, key=Mirror.rank) if healthy else self.mirrors[self.canonical_origin]
+        if best is not self.current:
+            self.logger.info(f"Mirrors for {self.name}: switching from {self.current.origin} to {best.origin} ({best.stats()['latency_ms']}ms)")
+            self.current = best
+        return best
+
+    async def probe_mirror(self, runtime: Any, mirror: Mirror) -> None:
+        # Any HTTP response counts: sites behind anti-bot protection refuse direct requests but are still up
+        url = self.resolve(self.canonical_url, mirror)
+        started = time.perf_counter()
+        try:
+            await runtime.request("HEAD", url, timeout=self.timeout, allow_redirects=False)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if mirror.healthy:
+                self.logger.warning(f"Mirrors for {self.name}: {mirror.origin} failed its probe: {type(e).__name__}")
+            mirror.healthy = False
+            return
+
+        mirror.latency = time.perf_counter() - started
+        if not mirror.healthy and mirror.down_until <= time.time():
+            self.logger.info(f"Mirrors for {self.name}: {mirror.origin} is reachable again")
+            mirror.healthy = True
+            mirror.failures = 0
+
+    async def probe(self, runtime: Any) -> None:
+        """Probe every mirror concurrently and re-rank them."""
+        await asyncio.gather(*(self.probe_mirror(runtime, mirror) for mirror in self.mirrors.values()))
+        self.select()
+        self.logger.info(f"Mirrors for {self.name}: {self.stats()}")
+
+    async def probe_periodically(self, runtime: Any) -> None:
+        while True:
+            await asyncio.sleep(self.probe_interval)
+            await self.probe(runtime)
+
+    def record(self, mirror: Mirror, ok: Optional[bool]) -> None:
+        """Record the outcome of a fetch, failing over if the mirror keeps failing. None records an outcome that says nothing about the mirror."""
+        mirror.requests += 1
+        if ok is None:
+            return
+        if ok:
+            mirror.failures = 0
+            return
+
+        mirror.errors += 1
+        mirror.failures += 1
+        if mirror.healthy and mirror.failures >= self.failure_threshold:
+            mirror.healthy = False
+            mirror.down_until = time.time() + self.probe_interval
+            self.logger.warning(f"Mirrors for {self.name}: {mirror.origin} failed {mirror.failures} fetches in a row, failing over")
+            self.select()
+
+    async def fetch(self, url: str, fetch: Callable[[str], Awaitable[Optional[T]]]) -> Optional[T]:
+        """
+        Fetch a canonical URL from the selected mirror.
+
+        Args:
+            url (str): The canonical URL.
+            fetch (Callable[[str], Awaitable[Optional[T]]]): Performs one attempt against the given URL.
+                Only a `MirrorError`, a connection error or a timeout counts as a failure of the mirror; a
+                falsy result (e.g. a 404, or an error from FlareSolverr itself) does not count either way.
+
+        Returns:
+            Optional[T]: The result of `fetch`.
+        """
+        mirror = self.current
+        try:
+            result = await fetch(self.resolve(url, mirror))
+        except (MirrorError, aiohttp.ClientError, asyncio.TimeoutError):
+            self.record(mirror, False)
+            raise
+        except Exception:
+            self.record(mirror, None)
+            raise
+        self.record(mirror, True if result else None)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {mirror.origin: mirror.stats() for mirror in self.mirrors.values()}
+
+def from_settings(settings: Dict[str, Any], list_of_indexers: Dict[str, Any], logger: logging.Logger) -> Dict[str, MirrorPool]:
+    """
+    Create a mirror pool for every indexer that has alternative mirrors.
+
+    Mirrors come from the indexer's `mirrors` list in supported_indexes.json and,
+    when the site is listed there, its URL in the public sites list.
+
+    Args:
+        settings (Dict[str, Any]): The configuration dictionary; the `mirrors` section enables and tunes selection.
+        list_of_indexers (Dict[str, Any]): The contents of supported_indexes.json.
+        logger (logging.Logger): Logger instance.
+
+    Returns:
+        Dict[str, MirrorPool]: Mirror pools by indexer name; empty if mirror selection is disabled.
+
+    Raises:
+        ConfigurationError: If an indexer's mirror list is malformed.
+    """
+    mirror_settings = settings.get("mirrors", {})
+    if not mirror_settings.get("enabled", False):
+        return {}
+
+    sites: Dict[str, Any] = {}
+    sites_path = mirror_settings.get("sites_path", DEFAULT_SITES_PATH)
+    try:
+        with open(sites_path, "r") as f:
+            sites = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"Could not read the public sites list from {sites_path}: {str(e)}")
+
+    pools = {}
+    for name, indexer_settings in list_of_indexers.items():
+        mirrors = indexer_settings.get("mirrors", [])
+        if not isinstance(mirrors, list) or not all(isinstance(mirror, str) and urlsplit(mirror).netloc for mirror in mirrors):
+            raise ConfigurationError(f"'mirrors' for indexer {name} must be a list of URLs.")
+
+        site_url = sites.get(name, {}).get("url") if isinstance(sites.get(name), dict) else None
+        if site_url:
+            mirrors = [*mirrors, site_url]
+
+        pool = MirrorPool(
+            name,
+            indexer_settings["base_url"],
+            mirrors,
+            timeout=mirror_settings.get("timeout", 5.0),
+            failure_threshold=mirror_settings.get("failure_threshold", 3),
+            probe_interval=mirror_settings.get("probe_interval", 300.0),
+            logger=logger
+        )
+        if len(pool.mirrors) > 1:
+            pools[name] = pool
+    return pools
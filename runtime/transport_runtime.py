@@ -0,0 +1,378 @@
+"""
+Shared transport runtime for the indexer application.
+
+This module provides one object, created by main.py and handed to every
+indexer, that owns the HTTP machinery: a single pooled connector with a
+DNS cache, a bounded response cache, named concurrency limiters, the retry
+loop and request metrics. Indexers hitting overlapping infrastructure (most
+notably FlareSolverr) therefore share sockets, limits and cached responses,
+and the number of open connections stays bounded as sites are added. An
+optional memory budget pauses new requests while the process is close to
+its RSS limit. FlareSolverr fetches go through a priority queue and
+concurrent requests for the same page are coalesced into one solve.
+"""
+
+import time
+import asyncio
+import logging
+from collections import OrderedDict, defaultdict
+from typing import Dict, Any, Awaitable, Callable, List, Optional, Tuple, TypeVar
+from urllib.parse import urlparse
+
+import aiohttp
+from aiohttp import ClientSession, TCPConnector
+import orjson
+
+from exceptions import MirrorError
+
+from .memory_budget import MemoryBudget
+from .mirror_pool import MirrorPool
+from .fetch_queue import PriorityLimiter, SingleFlight, PRIORITY_LIST
+
+T = TypeVar("T")
+
+class ResponseCache:
+    """Least-recently-used cache of response bodies, keyed by URL."""
+
+    def __init__(self, max_entries: int = 2048):
+        self.cache: "OrderedDict[str, Any]" = OrderedDict()
+        self.max_entries = max_entries
+
+    async def get(self, url: str) -> Optional[Any]:
+        value = self.cache.get(url)
+        if value is not None:
+            self.cache.move_to_end(url)
+        return value
+
+    async def set(self, url: str, response: Any) -> None:
+        self.cache[url] = response
+        self.cache.move_to_end(url)
+        while len(self.cache) > self.max_entries:
+            self.cache.popitem(last=False)
+
+    async def invalidate(self, url: str) -> None:
+        self.cache.pop(url, None)
+
+    def clear(self) -> int:
+        count = len(self.cache)
+        self.cache.clear()
+        return count
+
+class Metrics:
+    """Request counters, overall and per host."""
+
+    def __init__(self):
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.hosts: Dict[str, Dict[str, float]] = defaultdict(lambda: {"requests": 0, "errors": 0, "bytes": 0, "seconds": 0.0})
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        self.counters[name] += amount
+
+    def record(self, url: str, elapsed: float, size: int = 0, error: bool = False) -> None:
+        host = self.hosts[urlparse(url).netloc]
+        host["requests"] += 1
+        host["bytes"] += size
+        host["seconds"] += elapsed
+        self.counters["requests"] += 1
+        self.counters["bytes"] += size
+        if error:
+            host["errors"] += 1
+            self.counters["errors"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a copy of all counters, for logging."""
+        return {
+            "totals": dict(self.counters),
+            "hosts": {host: {key: round(value, 3) for key, value in stats.items()} for host, stats in self.hosts.items()},
+        }
+
+class TransportRuntime:
+    """
+    Pooled HTTP transport shared by all indexers.
+
+    The session is created lazily on first use, so the runtime can be built
+    outside an event loop.
+    """
+
+    def __init__(self, connection_limit: int = 100, connection_limit_per_host: int = 16, dns_cache_ttl: int = 300, keepalive_timeout: float = 30.0, cache_entries: int = 2048, budget: Optional[MemoryBudget] = None, logger: Optional[logging.Logger] = None):
+        self.connection_limit = connection_limit
+        self.connection_limit_per_host = connection_limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.cache = ResponseCache(cache_entries)
+        self.metrics = Metrics()
+        self.logger = logger or logging.getLogger(__name__)
+        self.limiters: Dict[str, PriorityLimiter] = {}
+        self.single_flight = SingleFlight()
+        self.budget = budget
+        self.mirror_pools: Dict[str, MirrorPool] = {}
+        self._background: List[asyncio.Task] = []
+        if budget is not None:
+            budget.on_pressure(self._drop_cache)
+        self._session: Optional[ClientSession] = None
+
+    def _drop_cache(self) -> None:
+        dropped = self.cache.clear()
+        self.metrics.increment("cache_evictions_under_pressure", dropped)
+        self.logger.info(f"Memory budget: dropped {dropped} cached responses")
+
+    def start(self) -> None:
+        """Start background work: memory budget sampling and periodic mirror probes. Must be called from a running event loop."""
+        if self.budget is not None:
+            self.budget.start()
+        for pool in self.mirror_pools.values():
+            self._background.append(asyncio.ensure_future(pool.probe_periodically(self)))
+
+    @property
+    def session(self) -> ClientSession:
+        if self._session is None or self._session.closed:
+            connector = TCPConnector(
+                limit=self.connection_limit,
+                limit_per_host=self.connection_limit_per_host,
+                ttl_dns_cache=self.dns_cache_ttl,
+                use_dns_cache=True,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            self._session = ClientSession(connector=connector)
+        return self._session
+
+    def limiter(self, name: str, limit: int) -> PriorityLimiter:
+        """
+        Return the shared concurrency limiter with a given name, creating it on first use.
+
+        Every indexer asking for the same name (e.g. "flaresolverr") shares one limit;
+        the first caller's `limit` wins. Waiters are served in priority order.
+
+        Args:
+            name (str): The limiter name.
+            limit (int): Maximum concurrent holders, used when the limiter is created.
+
+        Returns:
+            PriorityLimiter: The limiter.
+        """
+        if name not in self.limiters:
+            self.limiters[name] = PriorityLimiter(limit)
+        return self.limiters[name]
+
+    async def request(self, method: str, url: str, timeout: float = 30.0, **kwargs: Any) -> Tuple[int, bytes]:
+        """
+        Perform a request through the shared session and record its metrics.
+
+        Args:
+            method (str): HTTP method.
+            url (str): The URL.
+            timeout (float): Total timeout in seconds.
+            **kwargs: Passed on to aiohttp.
+
+        Returns:
+            Tuple[int, bytes]: The status code and response body.
+
+        Raises:
+            aiohttp.ClientError: On connection or protocol errors.
+            asyncio.TimeoutError: If the request times out.
+        """
+        if self.budget is not None and self.budget.under_pressure:
+            self.metrics.increment("requests_paused")
+            await self.budget.wait()
+
+        started = time.perf_counter()
+        try:
+            async with self.session.request(method, url, timeout=aiohttp.ClientTimeout(total=timeout), **kwargs) as response:
+                body = await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            self.metrics.record(url, time.perf_counter() - started, error=True)
+            raise
+        self.metrics.record(url, time.perf_counter() - started, len(body), error=response.status >= 400)
+        return response.status, body
+
+    async def with_retries(self, fetch: Callable[[], Awaitable[Optional[T]]], max_retries: int, logger: logging.Logger, backoff_base: float = 2.0) -> Optional[T]:
+        """
+        Call `fetch` until it returns a result, backing off exponentially between attempts.
+
+        Args:
+            fetch (Callable[[], Awaitable[Optional[T]]]): Performs one attempt; a falsy result counts as a failure.
+            max_retries (int): Maximum number of attempts.
+            logger (logging.Logger): Logger instance.
+            backoff_base (float): Base of the exponential backoff, in seconds.
+
+        Returns:
+            Optional[T]: The first successful result, or None if every attempt failed.
+        """
+        for attempt in range(max_retries):
+            try:
+                result = await fetch()
+                if result:
+                    return result
+            except Exception as e:
+                logger.error(f"Attempt {attempt + 1} failed: {str(e)}")
+
+            self.metrics.increment("retries")
+            await asyncio.sleep(backoff_base ** attempt)  # Exponential backoff
+
+        return None
+
+    async def check_flaresolverr(self, flaresolverr_url: str, logger: logging.Logger) -> bool:
+        """
+        Check that FlareSolverr is reachable.
+
+        Args:
+            flaresolverr_url (str): The FlareSolverr API URL.
+            logger (logging.Logger): Logger instance.
+
+        Returns:
+            bool: True if FlareSolverr answered.
+        """
+        try:
+            status, _ = await self.request("GET", flaresolverr_url, timeout=30)
+            if status in [200, 405]:
+                return True
+            logger.error(f"FlareSolverr returned status code: {status}")
+        except aiohttp.ClientConnectorError as e:
+            logger.error(f"Connection error to FlareSolverr: {str(e)}")
+        except asyncio.TimeoutError:
+            logger.error("Timeout while connecting to FlareSolverr")
+        except Exception as e:
+            logger.error(f"Unexpected error checking FlareSolverr: {str(e)}")
+        return False
+
+    async def flaresolverr_get(self, url: str, flaresolverr_url: str, logger: logging.Logger, use_cache: bool = True, mirrors: Optional[MirrorPool] = None, limiter: Optional[PriorityLimiter] = None, priority: int = PRIORITY_LIST, rank: float = 0.0) -> Optional[str]:
+        """
+        Fetch a page through FlareSolverr.
+
+        Args:
+            url (str): The page URL.
+            flaresolverr_url (str): The FlareSolverr API URL.
+            logger (logging.Logger): Logger instance.
+            use_cache (bool): Serve and store the page in the shared response cache.
+            mirrors (Optional[MirrorPool]): Mirror pool to route the fetch through; `url` stays the canonical
+                URL and cache key.
+            limiter (Optional[PriorityLimiter]): Limiter to take a slot from, only once the page is
+                neither cached nor already being fetched.
+            priority (int): Priority of the request within the limiter's queue.
+            rank (float): Order among requests of the same priority; lower is served first.
+
+        Returns:
+            Optional[str]: The page HTML, or None if the fetch failed.
+        """
+        if use_cache:
+            cached_response = await self.cache.get(url)
+            if cached_response:
+                self.metrics.increment("cache_hits")
+                return cached_response
+            self.metrics.increment("cache_misses")
+
+        async def fetch() -> Optional[str]:
+            if limiter is not None:
+                async with limiter.slot(priority, rank):
+                    return await solve()
+            return await solve()
+
+        async def solve() -> Optional[str]:
+            if mirrors is not None:
+                html_content = await mirrors.fetch(url, lambda mirror_url: self._flaresolverr_solve(mirror_url, flaresolverr_url, logger, raise_site_errors=True))
+            else:
+                html_content = await self._flaresolverr_solve(url, flaresolverr_url, logger)
+            if html_content is not None:
+                await self.cache.set(url, html_content)
+            return html_content
+
+        # Duplicate links and racing retries share one solve instead of each paying for it
+        return await self.single_flight.run(url, fetch)
+
+    async def _flaresolverr_solve(self, url: str, flaresolverr_url: str, logger: logging.Logger, raise_site_errors: bool = False) -> Optional[str]:
+        # With `raise_site_errors`, failures of the site itself raise MirrorError so the mirror pool can tell them
+        # apart from FlareSolverr's own errors, which say nothing about the mirror
+        headers = {"Content-Type": "application/json"}
+        data = {
+            "cmd": "request.get",
+            "url": url,
+            "maxTimeout": 60000
+        }
+
+        try:
+            _, body = await self.request("POST", flaresolverr_url, timeout=90, headers=headers, json=data)
+            result = orjson.loads(body)
+        except asyncio.TimeoutError:
+            logger.error(f"Timeout error while fetching {url}")
+            return None
+        except aiohttp.ClientError as e:
+            logger.error(f"Client error while fetching {url}: {str(e)}")
+            return None
+        except orjson.JSONDecodeError:
+            logger.error(f"JSON decode error for FlareSolverr response from {url}")
+            return None
+        except Exception as e:
+            logger.error(f"Unexpected error while fetching {url}: {str(e)}")
+            return None
+
+        try:
+            if result['status'] == 'ok':
+                solution = result['solution']
+                if raise_site_errors and solution.get('status', 200) >= 500:
+                    raise MirrorError(f"Server error {solution['status']} fetching {url}")
+                return solution['response']
+            # The browser could not reach the site at all, e.g. net::ERR_NAME_NOT_RESOLVED
+            if raise_site_errors and "net::ERR_" in str(result.get('message', '')):
+                raise MirrorError(f"FlareSolverr could not reach {url}: {result['message']}")
+            logger.error(f"FlareSolverr error for {url}: {result.get('message')}")
+            logger.debug(f"Full FlareSolverr response: {result}")
+        except (KeyError, TypeError) as e:
+            logger.error(f"Unexpected FlareSolverr response for {url}: {str(e)}")
+        return None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the request metrics and limiter queues, plus the memory budget and mirror states when in use."""
+        snapshot = self.metrics.snapshot()
+        snapshot["totals"]["coalesced"] = self.single_flight.coalesced
+        snapshot["limiters"] = {name: limiter.stats() for name, limiter in self.limiters.items()}
+        if self.budget is not None:
+            snapshot["memory"] = self.budget.stats()
+        if self.mirror_pools:
+            snapshot["mirrors"] = {name: pool.stats() for name, pool in self.mirror_pools.items()}
+        return snapshot
+
+    async def close(self) -> None:
+        for task in self._background:
+            task.cancel()
+        await asyncio.gather(*self._background, return_exceptions=True)
+        self._background = []
+        if self.budget is not None:
+            await self.budget.stop()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+def from_settings(settings: Dict[str, Any], logger: logging.Logger) -> TransportRuntime:
+    """
+    Create the transport runtime from the optional `runtime` and `memory_budget` configuration sections.
+
+    Args:
+        settings (Dict[str, Any]): The configuration dictionary.
+        logger (logging.Logger): Logger instance.
+
+    Returns:
+        TransportRuntime: The runtime.
+    """
+    runtime_settings = settings.get("runtime", {})
+    budget_settings = settings.get("memory_budget", {})
+    budget = None
+    if budget_settings.get("enabled", False):
+        budget = MemoryBudget(
+            limit_mb=budget_settings["limit_mb"],
+            high_watermark=budget_settings.get("high_watermark", 0.9),
+            low_watermark=budget_settings.get("low_watermark", 0.75),
+            check_interval=budget_settings.get("check_interval", 0.5),
+            max_pause=budget_settings.get("max_pause", 30.0),
+            logger=logger
+        )
+        logger.info(f"Memory budget of {budget_settings['limit_mb']}MB enabled")
+
+    return TransportRuntime(
+        connection_limit=runtime_settings.get("connection_limit", 100),
+        connection_limit_per_host=runtime_settings.get("connection_limit_per_host", 16),
+        dns_cache_ttl=runtime_settings.get("dns_cache_ttl", 300),
+        keepalive_timeout=runtime_settings.get("keepalive_timeout", 30.0),
+        cache_entries=runtime_settings.get("cache_entries", 2048),
+        budget=budget,
+        logger=logger
+    )
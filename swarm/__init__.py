@@ -0,0 +1,3 @@
+from .swarm_stats import SwarmStats, scrape as scrape_swarm_stats, annotate_torrents, from_settings as swarm_stats_from_settings
+from .udp_scrape import UDPTrackerClient
+from .http_scrape import HTTPTrackerClient
@@ -0,0 +1,64 @@
+"""
+Bencode decoding module for the indexer application.
+
+This module provides a minimal decoder for the bencoded dictionaries
+returned by HTTP tracker scrape endpoints.
+"""
+
+from typing import Any, Tuple
+
+class BencodeError(ValueError):
+    """Exception raised for malformed bencoded data."""
+    pass
+
+def decode(data: bytes) -> Any:
+    """
+    Decode a bencoded value.
+
+    Dictionary keys are returned as bytes, since scrape responses key
+    their `files` dictionary by raw 20-byte infohashes.
+
+    Args:
+        data (bytes): The bencoded data.
+
+    Returns:
+        Any: The decoded value.
+
+    Raises:
+        BencodeError: If the data is malformed or has trailing bytes.
+    """
+    try:
+        value, index = _decode(data, 0)
+    except (IndexError, ValueError) as e:
+        raise BencodeError(f"Malformed bencoded data: {str(e)}")
+    if index != len(data):
+        raise BencodeError("Trailing data after bencoded value")
+    return value
+
+def _decode(data: bytes, index: int) -> Tuple[Any, int]:
+    token = data[index:index + 1]
+    if token == b"i":
+        end = data.index(b"e", index)
+        return int(data[index + 1:end]), end + 1
+    if token == b"l":
+        index += 1
+        items = []
+        while data[index:index + 1] != b"e":
+            item, index = _decode(data, index)
+            items.append(item)
+        return items, index + 1
+    if token == b"d":
+        index += 1
+        result = {}
+        while data[index:index + 1] != b"e":
+            key, index = _decode(data, index)
+            result[key], index = _decode(data, index)
+        return result, index + 1
+    if token.isdigit():
+        colon = data.index(b":", index)
+        length = int(data[index:colon])
+        start = colon + 1
+        if start + length > len(data):
+            raise ValueError("string length exceeds data")
+        return data[start:start + length], start + length
+    raise ValueError(f"unexpected token {token!r} at offset {index}")
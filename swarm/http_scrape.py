@@ -0,0 +1,90 @@
+"""
+HTTP tracker scrape module for the indexer application.
+
+This module implements the HTTP scrape convention (BEP 48), requesting
+several infohashes per scrape URL.
+"""
+
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote_from_bytes
+
+import aiohttp
+
+from runtime import TransportRuntime
+from .bencode import decode, BencodeError
+from .udp_scrape import TrackerError, MAX_INFOHASHES_PER_SCRAPE
+
+def scrape_url_from_announce(announce_url: str) -> Optional[str]:
+    """
+    Derive a tracker's scrape URL from its announce URL.
+
+    Args:
+        announce_url (str): The announce URL.
+
+    Returns:
+        Optional[str]: The scrape URL, or None if the tracker does not support scraping.
+    """
+    path_start = announce_url.rfind("/") + 1
+    if not announce_url[path_start:].startswith("announce"):
+        return None
+    return announce_url[:path_start] + "scrape" + announce_url[path_start + len("announce"):]
+
+class HTTPTrackerClient:
+    """Client for a single HTTP(S) tracker, requesting through the shared transport runtime."""
+
+    def __init__(self, runtime: TransportRuntime, announce_url: str, timeout: float = 10.0, concurrency: int = 4, logger: Optional[logging.Logger] = None):
+        self.runtime = runtime
+        self.scrape_url = scrape_url_from_announce(announce_url)
+        self.timeout = timeout
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.logger = logger or logging.getLogger(__name__)
+
+    async def _scrape_batch(self, infohashes: List[bytes]) -> Dict[str, Tuple[int, int, int]]:
+        separator = "&" if "?" in self.scrape_url else "?"
+        query = "&".join(f"info_hash={quote_from_bytes(infohash)}" for infohash in infohashes)
+
+        async with self.semaphore:
+            status, body = await self.runtime.request("GET", f"{self.scrape_url}{separator}{query}", timeout=self.timeout)
+        if status >= 400:
+            raise TrackerError(f"Scrape request failed with status {status}")
+
+        decoded = decode(body)
+        if not isinstance(decoded, dict):
+            raise TrackerError("Scrape response is not a dictionary")
+        if b"failure reason" in decoded:
+            raise TrackerError(decoded[b"failure reason"].decode("utf-8", "replace"))
+
+        results = {}
+        for infohash, stats in decoded.get(b"files", {}).items():
+            results[infohash.hex()] = (stats.get(b"complete", 0), stats.get(b"downloaded", 0), stats.get(b"incomplete", 0))
+        return results
+
+    async def scrape(self, infohashes: List[bytes]) -> Dict[str, Tuple[int, int, int]]:
+        """
+        Scrape swarm statistics for a list of infohashes.
+
+        Args:
+            infohashes (List[bytes]): Raw 20-byte infohashes.
+
+        Returns:
+            Dict[str, Tuple[int, int, int]]: (seeders, completed, leechers) keyed by hex infohash.
+        """
+        if self.scrape_url is None:
+            return {}
+
+        batches = [infohashes[i:i + MAX_INFOHASHES_PER_SCRAPE] for i in range(0, len(infohashes), MAX_INFOHASHES_PER_SCRAPE)]
+        results: Dict[str, Tuple[int, int, int]] = {}
+
+        for outcome in await asyncio.gather(*(self._scrape_batch(batch) for batch in batches), return_exceptions=True):
+            if isinstance(outcome, (aiohttp.ClientError, asyncio.TimeoutError, BencodeError, TrackerError)):
+                self.logger.warning(f"Scrape batch failed for {self.scrape_url}: {str(outcome)}")
+                continue
+            if isinstance(outcome, Exception):
+                raise outcome
+            results.update(outcome)
+        return results
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,177 @@
+"""
+Swarm statistics module for the indexer application.
+
+This module scrapes seeder, leecher and completed counts for batches of
+infohashes from a configurable list of UDP and HTTP trackers, querying
+all trackers concurrently and keeping the best figures reported.
+"""
+
+import asyncio
+import logging
+from typing import Dict, Any, Iterable, List, Optional
+from urllib.parse import urlparse
+
+from dedup import infohash_key
+from runtime import TransportRuntime
+from .udp_scrape import UDPTrackerClient
+from .http_scrape import HTTPTrackerClient
+
+class SwarmStats:
+    """
+    Scrapes swarm statistics from several trackers.
+
+    Tracker clients are created once and reused, so UDP connection IDs
+    stay cached between calls to `scrape`. HTTP trackers are scraped
+    through the shared transport runtime's connection pool.
+    """
+
+    def __init__(self, trackers: List[str], runtime: TransportRuntime, timeout: float = 5.0, retries: int = 2, per_tracker_concurrency: int = 4, logger: Optional[logging.Logger] = None):
+        self.trackers = trackers
+        self.runtime = runtime
+        self.timeout = timeout
+        self.retries = retries
+        self.per_tracker_concurrency = per_tracker_concurrency
+        self.logger = logger or logging.getLogger(__name__)
+        self.clients: Dict[str, Any] = {}
+
+    def _client(self, tracker: str):
+        if tracker in self.clients:
+            return self.clients[tracker]
+
+        parsed = urlparse(tracker)
+        if parsed.scheme == "udp":
+            client = UDPTrackerClient(parsed.hostname, parsed.port or 80, self.timeout, self.retries, self.per_tracker_concurrency, self.logger)
+        elif parsed.scheme in ("http", "https"):
+            client = HTTPTrackerClient(self.runtime, tracker, self.timeout * (self.retries + 1), self.per_tracker_concurrency, self.logger)
+        else:
+            self.logger.warning(f"Unsupported tracker scheme, skipping: {tracker}")
+            client = None
+
+        self.clients[tracker] = client
+        return client
+
+    async def _scrape_tracker(self, tracker: str, raw_hashes: List[bytes]) -> Dict[str, tuple]:
+        client = self._client(tracker)
+        if client is None:
+            return {}
+        try:
+            return await client.scrape(raw_hashes)
+        except Exception as e:
+            self.logger.warning(f"Scrape failed for tracker {tracker}: {str(e)}")
+            return {}
+
+    async def scrape(self, infohashes: Iterable[str]) -> Dict[str, Dict[str, int]]:
+        """
+        Scrape swarm statistics for a set of infohashes.
+
+        Args:
+            infohashes (Iterable[str]): Infohashes in hex, base32 or magnet URI form.
+
+        Returns:
+            Dict[str, Dict[str, int]]: For each lower-case hex infohash reported by at least one tracker,
+                the highest `seeders`, `leechers` and `completed` counts seen and the number of `trackers` reporting it.
+        """
+        hex_hashes = set()
+        for value in infohashes:
+            key = infohash_key(value)
+            if key is not None:
+                hex_hashes.add(key[len("btih:"):])
+        raw_hashes = [bytes.fromhex(h) for h in sorted(hex_hashes)]
+
+        if not raw_hashes or not self.trackers:
+            return {}
+
+        self.logger.info(f"Scraping {len(raw_hashes)} infohashes from {len(self.trackers)} trackers")
+        per_tracker = await asyncio.gather(*(self._scrape_tracker(tracker, raw_hashes) for tracker in self.trackers))
+
+        stats: Dict[str, Dict[str, int]] = {}
+        for results in per_tracker:
+            for infohash, (seeders, completed, leechers) in results.items():
+                entry = stats.setdefault(infohash, {"seeders": 0, "leechers": 0, "completed": 0, "trackers": 0})
+                entry["seeders"] = max(entry["seeders"], seeders)
+                entry["leechers"] = max(entry["leechers"], leechers)
+                entry["completed"] = max(entry["completed"], completed)
+                entry["trackers"] += 1
+
+        self.logger.info(f"Received swarm statistics for {len(stats)}/{len(raw_hashes)} infohashes")
+        return stats
+
+    async def close(self) -> None:
+        for client in self.clients.values():
+            if client is not None:
+                client.close()
+        self.clients.clear()
+
+async def scrape(infohashes: Iterable[str], trackers: List[str], logger: logging.Logger, timeout: float = 5.0, retries: int = 2, per_tracker_concurrency: int = 4, runtime: Optional[TransportRuntime] = None) -> Dict[str, Dict[str, int]]:
+    """
+    Scrape swarm statistics once, closing all tracker connections afterwards.
+
+    Args:
+        infohashes (Iterable[str]): Infohashes in hex, base32 or magnet URI form.
+        trackers (List[str]): Tracker announce URLs (udp://, http:// or https://).
+        logger (logging.Logger): Logger instance.
+        timeout (float): Per-request timeout in seconds; UDP retries back off from this value.
+        retries (int): Number of retries per UDP request.
+        per_tracker_concurrency (int): Maximum concurrent scrape requests per tracker.
+        runtime (Optional[TransportRuntime]): The shared transport runtime; a private one is used if omitted.
+
+    Returns:
+        Dict[str, Dict[str, int]]: Swarm statistics keyed by lower-case hex infohash.
+    """
+    owns_runtime = runtime is None
+    if owns_runtime:
+        runtime = TransportRuntime(logger=logger)
+
+    swarm_stats = SwarmStats(trackers, runtime, timeout, retries, per_tracker_concurrency, logger)
+    try:
+        return await swarm_stats.scrape(infohashes)
+    finally:
+        await swarm_stats.close()
+        if owns_runtime:
+            await runtime.close()
+
+def annotate_torrents(records: List[Dict[str, Any]], stats: Dict[str, Dict[str, int]]) -> int:
+    """
+    Attach scraped swarm statistics to each record's torrents.
+
+    Args:
+        records (List[Dict[str, Any]]): Records with a `torrents` list whose entries carry a `hash`.
+        stats (Dict[str, Dict[str, int]]): Statistics as returned by `scrape`.
+
+    Returns:
+        int: The number of torrents annotated.
+    """
+    annotated = 0
+    for record in records:
+        for torrent in record.get("torrents") or []:
+            key = infohash_key(torrent.get("hash", ""))
+            entry = stats.get(key[len("btih:"):]) if key else None
+            if entry is not None:
+                torrent["swarm"] = entry
+                annotated += 1
+    return annotated
+
+def from_settings(settings: Dict[str, Any], logger: logging.Logger, runtime: TransportRuntime) -> Optional[SwarmStats]:
+    """
+    Create a swarm statistics scraper from the `swarm_stats` configuration section.
+
+    Args:
+        settings (Dict[str, Any]): The configuration dictionary.
+        logger (logging.Logger): Logger instance.
+        runtime (TransportRuntime): The shared transport runtime, used for HTTP tracker scrapes.
+
+    Returns:
+        Optional[SwarmStats]: The scraper, or None if swarm statistics are disabled.
+    """
+    swarm_settings = settings.get("swarm_stats", {})
+    if not swarm_settings.get("enabled", False):
+        return None
+
+    return SwarmStats(
+        swarm_settings.get("trackers", []),
+        runtime,
+        timeout=swarm_settings.get("timeout", 5.0),
+        retries=swarm_settings.get("retries", 2),
+        per_tracker_concurrency=swarm_settings.get("per_tracker_concurrency", 4),
+        logger=logger
+    )
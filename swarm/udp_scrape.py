@@ -0,0 +1,167 @@
+"""
+UDP tracker scrape module for the indexer application.
+
+This module implements the connect and scrape actions of the UDP tracker
+protocol (BEP 15), batching as many infohashes per packet as the protocol
+allows and caching connection IDs for their permitted lifetime.
+"""
+
+import time
+import random
+import struct
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
+
+PROTOCOL_ID = 0x41727101980
+ACTION_CONNECT = 0
+ACTION_SCRAPE = 2
+ACTION_ERROR = 3
+
+# BEP 15: "Up to about 74 torrents can be scraped at once."
+MAX_INFOHASHES_PER_SCRAPE = 74
+# BEP 15: a connection ID may be reused for one minute after it is received.
+CONNECTION_ID_TTL = 60.0
+
+class TrackerError(Exception):
+    """Exception raised when a tracker returns an error or an invalid response."""
+    pass
+
+class _TrackerProtocol(asyncio.DatagramProtocol):
+    def __init__(self):
+        self.waiters: Dict[int, asyncio.Future] = {}
+        self.closed: Optional[asyncio.Future] = None
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        if len(data) < 8:
+            return
+        transaction_id = struct.unpack_from(">I", data, 4)[0]
+        waiter = self.waiters.pop(transaction_id, None)
+        if waiter is not None and not waiter.done():
+            waiter.set_result(data)
+
+    def error_received(self, exc: Exception) -> None:
+        for waiter in self.waiters.values():
+            if not waiter.done():
+                waiter.set_exception(exc)
+        self.waiters.clear()
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self.error_received(exc or ConnectionError("UDP tracker transport closed"))
+
+class UDPTrackerClient:
+    """
+    Client for a single UDP tracker.
+
+    Requests share one datagram socket and are matched to responses by
+    transaction ID, so several scrapes may be in flight at once up to
+    `concurrency`.
+    """
+
+    def __init__(self, host: str, port: int, timeout: float = 5.0, retries: int = 2, concurrency: int = 4, logger: Optional[logging.Logger] = None):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.retries = retries
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.logger = logger or logging.getLogger(__name__)
+        self.transport: Optional[asyncio.DatagramTransport] = None
+        self.protocol: Optional[_TrackerProtocol] = None
+        self.connection_id: Optional[int] = None
+        self.connection_expires = 0.0
+        self.connect_lock = asyncio.Lock()
+
+    async def _ensure_transport(self) -> None:
+        if self.transport is None or self.transport.is_closing():
+            loop = asyncio.get_running_loop()
+            self.transport, self.protocol = await loop.create_datagram_endpoint(
+                _TrackerProtocol, remote_addr=(self.host, self.port)
+            )
+
+    async def _request(self, build_packet) -> bytes:
+        await self._ensure_transport()
+        loop = asyncio.get_running_loop()
+
+        for attempt in range(self.retries + 1):
+            transaction_id = random.getrandbits(32)
+            waiter = loop.create_future()
+            self.protocol.waiters[transaction_id] = waiter
+            self.transport.sendto(build_packet(transaction_id))
+            try:
+                data = await asyncio.wait_for(waiter, timeout=self.timeout * (2 ** attempt))
+            except asyncio.TimeoutError:
+                self.protocol.waiters.pop(transaction_id, None)
+                self.logger.debug(f"Timeout from udp://{self.host}:{self.port} (attempt {attempt + 1})")
+                continue
+
+            action = struct.unpack_from(">I", data, 0)[0]
+            if action == ACTION_ERROR:
+                raise TrackerError(data[8:].decode("utf-8", "replace"))
+            return data
+
+        raise asyncio.TimeoutError(f"No response from udp://{self.host}:{self.port}")
+
+    async def connect(self) -> int:
+        """
+        Obtain a connection ID, reusing a cached one while it is still valid.
+
+        Returns:
+            int: The connection ID.
+        """
+        async with self.connect_lock:
+            if self.connection_id is not None and time.monotonic() < self.connection_expires:
+                return self.connection_id
+
+            data = await self._request(lambda tid: struct.pack(">QII", PROTOCOL_ID, ACTION_CONNECT, tid))
+            if len(data) < 16 or struct.unpack_from(">I", data, 0)[0] != ACTION_CONNECT:
+                raise TrackerError("Invalid connect response")
+
+            self.connection_id = struct.unpack_from(">Q", data, 8)[0]
+            self.connection_expires = time.monotonic() + CONNECTION_ID_TTL
+            return self.connection_id
+
+    async def _scrape_batch(self, infohashes: List[bytes]) -> Dict[str, Tuple[int, int, int]]:
+        async with self.semaphore:
+            connection_id = await self.connect()
+            payload = b"".join(infohashes)
+            data = await self._request(lambda tid: struct.pack(">QII", connection_id, ACTION_SCRAPE, tid) + payload)
+
+        if struct.unpack_from(">I", data, 0)[0] != ACTION_SCRAPE:
+            raise TrackerError("Invalid scrape response")
+
+        results = {}
+        for index, infohash in enumerate(infohashes):
+            offset = 8 + index * 12
+            if offset + 12 > len(data):
+                break
+            seeders, completed, leechers = struct.unpack_from(">III", data, offset)
+            results[infohash.hex()] = (seeders, completed, leechers)
+        return results
+
+    async def scrape(self, infohashes: List[bytes]) -> Dict[str, Tuple[int, int, int]]:
+        """
+        Scrape swarm statistics for a list of infohashes.
+
+        Args:
+            infohashes (List[bytes]): Raw 20-byte infohashes.
+
+        Returns:
+            Dict[str, Tuple[int, int, int]]: (seeders, completed, leechers) keyed by hex infohash.
+                Batches that fail are logged and omitted.
+        """
+        batches = [infohashes[i:i + MAX_INFOHASHES_PER_SCRAPE] for i in range(0, len(infohashes), MAX_INFOHASHES_PER_SCRAPE)]
+        results: Dict[str, Tuple[int, int, int]] = {}
+
+        for outcome in await asyncio.gather(*(self._scrape_batch(batch) for batch in batches), return_exceptions=True):
+            if isinstance(outcome, Exception):
+                self.logger.warning(f"Scrape batch failed for udp://{self.host}:{self.port}: {str(outcome)}")
+                # Drop the cached connection ID in case the tracker restarted.
+                self.connection_id = None
+                continue
+            results.update(outcome)
+        return results
+
+    def close(self) -> None:
+        if self.transport is not None:
+            self.transport.close()
+            self.transport = None
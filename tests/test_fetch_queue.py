@@ -0,0 +1,196 @@
+import asyncio
+
+import pytest
+
+from runtime import PriorityLimiter, SingleFlight, PRIORITY_LIST, PRIORITY_DETAIL, PRIORITY_RETRY
+
+def test_waiters_are_served_by_priority_then_rank_then_arrival():
+    async def main():
+        limiter = PriorityLimiter(1)
+        served = []
+
+        async def request(name, priority, rank=0.0):
+            async with limiter.slot(priority, rank):
+                served.append(name)
+
+        await limiter.acquire()
+        tasks = [
+            asyncio.ensure_future(request("retry", PRIORITY_RETRY)),
+            asyncio.ensure_future(request("detail-weak", PRIORITY_DETAIL, -0.2)),
+            asyncio.ensure_future(request("detail-strong", PRIORITY_DETAIL, -0.9)),
+            asyncio.ensure_future(request("detail-unranked-1", PRIORITY_DETAIL)),
+            asyncio.ensure_future(request("list", PRIORITY_LIST)),
+            asyncio.ensure_future(request("detail-unranked-2", PRIORITY_DETAIL)),
+        ]
+        await asyncio.sleep(0)
+        assert limiter.stats() == {"limit": 1, "active": 1, "waiting_list": 1, "waiting_detail": 4, "waiting_retry": 1}
+
+        limiter.release()
+        await asyncio.gather(*tasks)
+        assert served == ["list", "detail-strong", "detail-weak", "detail-unranked-1", "detail-unranked-2", "retry"]
+        assert limiter.active == 0
+
+    asyncio.run(main())
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def main():
+        limiter = PriorityLimiter(1)
+        await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire(PRIORITY_DETAIL))
+        await asyncio.sleep(0)
+
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert limiter.waiters == []
+
+        limiter.release()
+        assert limiter.active == 0
+
+    asyncio.run(main())
+
+def test_slot_handed_to_a_cancelled_waiter_is_passed_on():
+    async def main():
+        limiter = PriorityLimiter(1)
+        await limiter.acquire()
+        first = asyncio.ensure_future(limiter.acquire(PRIORITY_LIST))
+        second = asyncio.ensure_future(limiter.acquire(PRIORITY_DETAIL))
+        await asyncio.sleep(0)
+
+        # The slot goes to `first`, which is cancelled before it gets to run
+        limiter.release()
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+        await asyncio.wait_for(second, 1)
+        assert limiter.active == 1
+        limiter.release()
+        assert limiter.active == 0
+
+    asyncio.run(main())
+
+def test_release_skips_a_waiter_cancelled_before_it_resumed():
+    async def main():
+        limiter = PriorityLimiter(1)
+        await limiter.acquire()
+        cancelled = asyncio.ensure_future(limiter.acquire(PRIORITY_LIST))
+        other = asyncio.ensure_future(limiter.acquire(PRIORITY_DETAIL))
+        await asyncio.sleep(0)
+
+        # Cancelled first, released before the cancelled task gets to run
+        cancelled.cancel()
+        limiter.release()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+
+        await asyncio.wait_for(other, 1)
+        assert limiter.active == 1
+        limiter.release()
+        assert limiter.active == 0
+        assert limiter.waiters == []
+
+        # The slot is free again rather than leaked
+        await asyncio.wait_for(limiter.acquire(), 1)
+
+    asyncio.run(main())
+
+def test_release_with_only_cancelled_waiters_frees_the_slot():
+    async def main():
+        limiter = PriorityLimiter(1)
+        await limiter.acquire()
+        cancelled = asyncio.ensure_future(limiter.acquire(PRIORITY_DETAIL))
+        await asyncio.sleep(0)
+
+        cancelled.cancel()
+        limiter.release()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        assert limiter.active == 0
+        await asyncio.wait_for(limiter.acquire(), 1)
+
+    asyncio.run(main())
+
+def test_limit_is_never_exceeded():
+    async def main():
+        limiter = PriorityLimiter(3)
+        running = peak = 0
+
+        async def request(priority):
+            nonlocal running, peak
+            async with limiter.slot(priority):
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.001)
+                running -= 1
+
+        await asyncio.gather(*(request(index % 3) for index in range(30)))
+        assert peak == 3
+        assert limiter.active == 0
+
+    asyncio.run(main())
+
+def test_single_flight_shares_one_call():
+    async def main():
+        single_flight = SingleFlight()
+        calls = 0
+        release = asyncio.Event()
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return "page"
+
+        tasks = [asyncio.ensure_future(single_flight.run("url", fetch)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        assert await asyncio.gather(*tasks) == ["page"] * 3
+        assert calls == 1
+        assert single_flight.coalesced == 2
+        assert single_flight.in_flight == {}
+
+    asyncio.run(main())
+
+def test_single_flight_propagates_exceptions_to_every_caller():
+    async def main():
+        single_flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def fetch():
+            await release.wait()
+            raise ValueError("solve failed")
+
+        tasks = [asyncio.ensure_future(single_flight.run("url", fetch)) for _ in range(2)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        assert [type(result) for result in results] == [ValueError, ValueError]
+        assert single_flight.in_flight == {}
+
+        # A lone failing call raises without leaving an unretrieved exception behind
+        with pytest.raises(ValueError):
+            await single_flight.run("url", fetch)
+
+    asyncio.run(main())
+
+def test_cancelled_leader_hands_waiters_none():
+    async def main():
+        single_flight = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(10)
+            return "page"
+
+        leader = asyncio.ensure_future(single_flight.run("url", fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(single_flight.run("url", fetch))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        assert await asyncio.wait_for(follower, 1) is None
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        assert single_flight.in_flight == {}
+
+    asyncio.run(main())
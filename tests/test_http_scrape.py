@@ -0,0 +1,85 @@
+import asyncio
+from typing import Any, List
+from urllib.parse import unquote_to_bytes
+
+from aiohttp import web
+
+from runtime import TransportRuntime
+from swarm.http_scrape import HTTPTrackerClient, scrape_url_from_announce
+from swarm.udp_scrape import MAX_INFOHASHES_PER_SCRAPE
+
+def bencode(value: Any) -> bytes:
+    if isinstance(value, int):
+        return b"i%de" % value
+    if isinstance(value, str):
+        value = value.encode("utf-8")
+    if isinstance(value, bytes):
+        return b"%d:%s" % (len(value), value)
+    if isinstance(value, dict):
+        return b"d" + b"".join(bencode(key) + bencode(value[key]) for key in sorted(value)) + b"e"
+    raise TypeError(type(value))
+
+def infohash(index: int) -> bytes:
+    return index.to_bytes(20, "big")
+
+def run_with_tracker(scenario, failure_reason: str = None):
+    batches: List[List[bytes]] = []
+
+    async def scrape(request: web.Request) -> web.Response:
+        # Infohashes are raw bytes, so they have to be taken from the undecoded query string
+        hashes = [unquote_to_bytes(pair[len("info_hash="):]) for pair in request.rel_url.raw_query_string.split("&")]
+        batches.append(hashes)
+        if failure_reason is not None:
+            return web.Response(body=bencode({"failure reason": failure_reason}))
+        files = {raw_hash: {"complete": raw_hash[-1], "downloaded": 100, "incomplete": 1} for raw_hash in hashes}
+        return web.Response(body=bencode({"files": files}))
+
+    async def main():
+        app = web.Application()
+        app.router.add_get("/scrape", scrape)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            runtime = TransportRuntime()
+            try:
+                client = HTTPTrackerClient(runtime, f"http://127.0.0.1:{port}/announce", timeout=5.0)
+                return await scenario(client, batches)
+            finally:
+                await runtime.close()
+        finally:
+            await runner.cleanup()
+
+    return asyncio.run(main())
+
+def test_scrape_url_from_announce():
+    assert scrape_url_from_announce("http://tracker.example/announce") == "http://tracker.example/scrape"
+    assert scrape_url_from_announce("http://tracker.example/x/announce.php?passkey=1") == "http://tracker.example/x/scrape.php?passkey=1"
+    assert scrape_url_from_announce("http://tracker.example/a") is None
+
+def test_bencoded_scrape_response_is_decoded_in_batches():
+    hashes = [infohash(index) for index in range(100)]
+
+    async def scenario(client, batches):
+        results = await client.scrape(hashes)
+        assert sorted(len(batch) for batch in batches) == [100 - MAX_INFOHASHES_PER_SCRAPE, MAX_INFOHASHES_PER_SCRAPE]
+        assert sorted(raw_hash for batch in batches for raw_hash in batch) == hashes
+        assert results == {raw_hash.hex(): (raw_hash[-1], 100, 1) for raw_hash in hashes}
+
+    run_with_tracker(scenario)
+
+def test_failure_reason_drops_the_batch():
+    async def scenario(client, batches):
+        assert await client.scrape([infohash(1)]) == {}
+        assert len(batches) == 1
+
+    run_with_tracker(scenario, failure_reason="unregistered torrent")
+
+def test_scrapes_go_through_the_shared_runtime():
+    async def scenario(client, batches):
+        await client.scrape([infohash(1)])
+        assert client.runtime.snapshot()["totals"]["requests"] == 1
+
+    run_with_tracker(scenario)
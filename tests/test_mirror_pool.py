@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+
+from exceptions import MirrorError
+from runtime import MirrorPool
+
+def make_pool() -> MirrorPool:
+    return MirrorPool("site", "https://a.example/", ["https://b.example/"], failure_threshold=2)
+
+def run_fetches(pool: MirrorPool, fetch, count: int) -> None:
+    async def main():
+        for _ in range(count):
+            try:
+                await pool.fetch("https://a.example/page", fetch)
+            except Exception:
+                pass
+
+    asyncio.run(main())
+
+def test_falsy_results_do_not_count_against_the_mirror():
+    async def flaresolverr_error(url):
+        return None
+
+    pool = make_pool()
+    run_fetches(pool, flaresolverr_error, 5)
+    assert pool.current.origin == "https://a.example"
+    assert pool.stats()["https://a.example"] == {"latency_ms": None, "healthy": True, "requests": 5, "errors": 0}
+
+def test_unrelated_exceptions_do_not_count_against_the_mirror():
+    async def broken_parser(url):
+        raise ValueError("not the mirror's fault")
+
+    pool = make_pool()
+    run_fetches(pool, broken_parser, 3)
+    assert pool.current.origin == "https://a.example"
+
+@pytest.mark.parametrize("error", [MirrorError("Server error 502"), asyncio.TimeoutError()])
+def test_site_failures_fail_over(error):
+    async def failing(url):
+        raise error
+
+    pool = make_pool()
+    run_fetches(pool, failing, 2)
+    assert pool.current.origin == "https://b.example"
+    assert pool.stats()["https://a.example"]["healthy"] is False
+
+def test_success_resets_consecutive_failures():
+    results = iter([MirrorError("503"), "page", MirrorError("503"), "page"])
+
+    async def flaky(url):
+        result = next(results)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    pool = make_pool()
+    run_fetches(pool, flaky, 4)
+    assert pool.current.origin == "https://a.example"
@@ -0,0 +1,38 @@
+from query.query_index import QueryIndex
+
+FULL = {
+    "_source": "1337x",
+    "title": "Example Movie",
+    "year": 2020,
+    "movie_page": "https://1337x.to/movie/123/example-movie-2020/",
+    "torrents": [{"uploader": "someone", "seeds": 120}],
+}
+# The list-page row the monitoring daemon writes for the same listing
+MONITOR = {
+    "_source": "1337x",
+    "title": "Example Movie",
+    "year": 2020,
+    "link": "https://1337x.to/movie/123/example-movie-2020/",
+}
+
+def test_monitor_record_does_not_drop_the_full_records_torrents():
+    index = QueryIndex()
+    index.add(FULL, "one_three_three_seven_x.json")
+    index.add(MONITOR, "1337x_monitor.jsonl")
+
+    assert len(index) == 1
+    assert index.top_by_seeders(1)[0]["seeders"] == 120
+    assert index.search("example movie")[0]["uploaders"] == ["someone"]
+
+def test_replacing_one_file_keeps_what_other_files_hold():
+    index = QueryIndex()
+    index.add(MONITOR, "1337x_monitor.jsonl")
+    index.add(FULL, "one_three_three_seven_x.json")
+
+    index.remove_path("one_three_three_seven_x.json")
+    assert len(index) == 1
+    assert index.top_by_seeders(1)[0]["seeders"] == 0
+
+    index.remove_path("1337x_monitor.jsonl")
+    assert len(index) == 0
+    assert index.parts == {}
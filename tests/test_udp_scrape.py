@@ -0,0 +1,144 @@
+import struct
+import asyncio
+from typing import List, Optional
+
+import pytest
+
+from swarm import udp_scrape
+from swarm.udp_scrape import UDPTrackerClient, TrackerError, PROTOCOL_ID, ACTION_CONNECT, ACTION_SCRAPE, ACTION_ERROR
+
+def infohash(index: int) -> bytes:
+    return index.to_bytes(20, "big")
+
+def stats_for(raw_hash: bytes) -> tuple:
+    # (seeders, completed, leechers) derived from the hash, so every answer can be checked
+    index = int.from_bytes(raw_hash, "big")
+    return index + 1, index * 2, index + 3
+
+class FakeTracker(asyncio.DatagramProtocol):
+    """A local UDP tracker speaking the connect and scrape actions of BEP 15."""
+
+    def __init__(self):
+        self.transport: Optional[asyncio.DatagramTransport] = None
+        self.connects = 0
+        self.scrape_batches: List[int] = []
+        self.connection_ids: List[int] = []
+        self.drop = 0
+        self.error: Optional[str] = None
+        self.error_on_connect = False
+        self.received = 0
+
+    def connection_made(self, transport: asyncio.DatagramTransport) -> None:
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        self.received += 1
+        if self.drop:
+            self.drop -= 1
+            return
+
+        connection_id, action, transaction_id = struct.unpack_from(">QII", data, 0)
+        if action == ACTION_CONNECT:
+            assert connection_id == PROTOCOL_ID
+            self.connects += 1
+            if self.error_on_connect:
+                return self.reply_error(transaction_id, addr)
+            self.connection_ids.append(0x1000 + self.connects)
+            self.transport.sendto(struct.pack(">IIQ", ACTION_CONNECT, transaction_id, self.connection_ids[-1]), addr)
+        elif action == ACTION_SCRAPE:
+            if connection_id != self.connection_ids[-1]:
+                return self.reply_error(transaction_id, addr, "Connection ID mismatch")
+            if self.error:
+                return self.reply_error(transaction_id, addr, self.error)
+            hashes = [data[offset:offset + 20] for offset in range(16, len(data), 20)]
+            self.scrape_batches.append(len(hashes))
+            reply = struct.pack(">II", ACTION_SCRAPE, transaction_id)
+            reply += b"".join(struct.pack(">III", *stats_for(raw_hash)) for raw_hash in hashes)
+            self.transport.sendto(reply, addr)
+
+    def reply_error(self, transaction_id: int, addr, message: str = "Tracker offline") -> None:
+        self.transport.sendto(struct.pack(">II", ACTION_ERROR, transaction_id) + message.encode("utf-8"), addr)
+
+def run_with_tracker(scenario, **client_options):
+    async def main():
+        loop = asyncio.get_running_loop()
+        transport, tracker = await loop.create_datagram_endpoint(FakeTracker, local_addr=("127.0.0.1", 0))
+        host, port = transport.get_extra_info("sockname")[:2]
+        client = UDPTrackerClient(host, port, **{"timeout": 0.2, "retries": 1, **client_options})
+        try:
+            return await scenario(client, tracker)
+        finally:
+            client.close()
+            transport.close()
+
+    return asyncio.run(main())
+
+def test_scrape_batches_74_infohashes_per_packet():
+    hashes = [infohash(index) for index in range(150)]
+
+    async def scenario(client, tracker):
+        results = await client.scrape(hashes)
+        assert sorted(tracker.scrape_batches) == [2, 74, 74]
+        assert results == {raw_hash.hex(): stats_for(raw_hash) for raw_hash in hashes}
+
+    run_with_tracker(scenario)
+
+def test_connection_id_is_reused_across_scrapes():
+    async def scenario(client, tracker):
+        await client.scrape([infohash(1)])
+        await client.scrape([infohash(2)])
+        assert tracker.connects == 1
+        assert client.connection_id == tracker.connection_ids[-1]
+
+    run_with_tracker(scenario)
+
+def test_connection_id_is_renewed_after_expiry(monkeypatch):
+    monkeypatch.setattr(udp_scrape, "CONNECTION_ID_TTL", 0.05)
+
+    async def scenario(client, tracker):
+        await client.scrape([infohash(1)])
+        await asyncio.sleep(0.1)
+        results = await client.scrape([infohash(2)])
+        assert tracker.connects == 2
+        assert results == {infohash(2).hex(): stats_for(infohash(2))}
+
+    run_with_tracker(scenario)
+
+def test_error_action_raises_tracker_error():
+    async def scenario(client, tracker):
+        tracker.error_on_connect = True
+        with pytest.raises(TrackerError, match="Tracker offline"):
+            await client.connect()
+
+    run_with_tracker(scenario)
+
+def test_scrape_error_drops_batch_and_cached_connection():
+    async def scenario(client, tracker):
+        await client.connect()
+        tracker.error = "Too many requests"
+        assert await client.scrape([infohash(1)]) == {}
+        assert client.connection_id is None
+
+        tracker.error = None
+        assert await client.scrape([infohash(1)]) == {infohash(1).hex(): stats_for(infohash(1))}
+        assert tracker.connects == 2
+
+    run_with_tracker(scenario)
+
+def test_lost_packet_is_retried():
+    async def scenario(client, tracker):
+        tracker.drop = 1
+        assert await client.scrape([infohash(3)]) == {infohash(3).hex(): stats_for(infohash(3))}
+        assert tracker.connects == 1
+        assert tracker.received == 3
+
+    run_with_tracker(scenario)
+
+def test_timeout_after_retries_are_exhausted():
+    async def scenario(client, tracker):
+        tracker.drop = 10
+        with pytest.raises(asyncio.TimeoutError):
+            await client.connect()
+        assert tracker.received == 3
+
+    run_with_tracker(scenario, timeout=0.05, retries=2)
@@ -1,2 +1,2 @@
-from .validate_config import config as validate_config
-from .validate_url import url as validate_url
\ No newline at end of file
+from .validate_config import config as validate_config, startup_config as validate_startup_config
+from .validate_url import url as validate_url
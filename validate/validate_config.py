@@ -18,8 +18,9 @@ async def config(config_dict: Dict[str, Any]) -> None:
     """
     Validate all configuration settings.
 
-    This function calls individual validation functions for each configuration section.
-    If any validation fails, it raises a ConfigValidationError.
+    This function calls individual validation functions for each configuration section,
+    except those `startup_config` has already checked. If any validation fails, it raises
+    a ConfigValidationError.
 
     Args:
         config_dict (Dict[str, Any]): The configuration dictionary to validate.
@@ -29,11 +30,40 @@ async def config(config_dict: Dict[str, Any]) -> None:
     """
     try:
         validate_debug_level(config_dict)
-        validate_path(config_dict, "path_for_list_of_supported_indexes", str)
         validate_fetch_concurrency_limit(config_dict)
         await validate_flaresolverr(config_dict)
         validate_path(config_dict, "output_dir", str)
         validate_max_retries(config_dict)
+        validate_dedup(config_dict)
+        validate_swarm_stats(config_dict)
+        validate_prefilter(config_dict)
+        validate_monitor(config_dict)
+        validate_fingerprints(config_dict)
+        validate_report(config_dict)
+        validate_preflight(config_dict)
+    except ConfigValidationError as e:
+        logging.critical(f"Configuration validation failed: {str(e)}")
+        raise
+
+def startup_config(config_dict: Dict[str, Any]) -> None:
+    """
+    Validate the settings needed before the preflight checks can run.
+
+    These are the supported indexes path and the sections the shared
+    transport runtime is built from. `config` validates everything else,
+    so each section is only checked once.
+
+    Args:
+        config_dict (Dict[str, Any]): The configuration dictionary to validate.
+
+    Raises:
+        ConfigValidationError: If any of these settings is invalid.
+    """
+    try:
+        validate_path(config_dict, "path_for_list_of_supported_indexes", str)
+        validate_runtime(config_dict)
+        validate_memory_budget(config_dict)
+        validate_mirrors(config_dict)
     except ConfigValidationError as e:
         logging.critical(f"Configuration validation failed: {str(e)}")
         raise
@@ -147,4 +177,304 @@ def validate_max_retries(config_dict: Dict[str, Any]) -> None:
     
     if max_retries.get("use_as_global_max_retry_value", False):
         if not isinstance(max_retries.get("count"), int):
-            raise ConfigValidationError("'max_retries.count' must be an integer when 'use_as_global_max_retry_value' is True.")
\ No newline at end of file
+            raise ConfigValidationError("'max_retries.count' must be an integer when 'use_as_global_max_retry_value' is True.")
+
+def validate_dedup(config_dict: Dict[str, Any]) -> None:
+    """
+    Validate the optional deduplication configuration.
+
+    Ensures the Bloom filter sizing and state directory are properly set.
+
+    Args:
+        config_dict (Dict[str, Any]): The configuration dictionary.
+
+    Raises:
+        ConfigValidationError: If the deduplication configuration is invalid.
+    """
+    dedup = config_dict.get("dedup", {})
+    if not isinstance(dedup, dict):
+        raise ConfigValidationError("'dedup' must be a dictionary.")
+
+    if not isinstance(dedup.get("enabled", False), bool):
+        raise ConfigValidationError("'dedup.enabled' must be a boolean.")
+
+    if not isinstance(dedup.get("persist", True), bool):
+        raise ConfigValidationError("'dedup.persist' must be a boolean.")
+
+    if not isinstance(dedup.get("state_dir", "./state/"), str):
+        raise ConfigValidationError("'dedup.state_dir' must be a string.")
+
+    capacity = dedup.get("capacity", 1000000)
+    if not isinstance(capacity, int) or capacity <= 0:
+        raise ConfigValidationError("'dedup.capacity' must be a positive integer.")
+
+    error_rate = dedup.get("error_rate", 0.001)
+    if not isinstance(error_rate, (int, float)) or not 0 < error_rate < 1:
+        raise ConfigValidationError("'dedup.error_rate' must be a number between 0 and 1.")
+
+def validate_swarm_stats(config_dict: Dict[str, Any]) -> None:
+    """
+    Validate the optional tracker scrape configuration.
+
+    Ensures the tracker list contains supported URLs and the timeouts and
+    concurrency limits are properly set.
+
+    Args:
+        config_dict (Dict[str, Any]): The configuration dictionary.
+
+    Raises:
+        ConfigValidationError: If the tracker scrape configuration is invalid.
+    """
+    swarm_stats = config_dict.get("swarm_stats", {})
+    if not isinstance(swarm_stats, dict):
+        raise ConfigValidationError("'swarm_stats' must be a dictionary.")
+
+    if not isinstance(swarm_stats.get("enabled", False), bool):
+        raise ConfigValidationError("'swarm_stats.enabled' must be a boolean.")
+
+    trackers = swarm_stats.get("trackers", [])
+    if not isinstance(trackers, list):
+        raise ConfigValidationError("'swarm_stats.trackers' must be a list.")
+
+    for tracker in trackers:
+        parsed_url = urlparse(tracker) if isinstance(tracker, str) else None
+        if parsed_url is None or parsed_url.scheme not in ("udp", "http", "https") or not parsed_url.hostname:
+            raise ConfigValidationError(f"'swarm_stats.trackers' contains an invalid tracker URL: {tracker}")
+
+    timeout = swarm_stats.get("timeout", 5.0)
+    if not isinstance(timeout, (int, float)) or timeout <= 0:
+        raise ConfigValidationError("'swarm_stats.timeout' must be a positive number.")
+
+    for key, default in (("retries", 2), ("per_tracker_concurrency", 4)):
+        value = swarm_stats.get(key, default)
+        if not isinstance(value, int) or value < 0:
+            raise ConfigValidationError(f"'swarm_stats.{key}' must be a non-negative integer.")
+
+def validate_prefilter(config_dict: Dict[str, Any]) -> None:
+    """
+    Validate the optional relevance prefilter configuration.
+
+    Ensures a watchlist path is given when the prefilter is enabled and the
+    match threshold is within range.
+
+    Args:
+        config_dict (Dict[str, Any]): The configuration dictionary.
+
+    Raises:
+        ConfigValidationError: If the prefilter configuration is invalid.
+    """
+    prefilter = config_dict.get("prefilter", {})
+    if not isinstance(prefilter, dict):
+        raise ConfigValidationError("'prefilter' must be a dictionary.")
+
+    if not isinstance(prefilter.get("enabled", False), bool):
+        raise ConfigValidationError("'prefilter.enabled' must be a boolean.")
+
+    if prefilter.get("enabled", False):
+        validate_path(prefilter, "watchlist_path", str)
+
+    threshold = prefilter.get("threshold", 0.6)
+    if not isinstance(threshold, (int, float)) or not 0 <= threshold <= 1:
+        raise ConfigValidationError("'prefilter.threshold' must be a number between 0 and 1.")
+
+def validate_monitor(config_dict: Dict[str, Any]) -> None:
+    """
+    Validate the optional monitoring daemon configuration.
+
+    Ensures the revisit intervals, concurrency and request budget are properly set.
+
+    Args:
+        config_dict (Dict[str, Any]): The configuration dictionary.
+
+    Raises:
+        ConfigValidationError: If the monitoring configuration is invalid.
+    """
+    monitor = config_dict.get("monitor", {})
+    if not isinstance(monitor, dict):
+        raise ConfigValidationError("'monitor' must be a dictionary.")
+
+    for key in ("min_interval", "max_interval", "discovery_interval", "save_interval", "requests_per_minute"):
+        value = monitor.get(key)
+        if value is not None and (not isinstance(value, (int, float)) or value <= 0):
+            raise ConfigValidationError(f"'monitor.{key}' must be a positive number.")
+
+    initial_spread = monitor.get("initial_spread")
+    if initial_spread is not None and (not isinstance(initial_spread, (int, float)) or initial_spread < 0):
+        raise ConfigValidationError("'monitor.initial_spread' must be a non-negative number.")
+
+    if monitor.get("min_interval", 300) > monitor.get("max_interval", 86400):
+        raise ConfigValidationError("'monitor.min_interval' must not exceed 'monitor.max_interval'.")
+
+    concurrency = monitor.get("concurrency", 4)
+    if not isinstance(concurrency, int) or concurrency <= 0:
+        raise ConfigValidationError("'monitor.concurrency' must be a positive integer.")
+
+    if not isinstance(monitor.get("state_dir", "./state/"), str):
+        raise ConfigValidationError("'monitor.state_dir' must be a string.")
+
+def validate_fingerprints(config_dict: Dict[str, Any]) -> None:
+    """
+    Validate the optional page fingerprint configuration.
+
+    Args:
+        config_dict (Dict[str, Any]): The configuration dictionary.
+
+    Raises:
+        ConfigValidationError: If the page fingerprint configuration is invalid.
+    """
+    fingerprints = config_dict.get("fingerprints", {})
+    if not isinstance(fingerprints, dict):
+        raise ConfigValidationError("'fingerprints' must be a dictionary.")
+
+    if not isinstance(fingerprints.get("enabled", False), bool):
+        raise ConfigValidationError("'fingerprints.enabled' must be a boolean.")
+
+    if not isinstance(fingerprints.get("state_dir", "./state/"), str):
+        raise ConfigValidationError("'fingerprints.state_dir' must be a string.")
+
+def validate_report(config_dict: Dict[str, Any]) -> None:
+    """
+    Validate the optional infringement report configuration.
+
+    Ensures a watchlist is available when reporting is enabled, the
+    directories and threshold are properly set, and removals are not
+    tracked under persistent deduplication.
+
+    Args:
+        config_dict (Dict[str, Any]): The configuration dictionary.
+
+    Raises:
+        ConfigValidationError: If the report configuration is invalid.
+    """
+    report = config_dict.get("report", {})
+    if not isinstance(report, dict):
+        raise ConfigValidationError("'report' must be a dictionary.")
+
+    for key in ("enabled", "track_removals"):
+        if not isinstance(report.get(key, False), bool):
+            raise ConfigValidationError(f"'report.{key}' must be a boolean.")
+
+    for key in ("watchlist_path", "state_dir", "report_dir"):
+        if key in report and not isinstance(report[key], str):
+            raise ConfigValidationError(f"'report.{key}' must be a string.")
+
+    if report.get("enabled", False) and not (report.get("watchlist_path") or config_dict.get("prefilter", {}).get("watchlist_path")):
+        raise ConfigValidationError("'report.watchlist_path' (or 'prefilter.watchlist_path') is required when the report is enabled.")
+
+    threshold = report.get("threshold", 0.6)
+    if not isinstance(threshold, (int, float)) or not 0 <= threshold <= 1:
+        raise ConfigValidationError("'report.threshold' must be a number between 0 and 1.")
+
+    grace_runs = report.get("removal_grace_runs", 3)
+    if not isinstance(grace_runs, int) or grace_runs <= 0:
+        raise ConfigValidationError("'report.removal_grace_runs' must be a positive integer.")
+
+    dedup = config_dict.get("dedup", {})
+    if report.get("track_removals", False) and dedup.get("enabled", False) and dedup.get("persist", True):
+        raise ConfigValidationError("'report.track_removals' cannot be enabled with persistent deduplication ('dedup.persist'): earlier items are never fetched again, so their listings cannot be seen to disappear.")
+
+def validate_preflight(config_dict: Dict[str, Any]) -> None:
+    """
+    Validate the optional preflight configuration.
+
+    Args:
+        config_dict (Dict[str, Any]): The configuration dictionary.
+
+    Raises:
+        ConfigValidationError: If the preflight configuration is invalid.
+    """
+    preflight = config_dict.get("preflight", {})
+    if not isinstance(preflight, dict):
+        raise ConfigValidationError("'preflight' must be a dictionary.")
+
+    timeout = preflight.get("timeout", 5.0)
+    if not isinstance(timeout, (int, float)) or timeout <= 0:
+        raise ConfigValidationError("'preflight.timeout' must be a positive number.")
+
+def validate_runtime(config_dict: Dict[str, Any]) -> None:
+    """
+    Validate the optional transport runtime configuration.
+
+    Args:
+        config_dict (Dict[str, Any]): The configuration dictionary.
+
+    Raises:
+        ConfigValidationError: If the runtime configuration is invalid.
+    """
+    runtime = config_dict.get("runtime", {})
+    if not isinstance(runtime, dict):
+        raise ConfigValidationError("'runtime' must be a dictionary.")
+
+    for key in ("connection_limit", "connection_limit_per_host", "dns_cache_ttl", "cache_entries"):
+        if key in runtime and (not isinstance(runtime[key], int) or isinstance(runtime[key], bool) or runtime[key] < 0):
+            raise ConfigValidationError(f"'runtime.{key}' must be a non-negative integer.")
+
+    keepalive_timeout = runtime.get("keepalive_timeout", 30.0)
+    if not isinstance(keepalive_timeout, (int, float)) or keepalive_timeout <= 0:
+        raise ConfigValidationError("'runtime.keepalive_timeout' must be a positive number.")
+
+def validate_memory_budget(config_dict: Dict[str, Any]) -> None:
+    """
+    Validate the optional memory budget configuration.
+
+    Args:
+        config_dict (Dict[str, Any]): The configuration dictionary.
+
+    Raises:
+        ConfigValidationError: If the memory budget configuration is invalid.
+    """
+    budget = config_dict.get("memory_budget", {})
+    if not isinstance(budget, dict):
+        raise ConfigValidationError("'memory_budget' must be a dictionary.")
+
+    if not isinstance(budget.get("enabled", False), bool):
+        raise ConfigValidationError("'memory_budget.enabled' must be a boolean.")
+
+    if budget.get("enabled", False) and "limit_mb" not in budget:
+        raise ConfigValidationError("'memory_budget.limit_mb' is required when the memory budget is enabled.")
+
+    limit_mb = budget.get("limit_mb", 1024)
+    if not isinstance(limit_mb, (int, float)) or isinstance(limit_mb, bool) or limit_mb <= 0:
+        raise ConfigValidationError("'memory_budget.limit_mb' must be a positive number.")
+
+    high_watermark = budget.get("high_watermark", 0.9)
+    low_watermark = budget.get("low_watermark", 0.75)
+    for key, value in (("high_watermark", high_watermark), ("low_watermark", low_watermark)):
+        if not isinstance(value, (int, float)) or not 0 < value <= 1:
+            raise ConfigValidationError(f"'memory_budget.{key}' must be a number between 0 and 1.")
+    if low_watermark >= high_watermark:
+        raise ConfigValidationError("'memory_budget.low_watermark' must be lower than 'memory_budget.high_watermark'.")
+
+    for key, default in (("check_interval", 0.5), ("max_pause", 30.0)):
+        value = budget.get(key, default)
+        if not isinstance(value, (int, float)) or value <= 0:
+            raise ConfigValidationError(f"'memory_budget.{key}' must be a positive number.")
+
+def validate_mirrors(config_dict: Dict[str, Any]) -> None:
+    """
+    Validate the optional mirror selection configuration.
+
+    Args:
+        config_dict (Dict[str, Any]): The configuration dictionary.
+
+    Raises:
+        ConfigValidationError: If the mirror configuration is invalid.
+    """
+    mirrors = config_dict.get("mirrors", {})
+    if not isinstance(mirrors, dict):
+        raise ConfigValidationError("'mirrors' must be a dictionary.")
+
+    if not isinstance(mirrors.get("enabled", False), bool):
+        raise ConfigValidationError("'mirrors.enabled' must be a boolean.")
+
+    if "sites_path" in mirrors and not isinstance(mirrors["sites_path"], str):
+        raise ConfigValidationError("'mirrors.sites_path' must be a string.")
+
+    for key, default in (("timeout", 5.0), ("probe_interval", 300.0)):
+        value = mirrors.get(key, default)
+        if not isinstance(value, (int, float)) or value <= 0:
+            raise ConfigValidationError(f"'mirrors.{key}' must be a positive number.")
+
+    failure_threshold = mirrors.get("failure_threshold", 3)
+    if not isinstance(failure_threshold, int) or failure_threshold < 1:
+        raise ConfigValidationError("'mirrors.failure_threshold' must be a positive integer.")
\ No newline at end of file